@@ -0,0 +1,422 @@
+"""
+Offline end-to-end simulation of the streaming pipeline.
+
+Runs the real RealtimeVideoStreamer, FFmpegRTMPStreamer ring/pacer,
+overlay, transitions, scheduler and prompt generator against stand-ins
+for everything that needs a GPU or the network:
+
+- ProceduralGenerator: CPU clips with a configurable latency distribution
+  (optionally a second one as the "api" backend behind a BackendRouter)
+- LocalFalQueue: the fal queue protocol served locally, driven by the real
+  FalJobManager (``fal_queue``: the ltxv2-preview path, or the "api"
+  backend when routed)
+- FakeLLMClient: canned JSON from the "LLM"
+- ScriptedChatListener: scripted or Poisson chat through the IRC parser
+- NullEncoderBackend: no encode (optionally raw frames to a file)
+
+and reports throughput, per-stage latency percentiles, buffer underruns
+and dropped frames for a scenario.
+
+    python -m benchmarks.pipeline_simulation --scenario steady --duration 60
+    python -m benchmarks.pipeline_simulation --scenario slow --json slow.json
+    python -m benchmarks.pipeline_simulation --config my_scenario.json --preemption
+    python -m benchmarks.pipeline_simulation --scenario routed --no-hedge
+    python -m benchmarks.pipeline_simulation --scenario api-queue
+
+Pipeline log files go to $LOG_DIR (a temp directory unless it is set).
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+# The pipeline's loggers open their files on import - keep a run's logs out of the working tree
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "pipeline_simulation_logs"))
+
+from streaming_pipeline.core.generation_scheduler import BufferWatermarkScheduler
+from streaming_pipeline.core.preemption import PreemptionController
+from streaming_pipeline.core.quality_ladder import QualityLadder
+from streaming_pipeline.core.streaming_engine import RealtimeVideoStreamer
+from streaming_pipeline.output.rtmp_streamer import FFmpegRTMPStreamer
+from streaming_pipeline.postprocessing.clip_transition import ClipTransition
+from streaming_pipeline.postprocessing.text_overlay import TextOverlay
+from streaming_pipeline.simulation.chat import ScriptedChatListener
+from streaming_pipeline.simulation.fal_queue import FalQueueGenerator, LocalFalQueue
+from streaming_pipeline.simulation.generator import LatencyModel, ProceduralGenerator
+from streaming_pipeline.simulation.llm import make_prompt_generator
+from streaming_pipeline.utils.tracing import Tracer
+from streaming_pipeline.video_generation.backend_router import BackendRouter
+from streaming_pipeline.video_generation.backends import GeneratorBackend
+
+
+@dataclass
+class Scenario:
+    duration: float = 60.0
+    fps: int = 9
+    width: int = 640
+    height: int = 480
+    num_frames: int = 161
+    chunk_frames: Optional[int] = None  # Generate (and air) clips in chunks of this many frames
+    pix_fmt: str = "yuv420p"
+    # Generation latency: (base + per_frame * num_frames) * lognormal(jitter), spikes on top
+    latency_base: float = 2.0
+    latency_per_frame: float = 0.05
+    latency_jitter: float = 0.15
+    spike_probability: float = 0.0
+    spike_factor: float = 3.0
+    failure_probability: float = 0.0
+    # Backend routing: model "auto" routed between the generator above ("local") and a second "api" one
+    route: bool = False
+    hedge: bool = True
+    api_latency_base: float = 8.0
+    api_latency_per_frame: float = 0.0
+    api_latency_jitter: float = 0.3
+    api_spike_probability: float = 0.0
+    api_failure_probability: float = 0.0
+    # The API model through FalJobManager and a LocalFalQueue (clips are 6s at the scenario fps)
+    fal_queue: bool = False
+    fal_queue_workers: int = 2
+    llm_latency: float = 0.4
+    # Chat: Poisson rate (messages/s) or a JSONL script
+    chat_rate: float = 0.5
+    chat_script: Optional[str] = None
+    # Pipeline features
+    transition: str = "crossfade"
+    overlay: bool = True  # Without overlay text or a transition, API clips are decoded straight into the ring
+    scheduler: bool = True
+    low_watermark: float = 8.0
+    high_watermark: float = 20.0
+    adaptive_quality: bool = False
+    preemption: bool = False
+    encoder: str = "null"
+    dump_path: Optional[str] = None
+    trace_path: Optional[str] = None
+    seed: int = 0
+
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "steady": {},                                                   # ~1.8x realtime
+    "slow": {"latency_per_frame": 0.14},                            # ~0.7x realtime - underruns
+    "spiky": {"spike_probability": 0.2, "spike_factor": 3.0},       # Occasional 3x stalls
+    "chatty": {"chat_rate": 3.0, "preemption": True},               # Busy chat with preemption
+    "unpaced": {"scheduler": False, "latency_per_frame": 0.02},     # Fast generator, no watermarks
+    "routed": {"route": True, "spike_probability": 0.2,              # Local stalls, hedged on the "API"
+               "spike_factor": 5.0, "api_latency_base": 6.0, "api_latency_jitter": 0.2,
+               "api_failure_probability": 0.1},
+    "chunked": {"chunk_frames": 41},                                # First frames after one chunk
+    "api-queue": {"fal_queue": True, "overlay": False,               # ltxv2 through FalJobManager,
+                  "transition": "none", "api_latency_base": 3.0,     # clips decoded into the ring
+                  "api_latency_jitter": 0.2},
+}
+
+
+class CaptionlessOverlay(TextOverlay):
+    """Overlay that never gets any text (a stream without captions)"""
+
+    def set_comment(self, comment_text: str, username: str = None):
+        self.current_text = None
+
+    def set_prompt(self, prompt_text: str):
+        self.current_text = None
+
+
+def initial_image_url(width: int, height: int) -> str:
+    """Data URL of a synthetic gradient to start from"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.stack([np.broadcast_to(x, (height, width)),
+                      np.broadcast_to(y, (height, width)),
+                      np.full((height, width), 128.0)], axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=90)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def build_pipeline(scenario: Scenario) -> Dict[str, Any]:
+    """Wire the engine to the stand-ins, the same way StreamingService wires the real components"""
+    if scenario.chat_script:
+        chat = ScriptedChatListener.from_file(scenario.chat_script, seed=scenario.seed)
+    else:
+        chat = ScriptedChatListener(rate=scenario.chat_rate, seed=scenario.seed)
+
+    generator = ProceduralGenerator(LatencyModel(
+        base=scenario.latency_base,
+        per_frame=scenario.latency_per_frame,
+        jitter=scenario.latency_jitter,
+        spike_probability=scenario.spike_probability,
+        spike_factor=scenario.spike_factor,
+        seed=scenario.seed,
+    ), failure_probability=scenario.failure_probability, seed=scenario.seed)
+    api_latency = LatencyModel(
+        base=scenario.api_latency_base,
+        per_frame=scenario.api_latency_per_frame,
+        jitter=scenario.api_latency_jitter,
+        spike_probability=scenario.api_spike_probability,
+        spike_factor=scenario.spike_factor,
+        seed=scenario.seed + 1,
+    )
+    api_generator = router = fal_queue = None
+    if scenario.fal_queue:
+        fal_queue = LocalFalQueue(api_latency, workers=scenario.fal_queue_workers, width=scenario.width,
+                                  height=scenario.height, fps=scenario.fps).start()
+        if not scenario.route:
+            generator = FalQueueGenerator(fal_queue)
+    if scenario.route:
+        if fal_queue:
+            api_generator = FalQueueGenerator(fal_queue)
+        else:
+            api_generator = ProceduralGenerator(api_latency, failure_probability=scenario.api_failure_probability,
+                                                seed=scenario.seed + 1)
+        router = BackendRouter([GeneratorBackend("local", generator, "ltxv1"),
+                                GeneratorBackend("api", api_generator, "ltxv2-preview",
+                                                 expected_latency=scenario.api_latency_base)],
+                               hedging=scenario.hedge)
+    rtmp = FFmpegRTMPStreamer(
+        stream_key="",
+        fps=scenario.fps,
+        width=scenario.width,
+        height=scenario.height,
+        input_pix_fmt=scenario.pix_fmt,
+        record_path=scenario.dump_path,
+        null_sink=True,
+        encoder_backend=scenario.encoder,
+    )
+    scheduler = BufferWatermarkScheduler(scenario.fps, scenario.low_watermark, scenario.high_watermark) \
+        if scenario.scheduler else None
+    ladder = QualityLadder(fps=scenario.fps)
+    ladder.enabled = scenario.adaptive_quality
+    preemption = PreemptionController()
+    preemption.enabled = scenario.preemption
+    tracer = Tracer(export_path=scenario.trace_path)
+
+    engine = RealtimeVideoStreamer(
+        twitch_listener=chat,
+        prompt_generator=make_prompt_generator(scenario.llm_latency, seed=scenario.seed),
+        realtime_generator=router or generator,
+        rtmp_streamer=rtmp,
+        text_overlay=(TextOverlay if scenario.overlay else CaptionlessOverlay)(width=scenario.width,
+                                                                               height=scenario.height),
+        clip_transition=ClipTransition(mode=scenario.transition, overlap_frames=8),
+        generation_scheduler=scheduler,
+        quality_ladder=ladder,
+        preemption=preemption,
+        tracer=tracer,
+        initial_prompt="a quiet city at dawn, cinematic",
+        initial_image_url=initial_image_url(scenario.width, scenario.height),
+    )
+    engine.update_ltx_config(width=scenario.width, height=scenario.height, num_frames=scenario.num_frames,
+                             chunk_frames=scenario.chunk_frames)
+    if router:
+        engine.update_ltx_config(model_type="auto")
+        router.time_budget = lambda: engine._buffered_frames() / scenario.fps
+    elif fal_queue:
+        engine.update_ltx_config(model_type="ltxv2-preview")
+    return {"engine": engine, "chat": chat, "generator": generator, "api_generator": api_generator,
+            "router": router, "fal_queue": fal_queue, "rtmp": rtmp, "scheduler": scheduler, "ladder": ladder,
+            "preemption": preemption, "tracer": tracer}
+
+
+def percentiles(samples) -> Dict[str, Any]:
+    samples = list(samples)
+    if not samples:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"count": len(samples), "p50": round(float(p50), 3), "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3), "max": round(float(max(samples)), 3)}
+
+
+def run(scenario: Scenario, verbose: bool = False, sample_interval: float = 0.05) -> Dict[str, Any]:
+    """Run a scenario for ``scenario.duration`` seconds and return the report"""
+    pipeline = build_pipeline(scenario)
+    engine, rtmp = pipeline["engine"], pipeline["rtmp"]
+
+    buffer_levels = []
+    first_frame_at = None
+    startup_repeats = 0
+    underrun_events = 0
+
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            # The engine and its components narrate every step on stdout
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        start_time = time.time()
+        engine.start_streaming()
+        was_empty = False
+        while time.time() - start_time < scenario.duration:
+            time.sleep(sample_interval)
+            queued = len(rtmp.frame_buffer) if rtmp.frame_buffer is not None else 0
+            if first_frame_at is None:
+                if rtmp.frames_added_total > 0:
+                    first_frame_at = time.time() - start_time
+                    startup_repeats = rtmp.frames_repeated
+                continue
+            buffer_levels.append(queued / scenario.fps)
+            if queued == 0 and not was_empty:
+                underrun_events += 1
+            was_empty = queued == 0
+
+        elapsed = time.time() - start_time
+        # Snapshot before stop_streaming() resets every component's metrics
+        rtmp_status = rtmp.get_status()
+        engine_status = engine.get_status()
+        stage_samples = {stage: list(samples) for stage, samples in engine.stage_samples.items()}
+        comment_to_air = list(engine.comment_to_air)
+        status = {name: component.get_status() for name, component in pipeline.items()
+                  if component is not None and name not in ("engine", "rtmp")}
+        status["prompt"] = engine.prompt_generator.get_status()
+        engine.stop_streaming()
+        if pipeline["fal_queue"]:
+            pipeline["fal_queue"].stop()
+
+    generators = [status["generator"]] + ([status["api_generator"]] if "api_generator" in status else [])
+    frames_generated = sum(generator["frames_generated"] for generator in generators)
+    playing_time = elapsed - (first_frame_at or elapsed)
+    return {
+        "scenario": asdict(scenario),
+        "elapsed": round(elapsed, 1),
+        "throughput": {
+            "clips_generated": engine_status["generation_count"],
+            "clips_cancelled": sum(generator["cancelled"] for generator in generators),
+            "frames_generated": frames_generated,
+            "generated_fps": round(frames_generated / elapsed, 2),
+            "realtime_ratio": round(frames_generated / (elapsed * scenario.fps), 2),
+            "frames_sent": rtmp_status["frames_sent"],
+            "output_fps": round(rtmp_status["frames_sent"] / elapsed, 2),
+            "time_to_first_frame": round(first_frame_at, 2) if first_frame_at is not None else None,
+        },
+        "stages": {stage: percentiles(samples) for stage, samples in stage_samples.items()},
+        "prompt": status["prompt"],
+        "buffer": {
+            "underrun_events": underrun_events,
+            "underrun_frames": rtmp_status["frames_repeated"] - startup_repeats,
+            "underrun_seconds": round((rtmp_status["frames_repeated"] - startup_repeats) / scenario.fps, 1),
+            "min_seconds": round(min(buffer_levels), 1) if buffer_levels else None,
+            "avg_seconds": round(float(np.mean(buffer_levels)), 1) if buffer_levels else None,
+            "max_seconds": round(max(buffer_levels), 1) if buffer_levels else None,
+            "playing_seconds": round(playing_time, 1),
+        },
+        "dropped": {
+            "ring_full": rtmp_status["frames_dropped"],
+            "trimmed": rtmp_status["frames_trimmed"],
+        },
+        "comment_to_air": percentiles(comment_to_air),
+        "comment_spans": status["tracer"]["spans"],
+        "chat": status["chat"],
+        "scheduler": status.get("scheduler", {}),
+        "quality": status["ladder"],
+        "preemption": status["preemption"],
+        "encoder": rtmp_status["encoder"],
+        "routing": status.get("router", {}),
+        "fal_queue": status.get("fal_queue", {}),
+        "fal_jobs": next((generator["fal_jobs"] for generator in generators if "fal_jobs" in generator), {}),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    scenario = report["scenario"]
+    throughput = report["throughput"]
+    buffer = report["buffer"]
+    print(f"\n🧪 Simulation: {report['elapsed']}s at {scenario['width']}x{scenario['height']} @ {scenario['fps']}fps "
+          f"(scheduler={'on' if scenario['scheduler'] else 'off'}, preemption={'on' if scenario['preemption'] else 'off'})")
+    print(f"   🎬 Clips: {throughput['clips_generated']} generated, {throughput['clips_cancelled']} cancelled, "
+          f"{throughput['frames_generated']} frames ({throughput['generated_fps']} fps, "
+          f"{throughput['realtime_ratio']}x realtime)")
+    print(f"   📺 Output: {throughput['frames_sent']} frames ({throughput['output_fps']} fps), "
+          f"first frame after {throughput['time_to_first_frame']}s")
+    print(f"   🪣 Buffer: min {buffer['min_seconds']}s / avg {buffer['avg_seconds']}s / max {buffer['max_seconds']}s")
+    print(f"   ⚠️ Underruns: {buffer['underrun_events']} events, {buffer['underrun_frames']} repeated frames "
+          f"({buffer['underrun_seconds']}s of {buffer['playing_seconds']}s)")
+    print(f"   🗑️ Dropped: {report['dropped']['ring_full']} (ring full), {report['dropped']['trimmed']} (trimmed)")
+    print(f"   ⏱️ Stage latency (s):")
+    for stage, stats in report["stages"].items():
+        if stats["count"]:
+            print(f"      {stage:<13} p50 {stats['p50']:>7.3f}  p95 {stats['p95']:>7.3f}  "
+                  f"p99 {stats['p99']:>7.3f}  max {stats['max']:>7.3f}  (n={stats['count']})")
+    routing = report.get("routing")
+    if routing:
+        print(f"   🧭 Routing: {routing['hedged']} hedged, {routing['failovers']} failovers, "
+              f"{routing['probed']} probes (hedging {'on' if routing['hedging'] else 'off'})")
+        for name, backend in routing["backends"].items():
+            print(f"      {name:<6} wins {backend['wins']:>3}  requests {backend['requests']:>3}  "
+                  f"failures {backend['failures']:>2}  latency ewma {backend['latency_ewma'] or '-'}s")
+    fal_jobs = report.get("fal_jobs")
+    if fal_jobs:
+        print(f"   📤 fal queue: {fal_jobs['submitted']} submitted, {fal_jobs['completed']} completed, "
+              f"{fal_jobs['cancelled']} cancelled, {fal_jobs['failed']} failed "
+              f"(avg queue {fal_jobs['avg_queue_time']}s, run {fal_jobs['avg_run_time']}s, "
+              f"max depth {report['fal_queue']['max_queue_depth']})")
+    comment_to_air = report["comment_to_air"]
+    if comment_to_air["count"]:
+        print(f"   💬 Comment-to-air (s): p50 {comment_to_air['p50']}  p95 {comment_to_air['p95']}  "
+              f"max {comment_to_air['max']}  (n={comment_to_air['count']})")
+        for span, stats in report["comment_spans"].items():
+            print(f"      {span:<17} p50 {stats['p50']:>7.2f}  p95 {stats['p95']:>7.2f}")
+
+
+def load_scenario(args) -> Scenario:
+    values = dict(SCENARIOS[args.scenario])
+    if args.config:
+        with open(args.config) as f:
+            values.update(json.load(f))
+    for field in fields(Scenario):
+        override = getattr(args, field.name, None)
+        if override is not None:
+            values[field.name] = override
+    return Scenario(**values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="steady", choices=sorted(SCENARIOS))
+    parser.add_argument("--config", help="JSON file with Scenario fields (applied over --scenario)")
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--fps", type=int)
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--height", type=int)
+    parser.add_argument("--num-frames", dest="num_frames", type=int)
+    parser.add_argument("--chunk-frames", dest="chunk_frames", type=int)
+    parser.add_argument("--latency-base", dest="latency_base", type=float)
+    parser.add_argument("--latency-per-frame", dest="latency_per_frame", type=float)
+    parser.add_argument("--latency-jitter", dest="latency_jitter", type=float)
+    parser.add_argument("--spike-probability", dest="spike_probability", type=float)
+    parser.add_argument("--route", action=argparse.BooleanOptionalAction, default=None,
+                        help="Route model 'auto' between the generator and a simulated API backend")
+    parser.add_argument("--hedge", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--api-latency-base", dest="api_latency_base", type=float)
+    parser.add_argument("--api-failure-probability", dest="api_failure_probability", type=float)
+    parser.add_argument("--fal-queue", dest="fal_queue", action=argparse.BooleanOptionalAction, default=None,
+                        help="Run the API model through FalJobManager against a local fal queue")
+    parser.add_argument("--chat-rate", dest="chat_rate", type=float)
+    parser.add_argument("--chat-script", dest="chat_script", help="JSONL chat script")
+    parser.add_argument("--transition", choices=["none", "crossfade", "motion_blend"])
+    parser.add_argument("--scheduler", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--adaptive-quality", dest="adaptive_quality", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--preemption", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--encoder", choices=["null", "pyav"], help="pyav encodes to a null muxer (measures encode cost)")
+    parser.add_argument("--dump", dest="dump_path", help="Write raw output frames here (null encoder)")
+    parser.add_argument("--trace", dest="trace_path", help="Export per-clip traces to this JSONL file")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    report = run(load_scenario(args), verbose=args.verbose)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for clip-boundary transitions.
+
+Measures ClipTransition.apply() on synthetic clips and compares the cost
+per output frame with the frame budget at the streaming frame rates.
+
+    python -m benchmarks.transition_benchmark --frames 161 --overlap 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from streaming_pipeline.models import VideoClip
+from streaming_pipeline.postprocessing.clip_transition import ClipTransition
+
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+FPS_TARGETS = [9, 24]
+
+
+def make_clip(num_frames: int, width: int, height: int, seed: int):
+    """Random uint8 clip, as the engine passes it (one contiguous array)"""
+    rng = np.random.default_rng(seed)
+    return VideoClip(rng.integers(0, 256, size=(num_frames, height, width, 3), dtype=np.uint8))
+
+
+def run(mode: str, num_frames: int, overlap: int, repeats: int):
+    print(f"🎞️ Transition benchmark: mode={mode}, clip={num_frames} frames, overlap={overlap}")
+    for width, height in RESOLUTIONS:
+        transition = ClipTransition(mode=mode, overlap_frames=overlap)
+        clip_a = make_clip(num_frames, width, height, seed=0)
+        clip_b = make_clip(num_frames, width, height, seed=1)
+
+        transition.apply(clip_a)  # Prime the held tail
+        timings = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            transition.apply(clip_b if i % 2 == 0 else clip_a)
+            timings.append(time.perf_counter() - start)
+
+        per_clip = float(np.median(timings))
+        per_frame = per_clip / num_frames
+        budgets = ", ".join(
+            f"{fps}fps: {100 * per_frame * fps:.2f}% of budget" for fps in FPS_TARGETS
+        )
+        print(f"   {width}x{height}: {per_clip * 1000:.1f} ms/clip "
+              f"({per_frame * 1000:.3f} ms/frame amortized) - {budgets}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", default="all", choices=["all", "crossfade", "motion_blend"])
+    parser.add_argument("--frames", type=int, default=161)
+    parser.add_argument("--overlap", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    modes = ["crossfade", "motion_blend"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        run(mode, args.frames, args.overlap, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import fal
 from fastapi import WebSocket
 
 from streaming_pipeline.streaming_service import StreamingService
-from streaming_pipeline.models import StartStreamRequest
+from streaming_pipeline.models import StartStreamRequest, StopStreamRequest, StreamMetricsRequest
 from dotenv import load_dotenv
 
 #load_dotenv()
@@ -62,9 +62,24 @@ class RealtimeStreamingApp(
     
     @fal.endpoint("/stop_stream")
     def stop_streaming(self):
-        """Stop the streaming pipeline"""
+        """Stop the streaming pipeline (every stream)"""
         return self.streaming_service.stop_streaming()
     
+    @fal.endpoint("/streams")
+    def list_streams(self):
+        """Hosted streams and how they share the GPU"""
+        return self.streaming_service.list_streams()
+    
+    @fal.endpoint("/streams/stop")
+    def stop_stream(self, request: StopStreamRequest):
+        """Stop one stream (every stream if no stream_id)"""
+        return self.streaming_service.stop_streaming(request.stream_id)
+    
+    @fal.endpoint("/streams/metrics")
+    def get_stream_metrics(self, request: StreamMetricsRequest):
+        """Latest metrics for one stream"""
+        return self.streaming_service.get_metrics(request.stream_id)
+    
     @fal.endpoint("/metrics")
     def get_metrics(self):
         """Get simplified real-time streaming metrics for dashboard"""
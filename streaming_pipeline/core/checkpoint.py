@@ -0,0 +1,189 @@
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+
+
+class SessionCheckpointer(Monitorable):
+    """
+    Periodic, non-blocking checkpoints of the streaming session for warm resume.
+
+    The engine hands over a snapshot after every state update. That is only
+    references: the frame arrays are replaced each clip, never modified in
+    place. A background writer saves the newest snapshot at most every
+    ``interval`` seconds, so the generation loop never waits on the disk.
+
+    A checkpoint holds:
+    - the last frame
+    - the clip transition's held tail (frames that never aired)
+    - the prompt history, generation count and mode
+    - the LTX config
+
+    The ``.npy`` files are written under generation-specific names first.
+    ``state.json`` is then replaced atomically, so a crash mid-write leaves
+    the previous checkpoint intact.
+    """
+
+    STATE_FILE = "state.json"
+
+    def __init__(self, checkpoint_dir: str, interval: float = 15.0, max_age: float = 6 * 3600,
+                 keep_prompts: int = 50):
+        self.checkpoint_dir = checkpoint_dir
+        self.interval = interval
+        self.max_age = max_age
+        self.keep_prompts = keep_prompts
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # flush() and the writer thread never interleave files
+        self._wakeup = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+        self.reset_metrics()
+
+    # ------------------------------------------------------------------
+    # Saving
+    # ------------------------------------------------------------------
+
+    def submit(self, snapshot: Dict[str, Any]):
+        """Queue ``snapshot`` for writing; replaces any snapshot not yet written"""
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snapshot
+        self._wakeup.set()
+
+    def flush(self):
+        """Write the pending snapshot now (used on stop)"""
+        snapshot = self._take_pending()
+        if snapshot is not None:
+            self._write(snapshot)
+
+    def _take_pending(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snapshot, self._pending = self._pending, None
+        return snapshot
+
+    def _write_loop(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # Rate-limit, but always end up writing the newest snapshot
+            delay = self.last_write_at + self.interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            snapshot = self._take_pending()
+            if snapshot is not None:
+                self._write(snapshot)
+
+    def _write(self, snapshot: Dict[str, Any]):
+        with self._write_lock:
+            self._write_files(snapshot)
+
+    def _write_files(self, snapshot: Dict[str, Any]):
+        start_time = time.time()
+        try:
+            generation = snapshot["generation_count"]
+            frame_file = f"frame-{generation}.npy"
+            self._save_array(frame_file, snapshot["frame"])
+            tail_file = None
+            if snapshot.get("held_tail") is not None:
+                tail_file = f"tail-{generation}.npy"
+                self._save_array(tail_file, snapshot["held_tail"])
+
+            state = {
+                "saved_at": time.time(),
+                "generation_count": generation,
+                "current_prompt": snapshot["current_prompt"],
+                "previous_prompts": snapshot["previous_prompts"][-self.keep_prompts:],
+                "mode": snapshot.get("mode", "regular"),
+                "config": snapshot.get("config", {}),
+                "frame_file": frame_file,
+                "tail_file": tail_file,
+            }
+            state_path = os.path.join(self.checkpoint_dir, self.STATE_FILE)
+            with open(state_path + ".tmp", "w") as f:
+                json.dump(state, f)
+            os.replace(state_path + ".tmp", state_path)
+            self._remove_stale(keep={frame_file, tail_file})
+
+            self.checkpoints_written += 1
+            self.last_generation = generation
+            self.last_write_time = time.time() - start_time
+        except Exception as e:
+            self.write_errors += 1
+            generation_log.error(f"❌ Checkpoint write failed: {e}")
+        finally:
+            self.last_write_at = time.time()
+
+    def _save_array(self, name: str, array: np.ndarray):
+        path = os.path.join(self.checkpoint_dir, name)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(path + ".tmp", path)
+
+    def _remove_stale(self, keep):
+        for path in glob.glob(os.path.join(self.checkpoint_dir, "*.npy")):
+            if os.path.basename(path) not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Latest checkpoint with its arrays loaded, or None if missing, unreadable or too old"""
+        state_path = os.path.join(self.checkpoint_dir, self.STATE_FILE)
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            age = time.time() - state["saved_at"]
+            if age > self.max_age:
+                generation_log.info(f"⏳ Checkpoint is {age / 3600:.1f}h old - starting cold")
+                return None
+            state["frame"] = np.load(os.path.join(self.checkpoint_dir, state["frame_file"]))
+            state["held_tail"] = np.load(os.path.join(self.checkpoint_dir, state["tail_file"])) \
+                if state.get("tail_file") else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            generation_log.warning(f"⚠️ Checkpoint unreadable - starting cold: {e}")
+            return None
+        state["age"] = age
+        return state
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def reset_metrics(self):
+        """Reset write metrics (the checkpoint on disk is kept for resume)"""
+        self.checkpoints_written = 0
+        self.coalesced = 0
+        self.write_errors = 0
+        self.last_generation = None
+        self.last_write_time = 0.0
+        self.last_write_at = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "checkpoint_dir": self.checkpoint_dir,
+            "checkpoints_written": self.checkpoints_written,
+            "coalesced": self.coalesced,
+            "write_errors": self.write_errors,
+            "last_generation": self.last_generation,
+            "last_write_time": round(self.last_write_time, 3),
+            "seconds_since_write": round(time.time() - self.last_write_at, 1) if self.last_write_at else None,
+        }
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+
+
+class BufferWatermarkScheduler(Monitorable):
+    """
+    Paces generation to playback using watermarks on buffered seconds.
+
+    - Above ``high_watermark`` seconds the generator waits: another clip
+      would only overflow the ring and throw GPU work away.
+    - Between the watermarks it generates back to back.
+    - Clip length is chosen from the measured generation speed (EWMA of
+      seconds per generated frame) so that the buffer lands back under the
+      high watermark when the clip arrives, and shortened when the buffer
+      would run dry before a long clip finishes.
+
+    ``buffered_frames`` counts everything generated but not yet played:
+    frames in the ring plus frames still travelling through the engine stages.
+    """
+
+    def __init__(self, fps: float, low_watermark: float = 8.0, high_watermark: float = 20.0,
+                 min_frames: int = 49, max_frames: int = 241, frame_step: int = 8,
+                 smoothing: float = 0.3, poll_interval: float = 0.25, enqueue_timeout: float = 60.0):
+        if low_watermark >= high_watermark:
+            raise ValueError(f"low_watermark ({low_watermark}) must be below high_watermark ({high_watermark})")
+
+        self.fps = fps
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.frame_step = frame_step        # LTX needs num_frames = 8k + 1
+        self.smoothing = smoothing
+        self.poll_interval = poll_interval
+        self.enqueue_timeout = enqueue_timeout  # How long the output stage may wait for ring space
+
+        # Measured generation speed
+        self.seconds_per_frame: Optional[float] = None
+
+        self.reset_metrics()
+
+    # ------------------------------------------------------------------
+    # Pacing
+    # ------------------------------------------------------------------
+
+    def buffered_seconds(self, buffered_frames: int) -> float:
+        return buffered_frames / self.fps
+
+    async def wait_until_needed(self, get_buffered_frames: Callable[[], int], is_running: Callable[[], bool]):
+        """Sleep while the buffer is above the high watermark"""
+        if self.buffered_seconds(get_buffered_frames()) <= self.high_watermark:
+            return
+
+        start_time = time.time()
+        generation_log.info(f"⏸️ Buffer above {self.high_watermark:.0f}s - holding generation")
+        while is_running() and self.buffered_seconds(get_buffered_frames()) > self.high_watermark:
+            await asyncio.sleep(self.poll_interval)
+
+        waited = time.time() - start_time
+        self.total_wait_time += waited
+        self.waits += 1
+        generation_log.info(f"▶️ Buffer at {self.buffered_seconds(get_buffered_frames()):.1f}s after {waited:.1f}s - generating")
+
+    def choose_num_frames(self, buffered_frames: int, requested: int) -> int:
+        """Clip length for the next generation (``requested`` until speed has been measured)"""
+        if self.seconds_per_frame is None:
+            return self._snap(requested)
+
+        buffered = self.buffered_seconds(buffered_frames)
+        # Playback seconds consumed per generated frame while this clip is generating
+        drain_ratio = self.seconds_per_frame * self.fps
+
+        if drain_ratio < 1.0:
+            # Faster than realtime: the largest clip that still lands under the high watermark
+            # n - drain_ratio * n <= (high - buffered) * fps
+            limit = (self.high_watermark - buffered) * self.fps / (1.0 - drain_ratio)
+        else:
+            # Slower than realtime: longest clip amortizes per-clip overhead best
+            limit = self.max_frames
+
+        if buffered < self.low_watermark:
+            # Draining - the clip must arrive before the buffer runs dry
+            limit = min(limit, buffered / self.seconds_per_frame) if buffered > 0 else self.min_frames
+            self.draining_decisions += 1
+
+        num_frames = self._snap(int(limit))
+        self.last_decision = {
+            "buffered_seconds": round(buffered, 1),
+            "num_frames": num_frames,
+            "expected_generation_time": round(num_frames * self.seconds_per_frame, 1),
+        }
+        return num_frames
+
+    def record_generation(self, generation_time: float, num_frames: int):
+        """Feed a finished generation into the speed estimate"""
+        if num_frames <= 0 or generation_time <= 0:
+            return
+        sample = generation_time / num_frames
+        if self.seconds_per_frame is None:
+            self.seconds_per_frame = sample
+        else:
+            self.seconds_per_frame += self.smoothing * (sample - self.seconds_per_frame)
+
+    def _snap(self, num_frames: int) -> int:
+        """Clamp to [min_frames, max_frames] and round down to frame_step * k + 1"""
+        num_frames = max(self.min_frames, min(self.max_frames, num_frames))
+        if self.frame_step > 1:
+            num_frames = max(self.min_frames, (num_frames - 1) // self.frame_step * self.frame_step + 1)
+        return num_frames
+
+    def reset_metrics(self):
+        """Reset pacing metrics (the speed estimate is kept - it describes the GPU, not the session)"""
+        self.waits = 0
+        self.total_wait_time = 0.0
+        self.draining_decisions = 0
+        self.last_decision: Dict[str, Any] = {}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get scheduler state and pacing metrics"""
+        return {
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "seconds_per_frame": round(self.seconds_per_frame, 4) if self.seconds_per_frame else None,
+            "realtime_ratio": round(1.0 / (self.seconds_per_frame * self.fps), 2) if self.seconds_per_frame else None,
+            "waits": self.waits,
+            "total_wait_time": round(self.total_wait_time, 1),
+            "draining_decisions": self.draining_decisions,
+            "last_decision": self.last_decision,
+        }
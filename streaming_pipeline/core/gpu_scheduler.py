@@ -0,0 +1,202 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+from streaming_pipeline.core.preemption import GenerationPreempted
+
+
+class StreamGenerator(Monitorable):
+    """
+    One stream's view of the shared generator.
+
+    Same interface as ``RealtimeGenerator`` (``generate_video_from_image``,
+    ``last_generation_time``, ``reset_metrics``, ``get_status``) so the engine
+    does not know it is sharing the GPU. Local pipeline jobs are queued on the
+    ``GPUScheduler``; API-backed models bypass it.
+
+    ``deficit`` is set by the service once the stream's engine exists: it
+    returns how many seconds the stream's buffer is below its low watermark
+    (zero or negative when it is healthy).
+    """
+
+    def __init__(self, scheduler: "GPUScheduler", stream_id: str, weight: float = 1.0):
+        self.scheduler = scheduler
+        self.stream_id = stream_id
+        self.weight = weight
+        self.deficit: Optional[Callable[[], float]] = None
+        self.virtual_time = 0.0  # GPU seconds used / weight, owned by the scheduler
+        self.reset_metrics()
+
+    def generate_video_from_image(self, request, cancel_event: Optional[threading.Event] = None, on_frames=None):
+        if request.model_type == "ltxv2-preview":
+            start_time = time.time()
+            response = self.scheduler.generator.generate_video_from_image(request, cancel_event=cancel_event,
+                                                                          stream=self.stream_id)
+            self.last_generation_time = time.time() - start_time
+            return response
+        return self.scheduler.run(self, request, cancel_event, on_frames)
+
+    def current_deficit(self) -> float:
+        if self.deficit is None:
+            return 0.0
+        try:
+            return self.deficit()
+        except Exception:
+            return 0.0
+
+    def reset_metrics(self):
+        """Reset this stream's counters (the shared generator keeps its own)"""
+        self.jobs = 0
+        self.gpu_time = 0.0
+        self.queue_wait_time = 0.0
+        self.last_queue_wait = 0.0
+        self.last_generation_time = 0.0
+        self.urgent_grants = 0
+        self.cancelled_in_queue = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "stream_id": self.stream_id,
+            "weight": self.weight,
+            "videos_generated": self.jobs,
+            "avg_generation_time": round(self.gpu_time / max(1, self.jobs), 2),
+            "last_generation_time": round(self.last_generation_time, 2),
+            "avg_queue_wait": round(self.queue_wait_time / max(1, self.jobs), 2),
+            "last_queue_wait": round(self.last_queue_wait, 2),
+            "urgent_grants": self.urgent_grants,
+            "cancelled_in_queue": self.cancelled_in_queue,
+            "ready": getattr(self.scheduler.generator, "pipeline", True) is not None,
+        }
+
+
+class GPUScheduler(Monitorable):
+    """
+    Weighted fair scheduler for several streams sharing one loaded generator.
+
+    The GPU runs one pipeline call at a time. When it frees up, the next job
+    is picked from the waiting streams:
+
+    - A stream whose buffer is below its low watermark goes first (largest
+      deficit first), so no stream drains while others are healthy. A stream
+      only gets this priority while its virtual time is within ``max_lead``
+      of the least-served waiter, so one stream that can never catch up does
+      not starve the rest.
+    - Otherwise the stream with the lowest virtual time (GPU seconds used
+      divided by its weight) goes next, so streams share the GPU in
+      proportion to their weights.
+
+    A stream that was idle rejoins at the current virtual time instead of
+    cashing in the GPU time it did not use.
+    """
+
+    def __init__(self, generator, max_lead: float = 60.0, poll_interval: float = 0.1):
+        self.generator = generator
+        self.max_lead = max_lead
+        self.poll_interval = poll_interval  # How often queued jobs re-check cancellation
+
+        self.streams: Dict[str, StreamGenerator] = {}
+        self._cond = threading.Condition()
+        self._waiting: List[StreamGenerator] = []
+        self._running: Optional[StreamGenerator] = None
+        self._virtual_time = 0.0
+
+        self.reset_metrics()
+
+    def register(self, stream_id: str, weight: float = 1.0) -> StreamGenerator:
+        """Generator handle for a stream (the existing one, reweighted, if already registered)"""
+        if weight <= 0:
+            raise ValueError(f"weight must be positive, got {weight}")
+        with self._cond:
+            stream = self.streams.get(stream_id)
+            if stream is None:
+                stream = StreamGenerator(self, stream_id, weight)
+                stream.virtual_time = self._virtual_time
+                self.streams[stream_id] = stream
+            stream.weight = weight
+        return stream
+
+    def run(self, stream: StreamGenerator, request, cancel_event: Optional[threading.Event] = None, on_frames=None):
+        """Queue a generation for ``stream`` and run it when the scheduler picks it"""
+        queued_at = time.time()
+        self._acquire(stream, cancel_event)
+        start_time = time.time()
+        stream.last_queue_wait = start_time - queued_at
+        stream.queue_wait_time += stream.last_queue_wait
+        if stream.last_queue_wait > 1.0:
+            generation_log.info(f"🎟️ [{stream.stream_id}] waited {stream.last_queue_wait:.1f}s for the GPU")
+        try:
+            if on_frames is not None:
+                return self.generator.generate_video_from_image(request, cancel_event=cancel_event, on_frames=on_frames)
+            return self.generator.generate_video_from_image(request, cancel_event=cancel_event)
+        finally:
+            self._release(stream, time.time() - start_time)
+
+    def _acquire(self, stream: StreamGenerator, cancel_event: Optional[threading.Event]):
+        with self._cond:
+            # Idle streams rejoin at the current virtual time
+            stream.virtual_time = max(stream.virtual_time, self._virtual_time)
+            self._waiting.append(stream)
+            try:
+                while self._running is not None or self._pick() is not stream:
+                    if cancel_event is not None and cancel_event.is_set():
+                        stream.cancelled_in_queue += 1
+                        raise GenerationPreempted("cancelled while queued for the GPU")
+                    self._cond.wait(self.poll_interval)
+            finally:
+                self._waiting.remove(stream)
+                self._cond.notify_all()
+
+            if len(self._waiting) and stream.current_deficit() > 0:
+                stream.urgent_grants += 1
+            self._running = stream
+            self._virtual_time = stream.virtual_time
+            self.grants += 1
+
+    def _release(self, stream: StreamGenerator, gpu_time: float):
+        with self._cond:
+            stream.virtual_time += gpu_time / stream.weight
+            stream.jobs += 1
+            stream.gpu_time += gpu_time
+            stream.last_generation_time = gpu_time
+            self.busy_time += gpu_time
+            self._running = None
+            self._cond.notify_all()
+
+    def _pick(self) -> Optional[StreamGenerator]:
+        """Next stream to get the GPU (called with the lock held)"""
+        if not self._waiting:
+            return None
+        least_served = min(stream.virtual_time for stream in self._waiting)
+        urgent = [(stream.current_deficit(), stream) for stream in self._waiting
+                  if stream.virtual_time - least_served <= self.max_lead]
+        urgent = [(deficit, stream) for deficit, stream in urgent if deficit > 0]
+        if urgent:
+            return max(urgent, key=lambda item: item[0])[1]
+        return min(self._waiting, key=lambda stream: stream.virtual_time)
+
+    def reset_metrics(self):
+        self.started_at = time.time()
+        self.busy_time = 0.0
+        self.grants = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        elapsed = max(1e-6, time.time() - self.started_at)
+        total_gpu = sum(stream.gpu_time for stream in self.streams.values())
+        return {
+            "streams": len(self.streams),
+            "busy": self._running.stream_id if self._running else None,
+            "queued": [stream.stream_id for stream in list(self._waiting)],
+            "grants": self.grants,
+            "utilization": round(min(1.0, self.busy_time / elapsed), 3),
+            "share": {
+                stream_id: {
+                    "weight": stream.weight,
+                    "gpu_share": round(stream.gpu_time / total_gpu, 3) if total_gpu else 0.0,
+                    "virtual_time": round(stream.virtual_time, 1),
+                    "deficit": round(stream.current_deficit(), 1),
+                }
+                for stream_id, stream in list(self.streams.items())
+            },
+        }
@@ -0,0 +1,153 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable, TwitchComment
+
+
+class GenerationPreempted(Exception):
+    """Raised inside a generation that was cancelled for a higher-value comment"""
+
+
+class CommentScorer:
+    """
+    Cheap heuristic score in [0, 1] for how worth it a comment is to react to immediately.
+
+    Rewards comments that read like a scene request (imperative verbs,
+    concrete nouns, reasonable length) and penalises bot commands, links,
+    emote spam and repeats of something just seen.
+    """
+
+    REQUEST_WORDS = re.compile(
+        r"\b(make|turn|show|add|put|change|become|transform|give|let|spawn|summon|bring|zoom|"
+        r"fly|explode|rain|dance|melt|grow|switch|go|now)\b",
+        re.IGNORECASE,
+    )
+    LINK = re.compile(r"https?://|www\.", re.IGNORECASE)
+
+    def __init__(self, repeat_window: int = 50):
+        self._recent = deque(maxlen=repeat_window)
+
+    def score(self, comment: TwitchComment) -> float:
+        message = comment.message.strip()
+        if not message or message.startswith("!") or self.LINK.search(message):
+            return 0.0
+
+        words = message.split()
+        normalized = " ".join(word.lower() for word in words)
+        repeated = normalized in self._recent
+        self._recent.append(normalized)
+
+        score = 0.0
+        if 3 <= len(words) <= 25:
+            score += 0.35
+        elif len(words) >= 2:
+            score += 0.15
+        score += min(0.45, 0.25 * len(self.REQUEST_WORDS.findall(message)))
+        letters = sum(char.isalpha() for char in message)
+        score += 0.2 * min(1.0, letters / max(1, len(message)))  # Emote/symbol spam scores low
+        if message.isupper() and len(message) > 10:
+            score -= 0.15
+        if repeated:
+            score -= 0.4
+        return max(0.0, min(1.0, score))
+
+
+class PreemptionController(Monitorable):
+    """
+    Lets a high-value chat comment interrupt the generation in flight.
+
+    The chat listener calls ``on_comment`` for every message. A comment that
+    scores above ``threshold`` (outside the cooldown) becomes the pending
+    reaction and sets the cancel event of the running generation; the
+    generator checks it between denoising steps (local) or while polling
+    the job (fal) and raises ``GenerationPreempted``. The engine then
+    generates a short reaction clip and trims the unplayed buffer so it
+    airs within ``keep_seconds``.
+    """
+
+    def __init__(self, threshold: float = 0.7, cooldown: float = 30.0, keep_seconds: float = 1.0,
+                 reaction_frames: int = 65, scorer: Optional[CommentScorer] = None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.keep_seconds = keep_seconds
+        self.reaction_frames = reaction_frames
+        self.scorer = scorer or CommentScorer()
+        self.enabled = True
+
+        self._lock = threading.Lock()
+        self._cancel_event: Optional[threading.Event] = None
+        self._pending: Optional[TwitchComment] = None
+        self._last_preemption = 0.0
+
+        self.reset_metrics()
+
+    # Called from the chat listener thread
+    def on_comment(self, comment: TwitchComment):
+        if not self.enabled:
+            return
+        score = self.scorer.score(comment)
+        self.comments_scored += 1
+        if score < self.threshold:
+            return
+
+        with self._lock:
+            if time.time() - self._last_preemption < self.cooldown or self._pending is not None:
+                self.suppressed += 1
+                return
+            self._pending = comment
+            self._last_preemption = time.time()
+            self.preemptions += 1
+            if self._cancel_event is not None:
+                self._cancel_event.set()
+        generation_log.info(f"⚡ Preempting for [{comment.username}] {comment.message} (score {score:.2f})")
+
+    # Called from the engine
+    def begin_generation(self) -> threading.Event:
+        """Cancel event for the generation about to start (already set if a reaction is pending)"""
+        event = threading.Event()
+        with self._lock:
+            self._cancel_event = event
+            if self._pending is not None:
+                event.set()
+        return event
+
+    def end_generation(self, cancelled: bool = False):
+        with self._lock:
+            self._cancel_event = None
+        if cancelled:
+            self.cancelled_generations += 1
+
+    def take_pending(self) -> Optional[TwitchComment]:
+        """Pop the comment waiting for a reaction clip, if any"""
+        with self._lock:
+            comment, self._pending = self._pending, None
+        return comment
+
+    def reset_metrics(self):
+        """Reset preemption metrics and drop any pending reaction"""
+        with self._lock:
+            self._pending = None
+            self._cancel_event = None
+            self._last_preemption = 0.0
+        self.comments_scored = 0
+        self.preemptions = 0
+        self.suppressed = 0
+        self.cancelled_generations = 0
+        self.reactions_aired = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get preemption metrics"""
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "comments_scored": self.comments_scored,
+            "preemptions": self.preemptions,
+            "suppressed": self.suppressed,
+            "cancelled_generations": self.cancelled_generations,
+            "reactions_aired": self.reactions_aired,
+            "pending": self._pending is not None,
+        }
@@ -0,0 +1,143 @@
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+
+
+# Highest quality first. Each rung is a set of LTXVideoRequestI2V overrides;
+# LTX needs width/height divisible by 32 and num_frames = 8k + 1.
+DEFAULT_LADDER: List[Dict[str, Any]] = [
+    {"name": "high", "model_type": "ltxv1", "width": 768, "height": 512, "num_frames": 161,
+     "timesteps": [1000, 993, 987, 981, 975, 909, 725, 0.03]},
+    {"name": "medium", "model_type": "ltxv1", "width": 640, "height": 480, "num_frames": 161,
+     "timesteps": [1000, 981, 909, 725, 0.03]},
+    {"name": "low", "model_type": "ltxv1", "width": 512, "height": 384, "num_frames": 121,
+     "timesteps": [1000, 909, 725, 0.03]},
+    {"name": "minimal", "model_type": "ltxv1", "width": 384, "height": 288, "num_frames": 97,
+     "timesteps": [1000, 725, 0.03]},
+]
+
+# Last resort when even the smallest local rung cannot keep up. Sized like the stream output
+# so API clips are not decoded at the minimal rung's size and scaled back up.
+API_FALLBACK_RUNG = {"name": "api", "model_type": "ltxv2-preview", "duration": 6, "width": 640, "height": 480}
+
+
+class QualityLadder(Monitorable):
+    """
+    Keeps generation inside the realtime latency budget by stepping through
+    a ladder of generation configurations.
+
+    The realtime ratio of a clip is its playback time divided by the time it
+    took to generate. The smoothed ratio has to stay at or above
+    ``step_down_ratio`` to keep the current rung. Once it has been above
+    ``step_up_ratio`` for ``patience`` clips, the ladder tries the next better
+    rung. Hysteresis and a cooldown stop it from flapping between two rungs.
+    """
+
+    def __init__(self, fps: float, rungs: Optional[List[Dict[str, Any]]] = None, start_rung: int = 1,
+                 step_down_ratio: float = 1.05, step_up_ratio: float = 1.5, patience: int = 2,
+                 cooldown_clips: int = 3, smoothing: float = 0.5, api_fallback: bool = False):
+        self.fps = fps
+        self.rungs = [dict(rung) for rung in (rungs or DEFAULT_LADDER)]
+        if api_fallback:
+            self.rungs.append(dict(API_FALLBACK_RUNG))
+        self.start_rung = min(start_rung, len(self.rungs) - 1)
+        self.step_down_ratio = step_down_ratio
+        self.step_up_ratio = step_up_ratio
+        self.patience = patience
+        self.cooldown_clips = cooldown_clips
+        self.smoothing = smoothing
+        self.enabled = True
+
+        self.changes: deque = deque(maxlen=20)
+        self.reset()
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        return self.rungs[self.index]
+
+    def overrides(self, rung: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """LTX config overrides for a rung (the current one by default)"""
+        rung = rung if rung is not None else self.current
+        return {key: value for key, value in rung.items() if key != "name"}
+
+    def reset(self, width: Optional[int] = None, height: Optional[int] = None):
+        """Start a new session at the rung matching ``width`` x ``height`` if there is one"""
+        self.index = self.start_rung
+        for index, rung in enumerate(self.rungs):
+            if width and (rung.get("width"), rung.get("height")) == (width, height):
+                self.index = index
+                break
+        self.ratio: Optional[float] = None
+        self.last_ratio: Optional[float] = None
+        self._below = 0
+        self._above = 0
+        self._clips_since_change = 0
+        self.clips_measured = 0
+
+    def record(self, generation_time: float, num_frames: int) -> Optional[Dict[str, Any]]:
+        """Feed a finished clip. Returns new config overrides if the rung changed."""
+        if not self.enabled or generation_time <= 0 or num_frames <= 0:
+            return None
+
+        self.last_ratio = (num_frames / self.fps) / generation_time
+        self.ratio = self.last_ratio if self.ratio is None else \
+            self.ratio + self.smoothing * (self.last_ratio - self.ratio)
+        self.clips_measured += 1
+        self._clips_since_change += 1
+
+        self._below = self._below + 1 if self.ratio < self.step_down_ratio else 0
+        self._above = self._above + 1 if self.ratio > self.step_up_ratio else 0
+
+        if self._below >= self.patience and self.index < len(self.rungs) - 1:
+            return self._move(+1, f"realtime ratio {self.ratio:.2f} < {self.step_down_ratio} "
+                                  f"for {self._below} clips ({generation_time:.1f}s for {num_frames / self.fps:.1f}s of video)")
+
+        if (self._above >= self.patience and self.index > 0
+                and self._clips_since_change >= self.cooldown_clips):
+            return self._move(-1, f"realtime ratio {self.ratio:.2f} > {self.step_up_ratio} for {self._above} clips - headroom")
+
+        return None
+
+    def _move(self, step: int, reason: str) -> Dict[str, Any]:
+        old_rung = self.current
+        self.index += step
+        new_rung = self.current
+
+        self.changes.append({
+            "timestamp": time.time(),
+            "from": old_rung.get("name", self.index - step),
+            "to": new_rung.get("name", self.index),
+            "reason": reason,
+        })
+        direction = "⬇️ Stepping down" if step > 0 else "⬆️ Stepping up"
+        generation_log.info(f"{direction} quality: {old_rung.get('name')} -> {new_rung.get('name')} ({reason})")
+
+        # The ratio was measured on the old rung - start fresh
+        self.ratio = None
+        self._below = 0
+        self._above = 0
+        self._clips_since_change = 0
+        return self.overrides(new_rung)
+
+    def reset_metrics(self):
+        """Reset the session (rung, measurements and change log)"""
+        self.changes.clear()
+        self.reset()
+        print("🧹 Quality ladder metrics reset")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current rung, measured realtime ratio and recent changes"""
+        return {
+            "enabled": self.enabled,
+            "rung": self.current.get("name", self.index),
+            "rung_index": self.index,
+            "rungs": len(self.rungs),
+            "realtime_ratio": round(self.ratio, 2) if self.ratio is not None else None,
+            "last_ratio": round(self.last_ratio, 2) if self.last_ratio is not None else None,
+            "clips_measured": self.clips_measured,
+            "changes": len(self.changes),
+            "recent_changes": list(self.changes)[-5:],
+        }
@@ -1,14 +1,14 @@
 import asyncio
-import base64
-from typing import Dict, Any
-from io import BytesIO
-from PIL import Image
-import requests
+import time
+from collections import deque
+from typing import Dict, Any, List
 
 from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.utils.asset_cache import AssetCache
 
 
-from streaming_pipeline.models import LTXVideoRequestI2V, StreamingState, Monitorable, UserCommentParams
+from streaming_pipeline.models import LTXVideoRequestI2V, StreamingState, Monitorable, UserCommentParams, ClipSegment, ConditioningFrame, VideoClip
 
 
 
@@ -20,9 +20,17 @@ class RealtimeVideoStreamer(Monitorable):
                  realtime_generator,  
                  rtmp_streamer,        
                  text_overlay,          
+                 clip_transition=None,
+                 generation_scheduler=None,
+                 quality_ladder=None,
+                 preemption=None,
+                 tracer=None,
+                 asset_cache=None,
+                 checkpointer=None,
                  comments_lookback: int = 5,
                  initial_prompt: str = None,
-                 initial_image_url: str = None):
+                 initial_image_url: str = None,
+                 stage_queue_size: int = 2):
         
        
         self.twitch_listener = twitch_listener
@@ -30,6 +38,13 @@ class RealtimeVideoStreamer(Monitorable):
         self.realtime_generator = realtime_generator
         self.rtmp_streamer = rtmp_streamer
         self.text_overlay = text_overlay
+        self.clip_transition = clip_transition
+        self.generation_scheduler = generation_scheduler
+        self.quality_ladder = quality_ladder
+        self.preemption = preemption
+        self.tracer = tracer
+        self.asset_cache = asset_cache or AssetCache()  # Memory-only unless one with a cache_dir is injected
+        self.checkpointer = checkpointer
         self.comments_lookback = comments_lookback
         
 
@@ -40,11 +55,25 @@ class RealtimeVideoStreamer(Monitorable):
         self.initial_prompt = initial_prompt
         self.initial_image_url = initial_image_url
         self.next_prompt_ready = None  # Pre-generated prompt
+        self.next_prompt_timing = None  # (start, end) of preparing it plus the LLM call, for tracing
         self.prompt_generation_task = None
         
         # Track generation parameters history (for metrics)
         self.generation_params_history = []
         
+        # Pipeline stages: generate -> post-process -> enqueue to output.
+        # Bounded queues give backpressure; created inside the generation event loop.
+        self.stage_queue_size = stage_queue_size
+        self.postprocess_queue = None
+        self.output_queue = None
+        self.stage_times = {stage: {"last": 0.0, "total": 0.0, "count": 0}
+                            for stage in ("generate", "first_chunk", "postprocess", "output", "state_update")}
+        self.stage_samples = {stage: deque(maxlen=500) for stage in self.stage_times}  # For percentiles
+        self._frames_in_pipeline = 0  # Generated frames not yet in the RTMP ring
+        
+        # Comment-to-air latency: chat timestamp -> first frame of its clip sent to the encoder
+        self.comment_to_air = deque(maxlen=100)
+        
         # Current LTX configuration (starts with defaults, updated from start request)
         self.ltx_config = LTXVideoRequestI2V(
             prompt="",  # Will be set per generation
@@ -63,6 +92,16 @@ class RealtimeVideoStreamer(Monitorable):
         self.ltx_config = LTXVideoRequestI2V(**current_dict)
         print(f"Updated LTX config: {', '.join(f'{k}={v}' for k, v in kwargs.items())}")
     
+    def _ladder_overrides(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Quality rung overrides, leaving a routed ("auto") model choice to the backend router
+        
+        Every rung's model_type is dropped in auto mode - the API rung's would otherwise
+        replace "auto" and turn routing off for the rest of the session.
+        """
+        if self.ltx_config.model_type == "auto":
+            overrides = {key: value for key, value in overrides.items() if key != "model_type"}
+        return overrides
+    
     def start_rtmp_stream(self):
         """Start the injected RTMP stream"""
         if self.rtmp_streamer and not self.rtmp_streamer.is_streaming:
@@ -75,116 +114,56 @@ class RealtimeVideoStreamer(Monitorable):
             self.rtmp_streamer.stop_stream()
             generation_log.info("✅ RTMP stream stopped")
     
-    def _url_to_base64(self, image_url: str) -> str:
-        """Convert image URL to base64 (or return as-is if already base64)"""
+    def _checkpoint_snapshot(self) -> Dict[str, Any]:
+        """Cheap references to the session state for the background checkpoint writer"""
+        config = self.ltx_config.dict(exclude={"prompt", "image_base64", "conditioning_frame"})
+        return {
+            "generation_count": self.state.generation_count,
+            "frame": self.state.current_frame.array,
+            "held_tail": self.clip_transition.held_tail if self.clip_transition else None,
+            "current_prompt": self.state.current_prompt,
+            "previous_prompts": list(self.state.previous_prompts[-self.checkpointer.keep_prompts:]),
+            "mode": self.state.mode,
+            "config": config,
+        }
+    
+    def restore_checkpoint(self, checkpoint: Dict[str, Any]):
+        """Continue a previous session: last frame, prompt history and held transition tail"""
+        self.state.current_frame = ConditioningFrame(checkpoint["frame"])
+        self.state.current_prompt = checkpoint["current_prompt"]
+        self.state.previous_prompts = list(checkpoint["previous_prompts"])
+        self.state.generation_count = checkpoint["generation_count"]
+        self.state.mode = checkpoint.get("mode", self.state.mode)
+        if self.clip_transition and checkpoint.get("held_tail") is not None:
+            self.clip_transition.restore_tail(checkpoint["held_tail"])
+        generation_log.info(f"♻️ Resuming from generation #{self.state.generation_count} "
+                            f"({checkpoint.get('age', 0):.0f}s old): {self.state.current_prompt}")
+    
+    def _load_initial_frame(self, image_url: str) -> ConditioningFrame:
+        """Initial image (URL, data URL or raw base64) as a frame at the configured generation size"""
         try:
-            # Check if input is already base64 data URL
-            if image_url.startswith('data:image'):
-                print("🎯 Input is already base64 data URL, extracting base64 part...")
-                # Extract base64 part after the comma
-                base64_part = image_url.split(',')[1] if ',' in image_url else image_url
-                
-                # Validate and resize the base64 image
-                try:
-                    image_data = base64.b64decode(base64_part)
-                    img = Image.open(BytesIO(image_data)).convert("RGB")
-                    
-                    # Get default dimensions from the Pydantic model
-                    temp_request = LTXVideoRequestI2V(prompt="temp", image_base64="temp")
-                    width, height = temp_request.width, temp_request.height
-                    
-                    # Resize to match generation dimensions
-                    img = img.resize((width, height))
-                    
-                    # Re-encode to ensure consistent format
-                    buffer = BytesIO()
-                    img.save(buffer, format='JPEG', quality=95)
-                    buffer.seek(0)
-                    
-                    return base64.b64encode(buffer.read()).decode('utf-8')
-                    
-                except Exception as e:
-                    print(f"❌ Failed to process base64 image: {e}")
-                    raise ValueError(f"Invalid base64 image data: {e}")
-            
-            # Check if input is raw base64 (without data URL prefix)
-            elif self._is_base64_string(image_url):
-                print("🎯 Input appears to be raw base64, processing...")
-                try:
-                    image_data = base64.b64decode(image_url)
-                    img = Image.open(BytesIO(image_data)).convert("RGB")
-                    
-                    # Get default dimensions and resize
-                    temp_request = LTXVideoRequestI2V(prompt="temp", image_base64="temp")
-                    width, height = temp_request.width, temp_request.height
-                    img = img.resize((width, height))
-                    
-                    # Re-encode
-                    buffer = BytesIO()
-                    img.save(buffer, format='JPEG', quality=95)
-                    buffer.seek(0)
-                    
-                    return base64.b64encode(buffer.read()).decode('utf-8')
-                    
-                except Exception as e:
-                    print(f"❌ Failed to process raw base64: {e}")
-                    # Fall back to treating as URL
-            
-            # Regular URL - download and convert
-            print(f"🌐 Downloading image from URL: {image_url[:100]}...")
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Get default dimensions from the Pydantic model
-            temp_request = LTXVideoRequestI2V(prompt="temp", image_base64="temp")
-            width, height = temp_request.width, temp_request.height
-            
-            # Open image and resize to match generation dimensions
-            img = Image.open(BytesIO(response.content)).convert("RGB")
-            img = img.resize((width, height))
-            
-            # Convert to base64
-            buffer = BytesIO()
-            img.save(buffer, format='JPEG', quality=95)
-            buffer.seek(0)
-            
-            return base64.b64encode(buffer.read()).decode('utf-8')
-            
+            frame = self.asset_cache.get_frame(image_url, self.ltx_config.width, self.ltx_config.height)
         except Exception as e:
-            raise ValueError(f"Failed to load initial image from {image_url}: {e}")
+            raise ValueError(f"Failed to load initial image from {image_url[:100]}: {e}")
+        print(f"🖼️ Initial image ready in {self.asset_cache.last_lookup_time * 1000:.0f}ms "
+              f"({self.ltx_config.width}x{self.ltx_config.height})")
+        return ConditioningFrame(frame)
     
-    def _is_base64_string(self, s: str) -> bool:
-        """Check if a string is valid base64"""
-        try:
-            # Basic checks
-            if len(s) < 100:  # Too short to be a meaningful image
-                return False
-            if not s.replace('+', '').replace('/', '').replace('=', '').isalnum():
-                return False
-            
-            # Try to decode
-            decoded = base64.b64decode(s, validate=True)
-            
-            # Check if it starts with common image file signatures
-            image_signatures = [
-                b'\xff\xd8\xff',  # JPEG
-                b'\x89PNG\r\n\x1a\n',  # PNG
-                b'GIF87a',  # GIF87a
-                b'GIF89a',  # GIF89a
-                b'RIFF',  # WEBP (starts with RIFF)
-            ]
-            
-            return any(decoded.startswith(sig) for sig in image_signatures)
-            
-        except Exception:
+    def _can_decode_into_ring(self, request_dict: Dict[str, Any]) -> bool:
+        """Whether an API clip can skip the frame list and be decoded straight into the RTMP ring.
+        
+        Only when nothing needs to touch the frames in between: no overlay text
+        and no clip transition.
+        """
+        if request_dict.get("model_type") != "ltxv2-preview":
             return False
-    
-    def _frame_to_base64(self, frame: Image.Image) -> str:
-        """Convert PIL Image frame to base64"""
-        buffer = BytesIO()
-        frame.save(buffer, format='JPEG', quality=95)
-        buffer.seek(0)
-        return base64.b64encode(buffer.read()).decode('utf-8')
+        if not self.rtmp_streamer or not hasattr(self.rtmp_streamer, "add_encoded_clip"):
+            return False
+        if self.text_overlay and self.text_overlay.current_text:
+            return False
+        if self.clip_transition and self.clip_transition.mode != "none":
+            return False
+        return True
     
     def start_streaming(self):
         """Start the realtime streaming process"""
@@ -192,11 +171,16 @@ class RealtimeVideoStreamer(Monitorable):
             print("⚠️ Already running")
             return
         
-        # Auto-set initial state if not already set
-        if not self.state.current_frame_base64:
-            print(f"🖼️ Loading initial image from: {self.initial_image_url}")
-            initial_image_base64 = self._url_to_base64(self.initial_image_url)
-            self.state.current_frame_base64 = initial_image_base64
+        # Adaptive quality owns resolution/steps/length - start on the rung matching the configured size
+        if self.quality_ladder and self.quality_ladder.enabled:
+            self.quality_ladder.reset(self.ltx_config.width, self.ltx_config.height)
+            generation_log.info(f"🪜 Adaptive quality on - starting at rung '{self.quality_ladder.current.get('name')}'")
+            self.update_ltx_config(**self._ladder_overrides(self.quality_ladder.overrides()))
+        
+        # Auto-set initial state if not already set (cached, so restarts with the same image are instant)
+        if self.state.current_frame is None:
+            print(f"🖼️ Loading initial image from: {self.initial_image_url[:100]}")
+            self.state.current_frame = self._load_initial_frame(self.initial_image_url)
             self.state.current_prompt = self.initial_prompt
             self.state.previous_prompts = [self.initial_prompt]
         
@@ -207,6 +191,8 @@ class RealtimeVideoStreamer(Monitorable):
         self.start_rtmp_stream()
         
         self.state.is_running = True
+        if self.preemption and hasattr(self.twitch_listener, 'add_comment_callback'):
+            self.twitch_listener.add_comment_callback(self.preemption.on_comment)
         self.twitch_listener.start_listening()
         
         # Start the generation loop in a separate thread
@@ -229,6 +215,8 @@ class RealtimeVideoStreamer(Monitorable):
         # Stop Twitch listener
         if self.twitch_listener:
             self.twitch_listener.stop_listening()
+            if self.preemption and hasattr(self.twitch_listener, 'remove_comment_callback'):
+                self.twitch_listener.remove_comment_callback(self.preemption.on_comment)
         
         # Stop RTMP stream
         self.stop_rtmp_stream()
@@ -240,14 +228,25 @@ class RealtimeVideoStreamer(Monitorable):
             if self.generation_thread.is_alive():
                 print("⚠️ Generation thread did not stop gracefully")
         
+        # Persist the final state before it is cleared (a later start can resume from it)
+        if self.checkpointer:
+            self.checkpointer.flush()
+        
         # Clear all context and state for fresh restart
         print("🧹 Clearing context and state...")
-        self.state.current_frame_base64 = ""
+        self.state.current_frame = None
         self.state.current_prompt = ""
         self.state.generation_count = 0
         self.state.previous_prompts = []
         self.next_prompt_ready = None
+        self.next_prompt_timing = None
         self.prompt_generation_task = None
+        for timing in self.stage_times.values():
+            timing.update(last=0.0, total=0.0, count=0)
+        for samples in self.stage_samples.values():
+            samples.clear()
+        self._frames_in_pipeline = 0
+        self.comment_to_air.clear()
         
         # Reset metrics on all components
         if hasattr(self.prompt_generator, 'reset_metrics'):
@@ -256,14 +255,194 @@ class RealtimeVideoStreamer(Monitorable):
             self.realtime_generator.reset_metrics()
         if hasattr(self.text_overlay, 'reset_metrics'):
             self.text_overlay.reset_metrics()
+        if hasattr(self.clip_transition, 'reset_metrics'):
+            self.clip_transition.reset_metrics()
+        if hasattr(self.generation_scheduler, 'reset_metrics'):
+            self.generation_scheduler.reset_metrics()
+        if hasattr(self.quality_ladder, 'reset_metrics'):
+            self.quality_ladder.reset_metrics()
+        if hasattr(self.preemption, 'reset_metrics'):
+            self.preemption.reset_metrics()
+        if hasattr(self.tracer, 'reset_metrics'):
+            self.tracer.reset_metrics()
         # Note: RTMP streamer resets itself in stop_stream()
         
         generation_log.info("✅ Realtime video streaming stopped and context cleared")
 
     def _run_generation_loop(self):
         """Run the async generation loop in a new event loop"""
-        import asyncio
-        asyncio.run(self._generation_loop())  # This properly runs the async function
+        asyncio.run(self._run_pipeline())  # This properly runs the async function
+    
+    async def _run_pipeline(self):
+        """Run the generate stage with the post-process and output stages alongside it"""
+        self.postprocess_queue = asyncio.Queue(maxsize=self.stage_queue_size)
+        self.output_queue = asyncio.Queue(maxsize=self.stage_queue_size)
+        workers = [
+            asyncio.create_task(self._postprocess_stage()),
+            asyncio.create_task(self._output_stage()),
+        ]
+        try:
+            await self._generation_loop()
+        finally:
+            # Sentinel drains the stages in order
+            await self.postprocess_queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    def _buffered_frames(self) -> int:
+        """Generated frames not yet played: ring contents plus frames still in the stages"""
+        frame_buffer = getattr(self.rtmp_streamer, "frame_buffer", None)
+        return (len(frame_buffer) if frame_buffer is not None else 0) + self._frames_in_pipeline
+    
+    def _record_stage_time(self, stage: str, duration: float):
+        timing = self.stage_times[stage]
+        timing["last"] = duration
+        timing["total"] += duration
+        timing["count"] += 1
+        self.stage_samples[stage].append(duration)
+    
+    async def _hand_off(self, segment: ClipSegment):
+        """Queue a segment for post-processing; blocks only when the later stages are backed up"""
+        self._frames_in_pipeline += segment.pipeline_frames
+        segment.stage_entered = time.time()
+        await self.postprocess_queue.put(segment)
+    
+    async def _postprocess_stage(self):
+        """Stage 2: overlay + clip transition, off the generation critical path"""
+        while True:
+            segment = await self.postprocess_queue.get()
+            if segment is None:
+                await self.output_queue.put(None)
+                return
+            
+            start_time = time.time()
+            if segment.trace:
+                segment.trace.add_span("postprocess_queue", segment.stage_entered, start_time)
+            try:
+                if segment.frames and self.state.is_running:
+                    segment.frames = await asyncio.to_thread(self._postprocess_frames, segment)
+                    self._record_stage_time("postprocess", time.time() - start_time)
+                    if segment.trace:
+                        segment.trace.add_span("postprocess", start_time, time.time())
+            except Exception as e:
+                generation_log.error(f"❌ Post-processing failed for clip #{segment.generation_id}: {e}")
+            
+            segment.stage_entered = time.time()
+            await self.output_queue.put(segment)
+    
+    def _postprocess_frames(self, segment: ClipSegment):
+        generation_log.info(f"📺 PROCESSING {len(segment.frames)} frames with overlay...")
+        
+        # Apply the text captured for this clip (the live text may already belong to the next one)
+        # The segment owns its clip, so overlay and blend write into it instead of copying
+        frames = self.text_overlay.apply_overlay_batch(segment.frames, text=segment.overlay_text, in_place=True)
+        
+        # Blend the held tail of the previous clip into this clip's head (a later chunk of the
+        # same clip just continues it)
+        if self.clip_transition:
+            frames = self.clip_transition.apply(frames, continuation=segment.continuation)
+        return frames
+    
+    async def _output_stage(self):
+        """Stage 3: hand frames to the RTMP ring (single producer, so clips stay in order)"""
+        while True:
+            segment = await self.output_queue.get()
+            if segment is None:
+                return
+            
+            start_time = time.time()
+            # With a scheduler, a full ring makes this stage wait instead of dropping generated frames
+            block_timeout = self.generation_scheduler.enqueue_timeout if self.generation_scheduler else 0.0
+            on_air = (lambda seg=segment: self._on_clip_aired(seg)) if segment.comment or segment.trace else None
+            processed_count = 0
+            if segment.trace:
+                segment.trace.add_span("output_queue", segment.stage_entered, start_time)
+            # First frames land in the ring right away; "buffered" runs from here until one airs
+            segment.stage_entered = start_time
+            try:
+                if segment.preempt and self.state.is_running:
+                    # Reaction clip: drop what has not played yet so it airs almost immediately
+                    self.rtmp_streamer.trim_buffer(self.preemption.keep_seconds)
+                
+                if not self.state.is_running:
+                    generation_log.info("🛑 Stopping detected - skipping frame streaming")
+                elif segment.decode_into_ring and (segment.video_source or segment.video_url):
+                    generation_log.info(f"📺 DECODING clip straight into RTMP ring...")
+                    loop = asyncio.get_running_loop()
+
+                    def last_frame_decoded(frame, seg=segment):
+                        # The next generation can start before the clip has fit into the ring
+                        seg.last_frame = frame
+                        loop.call_soon_threadsafe(seg.last_frame_ready.set)
+
+                    processed_count, _ = await asyncio.to_thread(
+                        self.rtmp_streamer.add_encoded_clip, segment.video_source or segment.video_url,
+                        block_timeout=block_timeout, on_air=on_air, on_last_frame=last_frame_decoded
+                    )
+                    generation_log.info(f"📺 RTMP processed: {processed_count} frames")
+                elif self.rtmp_streamer and segment.frames:
+                    generation_log.info(f"📺 SENDING {len(segment.frames)} frames to RTMP streamer...")
+                    processed_count = await asyncio.to_thread(
+                        self.rtmp_streamer.add_frame_batch, segment.frames,
+                        block_timeout=block_timeout, on_air=on_air, clip_start=not segment.continuation
+                    )
+                    generation_log.info(f"📺 RTMP processed: {processed_count}/{len(segment.frames)} frames")
+                elif not self.rtmp_streamer:
+                    generation_log.error("❌ NO FRAME STREAMER SET!")
+                else:
+                    generation_log.error("❌ NO FRAMES IN VIDEO RESULT!")
+                self._record_stage_time("output", time.time() - start_time)
+            except Exception as e:
+                generation_log.error(f"❌ Output stage failed for clip #{segment.generation_id}: {e}")
+            finally:
+                # Frames are no longer needed - let them be freed while the next clip generates
+                self._frames_in_pipeline -= segment.pipeline_frames
+                segment.frames = None
+                if segment.video_source is not None:
+                    # A dropped/skipped clip still has its download open (a no-op after a decode)
+                    segment.video_source.close()
+                    segment.video_source = None
+                segment.last_frame_ready.set()
+                if segment.trace:
+                    self._clip_enqueued(segment, start_time, processed_count)
+    
+    def _on_clip_aired(self, segment: ClipSegment):
+        """Called on the stream thread when a clip's first frame is handed to the encoder"""
+        aired_at = time.time()
+        if segment.comment:
+            latency = aired_at - segment.comment.timestamp
+            self.comment_to_air.append(latency)
+            if segment.preempt and self.preemption:
+                self.preemption.reactions_aired += 1
+            generation_log.info(f"📡 [{segment.comment.username}] on air {latency:.1f}s after the comment"
+                                f"{' (reaction)' if segment.preempt else ''}")
+        if segment.trace:
+            segment.trace.add_span("buffered", segment.stage_entered, aired_at)
+            segment.aired_at = aired_at
+            # Can air while the rest of the clip is still being written - the later of the two closes the trace
+            if segment.enqueued:
+                self.tracer.finish(segment.trace, at=aired_at)
+    
+    def _clip_enqueued(self, segment: ClipSegment, start_time: float, processed_count: int):
+        segment.trace.add_span("enqueue", start_time, time.time())
+        segment.enqueued = True
+        if segment.aired_at is not None:
+            self.tracer.finish(segment.trace, at=segment.aired_at)
+        elif not processed_count:
+            self.tracer.finish(segment.trace, outcome="dropped" if self.state.is_running else "stopped")
+    
+    def _comment_to_air_status(self) -> Dict[str, Any]:
+        latencies = list(self.comment_to_air)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "last": round(latencies[-1], 1),
+            "avg": round(sum(latencies) / len(latencies), 1),
+            "max": round(max(latencies), 1),
+        }
+    
+    def _reaction_pending(self) -> bool:
+        return bool(self.preemption and self.preemption.get_status()["pending"])
     
     async def _generation_loop(self):
         """Continuous generation loop with no gaps"""
@@ -272,6 +451,23 @@ class RealtimeVideoStreamer(Monitorable):
         
         while self.state.is_running:
             try:
+                # A preempting comment skips the queue: short reaction clip right now
+                reaction = self.preemption.take_pending() if self.preemption and not first_generation else None
+                if reaction:
+                    await self._generate_next_video(reaction_comment=reaction)
+                    continue
+                
+                # Hold off while the buffer is above the high watermark (prompt is prepared afterwards,
+                # so it still sees the latest chat)
+                if self.generation_scheduler and not first_generation:
+                    await self.generation_scheduler.wait_until_needed(
+                        self._buffered_frames, lambda: self.state.is_running and not self._reaction_pending()
+                    )
+                    if not self.state.is_running:
+                        break
+                    if self._reaction_pending():
+                        continue
+                
                 # For first generation, don't start prompt generation task
                 if not first_generation:
                     # Start prompt generation for NEXT video (in parallel)
@@ -312,17 +508,19 @@ class RealtimeVideoStreamer(Monitorable):
         print(f"   📝 Previous prompts: {len(self.state.previous_prompts)}")
         if self.state.previous_prompts:
             print(f"   📝 Last prompt: {self.state.previous_prompts[-1]}")
-        print(f"   🖼️ Visual context: {'✅ Available' if self.state.current_frame_base64 else '❌ None'}")
+        print(f"   🖼️ Visual context: {'✅ Available' if self.state.current_frame is not None else '❌ None'}")
         print(f"   💬 Recent comments: {len(comments)}")
         for i, comment in enumerate(comments):
             print(f"   💬 [{comment.username}]: {comment.message}")
         
         # Generate prompt with visual context (pass state directly)
+        prompt_start = time.time()
         prompt_result = await asyncio.to_thread(
             self.prompt_generator.generate_prompt, 
             comments, 
             self.state  # Pass unified state instead of separate context
         )
+        self.next_prompt_timing = self._prompt_timing(prompt_start)
         
         # Log LLM output details
         print(f"🤖 LLM OUTPUT:")
@@ -336,20 +534,58 @@ class RealtimeVideoStreamer(Monitorable):
         self.next_prompt_ready = prompt_result
         return prompt_result
     
-    async def _generate_next_video(self, use_initial_prompt=False):
-        """Generate video using pre-prepared prompt or initial prompt for first generation"""
+    def _prompt_timing(self, prompt_start: float) -> Dict[str, Any]:
+        """Span times of the prompt call that just finished (LLM call only if it was this one)"""
+        prompt_end = time.time()
+        llm = getattr(self.prompt_generator, "last_call_span", None)
+        if llm and not prompt_start <= llm[0] <= prompt_end:
+            llm = None
+        return {"prompt": (prompt_start, prompt_end), "llm": llm}
+    
+    def _start_trace(self, comment, prompt_timing, reaction: bool):
+        if not self.tracer:
+            return None
+        trace = self.tracer.start_trace(self.state.generation_count + 1, comment=comment, reaction=reaction)
+        if trace and prompt_timing:
+            prompt_start, prompt_end = prompt_timing["prompt"]
+            if comment:
+                trace.add_span("chat_wait", comment.timestamp, prompt_start)
+            trace.add_span("prompt", prompt_start, prompt_end)
+            if prompt_timing["llm"]:
+                trace.add_span("llm", *prompt_timing["llm"])
+        return trace
+    
+    async def _generate_next_video(self, use_initial_prompt=False, reaction_comment=None):
+        """Generate video using pre-prepared prompt or initial prompt for first generation
+        
+        ``reaction_comment`` generates a short reaction clip for a preempting comment.
+        """
         
         # Track whether a user comment was used for dynamic parameter adjustment
         used_comment = False
         
-        if use_initial_prompt:
+        if reaction_comment:
+            generation_log.info(f"⚡ Generation #{self.state.generation_count + 1} (REACTION)")
+            prompt_start = time.time()
+            prompt_result = await asyncio.to_thread(
+                self.prompt_generator.generate_prompt, [reaction_comment], self.state
+            )
+            prompt_timing = self._prompt_timing(prompt_start)
+            prompt_to_use = prompt_result.prompt
+            selected_comment = reaction_comment
+            used_comment = True
+            generation_log.info(f"📝 Reaction prompt: {prompt_to_use}")
+            self.text_overlay.set_comment(reaction_comment.message, reaction_comment.username)
+        
+        elif use_initial_prompt:
             # For the FIRST generation, use the initial prompt directly
-            generation_log.info(f"🎬 Generation #1 (INITIAL)")
+            generation_log.info(f"🎬 Generation #{self.state.generation_count + 1} (INITIAL)")
             generation_log.info(f"📝 Using initial prompt: {self.state.current_prompt}")
             
             prompt_to_use = self.state.current_prompt
             selected_comment = None
             used_comment = False  # Initial prompt is not a user comment
+            prompt_timing = None
             
             # Show initial prompt on overlay
             self.text_overlay.set_prompt(prompt_to_use)
@@ -360,6 +596,7 @@ class RealtimeVideoStreamer(Monitorable):
             if self.prompt_generation_task:
                 prompt_result = await self.prompt_generation_task
                 self.prompt_generation_task = None  # Reset for next iteration
+                prompt_timing = self.next_prompt_timing
             else:
                 # Fallback if no pre-generated prompt
                 comments = self.twitch_listener.get_recent_comments(self.comments_lookback)
@@ -370,7 +607,9 @@ class RealtimeVideoStreamer(Monitorable):
                 for comment in comments:
                     print(f"   💬 [{comment.username}]: {comment.message}")
                 
+                prompt_start = time.time()
                 prompt_result = self.prompt_generator.generate_prompt(comments, self.state)
+                prompt_timing = self._prompt_timing(prompt_start)
                 
                 # Log fallback LLM output
                 print(f"🤖 FALLBACK LLM OUTPUT:")
@@ -399,16 +638,20 @@ class RealtimeVideoStreamer(Monitorable):
                 # Show the AI-generated prompt when no comment is selected
                 self.text_overlay.set_prompt(prompt_to_use)
         
+        trace = self._start_trace(selected_comment, prompt_timing, reaction=reaction_comment is not None)
+        handed_off = False  # Once the segment is queued, the output stage closes its trace
+        emitted = []  # Chunks of this clip already handed on (chunked generation)
+        
         # Generate video (same for both initial and subsequent generations)
         try:
-            current_frame_preview = self.state.current_frame_base64[:50] + "..." if self.state.current_frame_base64 else "None"
-            print(f"🎬 Using input frame: {current_frame_preview}")
+            print(f"🎬 Using input frame: {self.state.current_frame!r}")
             
             # Create base request from current configuration
             request_dict = self.ltx_config.dict()
             request_dict.update({
                 "prompt": prompt_to_use,
-                "image_base64": self.state.current_frame_base64
+                "image_base64": "",  # Encoded lazily from the frame only if a backend needs it
+                "conditioning_frame": self.state.current_frame
             })
             
             # Apply user comment parameter overrides if using a comment
@@ -422,6 +665,20 @@ class RealtimeVideoStreamer(Monitorable):
             else:
                 print(f"🌱 Using EVOLUTION mode: guidance={request_dict['guidance_scale']}, strength={request_dict['strength']}")
             
+            # Clip length from the buffer level and measured generation speed (LTX v1 only -
+            # the API models have a fixed duration)
+            if reaction_comment and request_dict.get("model_type") in ("ltxv1", "auto"):
+                # Reaction clips are short so they reach the screen fast
+                request_dict["num_frames"] = self.preemption.reaction_frames
+            elif self.generation_scheduler and request_dict.get("model_type") in ("ltxv1", "auto"):
+                request_dict["num_frames"] = self.generation_scheduler.choose_num_frames(
+                    self._buffered_frames(), request_dict["num_frames"]
+                )
+            
+            # Nothing to draw or blend - let the streamer decode the clip straight into its ring
+            decode_into_ring = self._can_decode_into_ring(request_dict)
+            request_dict["decode_frames"] = not decode_into_ring
+            
             request = LTXVideoRequestI2V(**request_dict)
             
             # Log all LTX parameters being used
@@ -435,7 +692,6 @@ class RealtimeVideoStreamer(Monitorable):
             print(f"   ⏱️ timesteps: {request.timesteps}")
             
             # Store generation parameters in history (last 10)
-            import time
             generation_params = {
                 "timestamp": time.time(),
                 "generation_id": self.state.generation_count + 1,
@@ -452,74 +708,201 @@ class RealtimeVideoStreamer(Monitorable):
             # Keep only last 10 generations
             self.generation_params_history = self.generation_params_history[-10:]
             
-            # Get video result with frames for RTMP streaming
-            video_result = await asyncio.to_thread(
-                self.realtime_generator.generate_video_from_image, 
-                request
-            )
+            # Stage 1: generate (the only stage on the GPU critical path)
+            generate_start = time.time()
+            if trace and prompt_timing:
+                # Prompt was ready before the GPU was free (previous clip, scheduler)
+                trace.add_span("generate_wait", prompt_timing["prompt"][1], generate_start)
+            generate_kwargs = {}
+            if request.chunk_frames:
+                # Chunked generation: each chunk goes down the pipeline while the next one generates
+                generate_kwargs["on_frames"] = self._chunk_handler(
+                    emitted, asyncio.get_running_loop(), generate_start, prompt_to_use,
+                    selected_comment, reaction_comment is not None, trace
+                )
+            if self.preemption and self.preemption.enabled:
+                # A high-value comment can cancel this generation between denoising steps
+                cancel_event = self.preemption.begin_generation()
+                try:
+                    video_result = await asyncio.to_thread(
+                        self.realtime_generator.generate_video_from_image,
+                        request,
+                        cancel_event=cancel_event,
+                        **generate_kwargs
+                    )
+                except GenerationPreempted as e:
+                    self.preemption.end_generation(cancelled=True)
+                    generation_log.info(f"⚡ Generation #{self.state.generation_count + 1} preempted after "
+                                        f"{time.time() - generate_start:.1f}s: {e}"
+                                        + (f" ({len(emitted)} chunks already on their way)" if emitted else ""))
+                    if trace and not emitted:
+                        trace.add_span("generate", generate_start, time.time())
+                        self.tracer.finish(trace, outcome="preempted")
+                    if emitted and self.state.is_running:
+                        # Continue from what actually airs, not from the frame before it
+                        self._advance_state(emitted[-1].last_frame, prompt_to_use)
+                    return
+                self.preemption.end_generation()
+            else:
+                video_result = await asyncio.to_thread(
+                    self.realtime_generator.generate_video_from_image, 
+                    request,
+                    **generate_kwargs
+                )
+            self._record_stage_time("generate", time.time() - generate_start)
+            if trace and not emitted:
+                trace.add_span("generate", generate_start, time.time())
+            # One contiguous array per clip from here to the ring (a no-op for backends that already return one)
+            frames = VideoClip.from_frames(video_result.frames) if video_result.frames is not None \
+                and len(video_result.frames) else None
+            if self.generation_scheduler and frames:
+                self.generation_scheduler.record_generation(time.time() - generate_start, len(frames))
             
-            # Stream frames to external streamer if available - USE BATCH PROCESSING
-            # Check if still running before sending frames
-            if not self.state.is_running:
+            # Step the quality ladder on the measured realtime ratio; applies from the next clip
+            if self.quality_ladder and self.quality_ladder.enabled and frames:
+                generation_time = getattr(self.realtime_generator, "last_generation_time", 0) or (time.time() - generate_start)
+                new_config = self.quality_ladder.record(generation_time, len(frames))
+                if new_config:
+                    self.update_ltx_config(**self._ladder_overrides(new_config))
+            
+            if emitted:
+                # Every chunk is already down the pipeline; the last one carries the conditioning frame
+                segment = emitted[-1]
+                handed_off = True
+            
+            elif not self.state.is_running:
+                # Stopped while generating - nothing to hand on
                 generation_log.info("🛑 Stopping detected - skipping frame streaming")
+                if video_result.video_source is not None:
+                    video_result.video_source.close()
+                if trace:
+                    self.tracer.finish(trace, outcome="stopped")
                 return
-                
-            if self.rtmp_streamer and video_result.frames:
-                generation_log.info(f"📺 PROCESSING {len(video_result.frames)} frames with overlay...")
-                
-                # Apply text overlay to all frames using batch processing
-                overlaid_frames = self.text_overlay.apply_overlay_batch(video_result.frames)
-                
-                generation_log.info(f"📺 SENDING {len(overlaid_frames)} frames to RTMP streamer...")
-                processed_count = self.rtmp_streamer.add_frame_batch(overlaid_frames)
-                generation_log.info(f"📺 RTMP processed: {processed_count}/{len(overlaid_frames)} frames")
-          
-            elif not self.rtmp_streamer:
-                generation_log.error("❌ NO FRAME STREAMER SET!")
-            elif not video_result.frames:
-                generation_log.error("❌ NO FRAMES IN VIDEO RESULT!")
+            
             else:
-                generation_log.error("❌ Unknown frame streaming issue")
+                segment = ClipSegment(
+                    generation_id=self.state.generation_count + 1,
+                    prompt=prompt_to_use,
+                    frames=frames,
+                    video_url=video_result.video_url,
+                    video_source=video_result.video_source,
+                    overlay_text=self.text_overlay.current_text or "",
+                    decode_into_ring=decode_into_ring,
+                    # A copy: post-processing draws into the clip while the next generation is conditioned
+                    last_frame=frames.last_frame() if frames else video_result.last_frame,
+                    pipeline_frames=len(frames) if frames else 0,
+                    comment=selected_comment,
+                    preempt=reaction_comment is not None,
+                    trace=trace,
+                )
+                
+                # Hand off to post-process/output; blocks only when those stages are backed up
+                await self._hand_off(segment)
+                handed_off = True
+            
+            # Direct ring decode produces the last frame in the output stage, as soon as the
+            # clip is decoded (the rest of it may still be waiting for ring space)
+            if segment.last_frame is None and segment.decode_into_ring:
+                await segment.last_frame_ready.wait()
             
-            # Update state with last frame (extract from frames on-demand)
-            # Check if still running before updating state
+            # Stage 4: update state - the next generation starts right after this
             if not self.state.is_running:
                 generation_log.info("🛑 Stopping detected - skipping state update")
                 return
-                
-            # Extract last frame as base64 only when needed
-            if video_result.frames:
-                last_frame_base64 = self._frame_to_base64(video_result.frames[-1])
-            else:
+            
+            if segment.last_frame is None:
                 generation_log.error("❌ No frames in video result for state update")
                 return
-                
-            print(f"🔄 Updating state with new frame from generation #{self.state.generation_count + 1}")
-            old_frame_preview = self.state.current_frame_base64[:50] + "..." if self.state.current_frame_base64 else "None"
-            new_frame_preview = last_frame_base64[:50] + "..."
-            print(f"   Old frame: {old_frame_preview}")
-            print(f"   New frame: {new_frame_preview}")
             
-            self.state.current_frame_base64 = last_frame_base64
-            self.state.current_prompt = prompt_to_use
-            self.state.generation_count += 1
-            self.state.previous_prompts.append(prompt_to_use)
-            
-            generation_log.info(f"✅ Generated video #{self.state.generation_count}")
+            self._advance_state(segment.last_frame, prompt_to_use)
+            segment.last_frame = None
             # No delay - immediately ready for next generation!
             
         except Exception as e:
             generation_log.error(f"❌ Video generation failed: {e}")
+            if trace and not handed_off and not emitted:
+                self.tracer.finish(trace, outcome="failed")
+            if emitted and self.state.is_running:
+                self._advance_state(emitted[-1].last_frame, prompt_to_use)
             raise
     
+    def _chunk_handler(self, emitted: List[ClipSegment], loop, generate_start: float, prompt: str,
+                       comment, preempt: bool, trace):
+        """``on_frames`` callback for chunked generation, called on the generator thread per chunk
+        
+        Each chunk becomes its own segment. The first carries the clip's comment,
+        preemption and trace; the rest are continuations, so the transition and
+        keyframe logic treat them as the same clip.
+        """
+        overlay_text = self.text_overlay.current_text or ""
+        
+        def on_frames(chunk):
+            frames = VideoClip.from_frames(chunk)
+            first = not emitted
+            if first:
+                self._record_stage_time("first_chunk", time.time() - generate_start)
+                if trace:
+                    trace.add_span("generate", generate_start, time.time())
+            segment = ClipSegment(
+                generation_id=self.state.generation_count + 1,
+                prompt=prompt,
+                frames=frames,
+                overlay_text=overlay_text,
+                continuation=not first,
+                last_frame=frames.last_frame(),
+                pipeline_frames=len(frames),
+                comment=comment if first else None,
+                preempt=preempt and first,
+                trace=trace if first else None,
+            )
+            emitted.append(segment)
+            # Waits while the later stages are backed up, which holds the next chunk back too
+            asyncio.run_coroutine_threadsafe(self._hand_off(segment), loop).result()
+        
+        return on_frames
+    
+    def _advance_state(self, last_frame, prompt: str):
+        """Make the clip's last frame the next conditioning frame"""
+        update_start = time.time()
+        new_frame = ConditioningFrame(last_frame)
+        
+        print(f"🔄 Updating state with new frame from generation #{self.state.generation_count + 1}")
+        print(f"   Old frame: {self.state.current_frame!r}")
+        print(f"   New frame: {new_frame!r}")
+        
+        self.state.current_frame = new_frame
+        self.state.current_prompt = prompt
+        self.state.generation_count += 1
+        self.state.previous_prompts.append(prompt)
+        if self.checkpointer:
+            self.checkpointer.submit(self._checkpoint_snapshot())  # Written in the background
+        self._record_stage_time("state_update", time.time() - update_start)
+        
+        generation_log.info(f"✅ Generated video #{self.state.generation_count}")
+    
     def get_status(self) -> Dict[str, Any]:
         """Get video generation orchestration status"""
         return {
             "is_running": self.state.is_running,
             "generation_count": self.state.generation_count,
             "current_prompt": self.state.current_prompt[:50] + "..." if len(self.state.current_prompt) > 50 else self.state.current_prompt,
-            "generation_params_history": self.generation_params_history
+            "generation_params_history": self.generation_params_history,
+            "pipeline": self._pipeline_status(),
+            "comment_to_air": self._comment_to_air_status()
+        }
+    
+    def _pipeline_status(self) -> Dict[str, Any]:
+        """Per-stage queue depths and timings"""
+        status = {
+            "postprocess_queue": self.postprocess_queue.qsize() if self.postprocess_queue else 0,
+            "output_queue": self.output_queue.qsize() if self.output_queue else 0,
+            "frames_in_pipeline": self._frames_in_pipeline,
+            "queue_capacity": self.stage_queue_size,
         }
+        for stage, timing in self.stage_times.items():
+            status[f"{stage}_last"] = round(timing["last"], 3)
+            status[f"{stage}_avg"] = round(timing["total"] / max(1, timing["count"]), 3)
+        return status
 
 
 
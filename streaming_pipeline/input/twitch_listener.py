@@ -26,6 +26,16 @@ class TwitchChatListener(Monitorable):
         self.comment_queue = Queue(maxsize=100)
         self.is_listening = False
         self._thread = None
+        self._comment_callbacks = []  # Called on the listener thread for every comment
+        
+    def add_comment_callback(self, callback):
+        """Register ``callback(comment)`` to see every comment as it arrives (must be fast)"""
+        if callback not in self._comment_callbacks:
+            self._comment_callbacks.append(callback)
+    
+    def remove_comment_callback(self, callback):
+        if callback in self._comment_callbacks:
+            self._comment_callbacks.remove(callback)
         
     def start_listening(self):
         """Start listening to Twitch chat"""
@@ -114,6 +124,9 @@ class TwitchChatListener(Monitorable):
             if not self.comment_queue.full():
                 self.comment_queue.put(comment)
                 # print(f"[{user_part}]: {chat_message}")  # Comment this out
+            
+            for callback in list(self._comment_callbacks):
+                callback(comment)
                 
         except Exception as e:
             print(f"Error processing message: {e}")
@@ -6,11 +6,15 @@ This package contains all data models organized by domain:
 - twitch: Twitch chat and user interaction models  
 - video: Video generation request/response models
 - streaming: Core streaming state and context models
+- frame: In-memory conditioning frame handle
+- clip: Generated clip as one contiguous frame array
 - api: HTTP API request/response models
 """
 
 # Import all models for backward compatibility
 from .base import Monitorable
+from .frame import ConditioningFrame
+from .clip import VideoClip
 from .twitch import TwitchComment, UserCommentParams
 from .video import (    
     LTXVideoRequestI2V,
@@ -23,15 +27,20 @@ from .streaming import (
     GenerationRequest,
     StreamFrame,
     StreamingState,
-    GenerationResult
+    GenerationResult,
+    ClipSegment
 )
-from .api import StartStreamRequest
+from .api import StartStreamRequest, StopStreamRequest, StreamMetricsRequest
 
 # Export all models
 __all__ = [
     # Base
     'Monitorable',
     
+    # Frames
+    'ConditioningFrame',
+    'VideoClip',
+    
     # Twitch
     'TwitchComment',
     'UserCommentParams',
@@ -48,7 +57,10 @@ __all__ = [
     'StreamFrame',
     'StreamingState',
     'GenerationResult',
+    'ClipSegment',
     
     # API
     'StartStreamRequest',
+    'StopStreamRequest',
+    'StreamMetricsRequest',
 ]
@@ -4,11 +4,18 @@ from pydantic import BaseModel, Field
 
 class StartStreamRequest(BaseModel):
     # Model Selection
-    model: Optional[Literal["ltxv1", "ltxv2-preview"]] = Field(default="ltxv1", description="Which model to use for generation")
+    model: Optional[Literal["ltxv1", "ltxv2-preview", "auto"]] = Field(default="ltxv1", description="Which model to use for generation ('auto' routes each clip to the backend most likely to be on time)")
+    
+    # Stream selection - several streams can share the one loaded model
+    stream_id: Optional[str] = Field(default=None, description="Stream to start ('default' if omitted); a new id creates a new stream")
+    twitch_channel: Optional[str] = Field(default=None, description="Chat channel for this stream (TWITCH_CHANNEL if omitted)")
+    stream_key: Optional[str] = Field(default=None, description="Twitch stream key for this stream (required for a new stream)")
+    stream_weight: Optional[float] = Field(default=1.0, description="Share of GPU time relative to other streams")
     
     # Basic stream configuration
     initial_prompt: Optional[str] = Field(default=None, description="Custom initial prompt for the stream")
     initial_image_url: Optional[str] = Field(default=None, description="Custom initial image URL for the stream")
+    resume: Optional[bool] = Field(default=False, description="Continue from the last session checkpoint (frame, prompt history, config) if there is one")
     
     # LTX Model Parameters (matching LTXVideoRequestI2V)
     negative_prompt: Optional[str] = Field(default="worst quality, inconsistent motion, blurry, jittery, distorted", description="The negative prompt")
@@ -18,6 +25,8 @@ class StartStreamRequest(BaseModel):
     strength: Optional[float] = Field(default=1.0, description="How much to follow the input image")
     guidance_scale: Optional[float] = Field(default=3.0, description="The guidance scale")
     timesteps: Optional[List[float]] = Field(default=[1000, 981, 909, 725, 0.03], description="The timesteps to use")
+    chunk_frames: Optional[int] = Field(default=None, description="Generate ltxv1 clips in temporal chunks of this many frames (8k+1) and air each as it completes (0 turns chunking off)")
+    chunk_overlap: Optional[int] = Field(default=None, description="Tail frames of the previous chunk that condition the next one (8k+1, default 9)")
     
     # LTXv2-specific parameters
     duration: Optional[Literal[6, 8]] = Field(default=None, description="Duration for ltxv2 (6 or 8 seconds)")
@@ -28,3 +37,27 @@ class StartStreamRequest(BaseModel):
     # Streaming Configuration
     target_fps: Optional[float] = Field(default=9.0, description="Target streaming FPS")
     mode: Optional[str] = Field(default="regular", description="Generation mode: 'regular' or 'nightmare'")
+    
+    # Buffer watermarks (generation pacing)
+    low_watermark_seconds: Optional[float] = Field(default=8.0, description="Buffered playback seconds below which generation hurries (shorter clips)")
+    high_watermark_seconds: Optional[float] = Field(default=20.0, description="Buffered playback seconds above which generation waits")
+    
+    # Adaptive quality and preemption
+    adaptive_quality: Optional[bool] = Field(default=False, description="Step resolution/timesteps/num_frames (and backend) to keep generation faster than playback")
+    preemption: Optional[bool] = Field(default=False, description="Let high-value chat comments cancel the clip in flight and air a short reaction clip")
+    preemption_threshold: Optional[float] = Field(default=None, description="Comment score (0-1) needed to preempt")
+    
+    # Output fan-out (single encode, tee muxer)
+    extra_rtmp_urls: Optional[List[str]] = Field(default=None, description="Additional RTMP endpoints fed by the same encode")
+    record_path: Optional[str] = Field(default=None, description="Local .mp4/.flv recording of the stream")
+    low_rendition_url: Optional[str] = Field(default=None, description="RTMP endpoint for a second low-resolution rendition")
+    low_rendition_height: Optional[int] = Field(default=240, description="Height of the low-resolution rendition")
+    encoder_backend: Optional[str] = Field(default="subprocess", description="'subprocess' (ffmpeg process) or 'pyav' (in-process libx264, single sink)")
+
+
+class StopStreamRequest(BaseModel):
+    stream_id: Optional[str] = Field(default=None, description="Stream to stop (all streams if omitted)")
+
+
+class StreamMetricsRequest(BaseModel):
+    stream_id: Optional[str] = Field(default=None, description="Stream to report ('default' if omitted)")
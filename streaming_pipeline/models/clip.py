@@ -0,0 +1,92 @@
+from typing import Iterator, List, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class VideoClip:
+    """
+    A generated clip as one contiguous (N, H, W, 3) uint8 RGB array.
+
+    Overlay, transitions and the RTMP ring work on ``array`` in batch, so a
+    clip is never split into per-frame PIL images. Indexing gives an HxWx3
+    view of one frame, slicing a VideoClip view of several. Build one with
+    ``from_frames`` from whatever a backend returns (PIL list, list of arrays,
+    float array in [0, 1]). PIL is only produced at the edges, by ``image``.
+    """
+
+    def __init__(self, array: np.ndarray):
+        if array.ndim != 4 or array.shape[-1] != 3 or array.dtype != np.uint8:
+            raise ValueError(f"VideoClip needs an (N, H, W, 3) uint8 array, got {array.shape} {array.dtype}")
+        self.array = array
+
+    @classmethod
+    def from_frames(cls, frames: Union["VideoClip", np.ndarray, List]) -> "VideoClip":
+        """Wrap/convert backend output; an existing VideoClip or uint8 array is not copied"""
+        if isinstance(frames, VideoClip):
+            return frames
+        if isinstance(frames, np.ndarray):
+            if frames.dtype != np.uint8:
+                # Float frames in [0, 1] (diffusers output_type="np")
+                frames = np.rint(np.clip(frames, 0.0, 1.0) * 255.0).astype(np.uint8)
+            return cls(np.ascontiguousarray(frames))
+
+        first = cls._rgb(frames[0])
+        array = np.empty((len(frames),) + first.shape, dtype=np.uint8)
+        array[0] = first
+        for index in range(1, len(frames)):
+            array[index] = cls._rgb(frames[index])
+        return cls(array)
+
+    @staticmethod
+    def _rgb(frame) -> np.ndarray:
+        if isinstance(frame, Image.Image) and frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        return np.asarray(frame)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return VideoClip(self.array[index])
+        return self.array[index]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.array)
+
+    @property
+    def width(self) -> int:
+        return self.array.shape[2]
+
+    @property
+    def height(self) -> int:
+        return self.array.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    def copy(self) -> "VideoClip":
+        return VideoClip(self.array.copy())
+
+    def last_frame(self) -> np.ndarray:
+        """Copy of the last frame, safe to keep while the clip is modified in place"""
+        return self.array[-1].copy()
+
+    def image(self, index: int) -> Image.Image:
+        """One frame as a PIL image (for the few consumers that need PIL)"""
+        return Image.fromarray(self.array[index])
+
+    def resized(self, width: int, height: int) -> "VideoClip":
+        """This clip at ``width`` x ``height`` (self if already that size), resized into one new array"""
+        if (self.width, self.height) == (width, height):
+            return self
+        out = np.empty((len(self), height, width, 3), dtype=np.uint8)
+        for frame, dst in zip(self.array, out):
+            cv2.resize(frame, (width, height), dst=dst)
+        return VideoClip(out)
+
+    def __repr__(self) -> str:
+        return f"VideoClip({len(self)} x {self.width}x{self.height}, {self.nbytes / 1024**2:.0f} MB)"
@@ -0,0 +1,86 @@
+import base64
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class ConditioningFrame:
+    """
+    In-memory handle for the frame that conditions the next generation.
+
+    Holds the decoded pixels (PIL image or HxWx3 uint8 array) and produces
+    other representations lazily, memoizing each one:
+
+    - ``array`` / ``image`` for the local pipeline (no JPEG round trip, no loss)
+    - ``base64`` JPEG for the fal API and the vision LLM, encoded at most once
+    - ``resized(w, h)`` per target size
+    """
+
+    JPEG_QUALITY = 95
+
+    def __init__(self, frame=None, base64_data: Optional[str] = None):
+        if frame is None and not base64_data:
+            raise ValueError("ConditioningFrame needs a frame or base64 data")
+        self._image = frame if isinstance(frame, Image.Image) else None
+        self._array = np.asarray(frame) if frame is not None and self._image is None else None
+        self._base64 = base64_data
+        self._resized: Dict[Tuple[int, int], "ConditioningFrame"] = {}
+
+    @classmethod
+    def from_base64(cls, base64_data: str) -> "ConditioningFrame":
+        """Wrap base64 JPEG/PNG data (a data URL prefix is accepted); decoded only if pixels are needed"""
+        if base64_data.startswith('data:image'):
+            base64_data = base64_data.split(',', 1)[1]
+        return cls(base64_data=base64_data)
+
+    @property
+    def image(self) -> Image.Image:
+        """RGB PIL image"""
+        if self._image is None:
+            if self._array is not None:
+                self._image = Image.fromarray(self._array)
+            else:
+                self._image = Image.open(BytesIO(base64.b64decode(self._base64))).convert("RGB")
+        elif self._image.mode != "RGB":
+            self._image = self._image.convert("RGB")
+        return self._image
+
+    @property
+    def array(self) -> np.ndarray:
+        """RGB HxWx3 uint8 array"""
+        if self._array is None:
+            self._array = np.asarray(self.image)
+        return self._array
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(width, height)"""
+        if self._array is not None:
+            return self._array.shape[1], self._array.shape[0]
+        return self.image.size
+
+    @property
+    def base64(self) -> str:
+        """JPEG (q95) base64 string, encoded on first use"""
+        if self._base64 is None:
+            buffer = BytesIO()
+            self.image.save(buffer, format='JPEG', quality=self.JPEG_QUALITY)
+            self._base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return self._base64
+
+    def resized(self, width: int, height: int) -> "ConditioningFrame":
+        """This frame at ``width`` x ``height`` (self if already that size)"""
+        if self.size == (width, height):
+            return self
+        key = (width, height)
+        if key not in self._resized:
+            self._resized[key] = ConditioningFrame(self.image.resize((width, height)))
+        return self._resized[key]
+
+    def __repr__(self) -> str:
+        if self._array is None and self._image is None:
+            return f"ConditioningFrame(base64, {len(self._base64)} chars)"
+        width, height = self.size
+        return f"ConditioningFrame({width}x{height}{', jpeg cached' if self._base64 else ''})"
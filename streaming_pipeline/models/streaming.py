@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Deque
 from PIL import Image
 from .twitch import TwitchComment
+from .frame import ConditioningFrame
 
 
 @dataclass
@@ -36,8 +38,9 @@ class StreamingState:
     is_running: bool = False
     generation_count: int = 0
     
-    # Current generation data
-    current_frame_base64: str = ""
+    # Current generation data - the conditioning frame stays in memory,
+    # JPEG/base64 is only produced when something asks for it
+    current_frame: Optional[ConditioningFrame] = None
     current_prompt: str = ""
     
     # Generation mode and context
@@ -50,6 +53,15 @@ class StreamingState:
         if self.previous_prompts is None:
             self.previous_prompts = []
     
+    @property
+    def current_frame_base64(self) -> str:
+        """JPEG base64 of the current frame (encoded lazily, memoized)"""
+        return self.current_frame.base64 if self.current_frame is not None else ""
+    
+    @current_frame_base64.setter
+    def current_frame_base64(self, value: str):
+        self.current_frame = ConditioningFrame.from_base64(value) if value else None
+    
     @property
     def current_scene(self) -> str:
         """Current scene is just the last prompt, or default if none"""
@@ -63,3 +75,25 @@ class GenerationResult:
     prompt_used: str
     selected_comment: Optional[TwitchComment]
     generation_time: float
+
+
+@dataclass
+class ClipSegment:
+    """One generated clip travelling through the engine's pipeline stages"""
+    generation_id: int
+    prompt: str
+    frames: Optional[Any] = None         # VideoClip
+    video_url: Optional[str] = None
+    video_source: Optional[Any] = None   # Prefetched download of video_url, decoded instead of refetching
+    overlay_text: Optional[str] = None   # Captured at generation time, not read back live
+    decode_into_ring: bool = False
+    continuation: bool = False           # Later chunk of a chunked clip - no transition or clip-start cut before it
+    last_frame: Optional[Any] = None
+    pipeline_frames: int = 0             # Counted towards the buffer until the output stage is done
+    comment: Optional[TwitchComment] = None  # Chat comment this clip answers (for comment-to-air)
+    preempt: bool = False                # Reaction clip - trims the unplayed buffer when enqueued
+    trace: Optional[Any] = None          # utils.tracing.Trace when tracing is on
+    stage_entered: float = 0.0           # When the clip entered its current queue/stage (for spans)
+    enqueued: bool = False               # Output stage finished writing it to the ring
+    aired_at: Optional[float] = None     # First frame handed to the encoder
+    last_frame_ready: asyncio.Event = field(default_factory=asyncio.Event)
@@ -1,12 +1,13 @@
-from typing import List, Optional, Literal
+from typing import Any, List, Optional, Literal
 from pydantic import BaseModel, Field
 from fal.toolkit.file import File
 
 
 class LTXVideoRequestI2V(BaseModel):
     prompt: str = Field(description="The prompt to generate the video")
-    image_base64: str = Field(description="Base64 encoded input image")
-    model_type: Literal["ltxv1", "ltxv2-preview"] = Field(default="ltxv1", description="Which model to use for generation")
+    image_base64: str = Field(default="", description="Base64 encoded input image (or use conditioning_frame)")
+    conditioning_frame: Optional[Any] = Field(default=None, description="In-memory ConditioningFrame, preferred over image_base64")
+    model_type: Literal["ltxv1", "ltxv2-preview", "auto"] = Field(default="ltxv1", description="Which model to use for generation ('auto' lets the backend router pick per clip)")
     negative_prompt: str = Field(default="worst quality, inconsistent motion, blurry, jittery, distorted", description="The negative prompt")
     height: int = Field(default=480, description="The height of the video")
     width: int = Field(default=640, description="The width of the video")
@@ -14,12 +15,15 @@ class LTXVideoRequestI2V(BaseModel):
     strength: float = Field(default=1.0, description="How much to follow the input image")
     guidance_scale: float = Field(default=3.0, description="The guidance scale")
     timesteps: List[float] = Field(default=[1000, 993, 987, 981, 975, 909, 725, 0.03], description="The timesteps to use")
+    chunk_frames: Optional[int] = Field(default=None, description="Generate ltxv1 clips in temporal chunks of this many frames (8k+1), each handed on as it completes")
+    chunk_overlap: int = Field(default=9, description="Tail frames of the previous chunk that condition the next one (8k+1)")
     
     # LTXv2-specific parameters
     duration: Optional[Literal[6, 8]] = Field(default=None, description="Duration for ltxv2 (6 or 8 seconds)")
     resolution: Optional[Literal["720p", "1080p", "1440p"]] = Field(default=None, description="Resolution for ltxv2")
     aspect_ratio: Optional[Literal["9:16", "16:9"]] = Field(default=None, description="Aspect ratio for ltxv2")
     enable_prompt_expansion: bool = Field(default=True, description="Enable prompt expansion for ltxv2")
+    decode_frames: bool = Field(default=True, description="Decode ltxv2 clips to frames (False returns only the video URL)")
 
 class LTXVideoResponseBase64(BaseModel):
     video_base64: str = Field(description="Base64 encoded video data")
@@ -33,4 +37,7 @@ class LTXVideoResponseWithLastFrame(BaseModel):
 
 
 class LTXVideoResponseWithFrames(BaseModel):
-    frames: Optional[List] = Field(default=None, description="PIL frames (when streaming)")
+    frames: Optional[Any] = Field(default=None, description="VideoClip of RGB uint8 frames (PIL list from older backends)")
+    video_url: Optional[str] = Field(default=None, description="URL of the encoded clip (API backends)")
+    video_source: Optional[Any] = Field(default=None, description="File-like over the clip, already downloading (API backends)")
+    last_frame: Optional[Any] = Field(default=None, description="Last frame as an RGB array when frames are not decoded")
@@ -0,0 +1,341 @@
+import time
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from streaming_pipeline.utils.logger_config import queue_log
+from streaming_pipeline.output.encoder_supervisor import EncoderSupervisor
+from streaming_pipeline.output.pipe_writer import PipeWriter
+
+
+class EncoderError(Exception):
+    """Raised by a backend when the encoder can no longer accept frames"""
+
+
+class EncoderBackend(ABC):
+    """
+    Pluggable video encoder behind FFmpegRTMPStreamer.
+
+    The streamer hands over paced frames in the ring's pixel format together
+    with the presentation index of the first frame and per-frame keyframe
+    hints (first frame of a new generated clip). Backends that cannot honour
+    timestamps or keyframe hints simply ignore them.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def start(self):
+        """Open the encoder and its sinks"""
+
+    @abstractmethod
+    def write_frames(self, frames: Sequence[np.ndarray], pts: int, keyframes: Sequence[bool] = None):
+        """Encode ``frames``; ``pts`` is the output frame index of ``frames[0]``"""
+
+    @abstractmethod
+    def check_health(self) -> Optional[str]:
+        """Return a reason string if the encoder needs to be recovered"""
+
+    @abstractmethod
+    def recover(self, reason: str) -> bool:
+        """Replace a failed encoder; False if recovery is not possible"""
+
+    @abstractmethod
+    def stop(self):
+        """Flush and close the encoder"""
+
+    @abstractmethod
+    def get_status(self) -> Dict[str, Any]:
+        """Encoder metrics"""
+
+
+class SubprocessEncoderBackend(EncoderBackend):
+    """ffmpeg child process fed rawvideo over a pipe (supports tee fan-out and renditions)"""
+
+    name = "subprocess"
+
+    def __init__(self, spawn_fn: Callable[[], Any], use_standby: bool = True):
+        self.supervisor = EncoderSupervisor(spawn_fn, use_standby=use_standby)
+        self.pipe_writer = None
+
+    @property
+    def process(self):
+        return self.supervisor.process
+
+    def start(self):
+        process = self.supervisor.start()
+        # Frames go straight to the stdin fd via writev, bypassing the BufferedWriter
+        self.pipe_writer = PipeWriter(process.stdin.fileno())
+
+    def write_frames(self, frames, pts, keyframes=None):
+        # Raw pipe input is timestamped by ffmpeg from the frame count
+        self.pipe_writer.write_frames(frames)
+
+    def check_health(self):
+        return self.supervisor.check_health()
+
+    def recover(self, reason):
+        process = self.supervisor.restart(reason)
+        if process is None:
+            return False
+        self.pipe_writer.fileno = process.stdin.fileno()
+        return True
+
+    def stop(self):
+        self.supervisor.stop()
+
+    def get_status(self):
+        status = {"backend": self.name}
+        status.update(self.supervisor.get_status())
+        status["writer"] = self.pipe_writer.get_status() if self.pipe_writer else {}
+        return status
+
+
+class PyAVEncoderBackend(EncoderBackend):
+    """
+    In-process libx264 + FLV muxing through PyAV.
+
+    Frames are wrapped as AVFrames with explicit PTS (the pacer's schedule
+    index, so skipped deadlines leave a timestamp gap instead of shifting
+    the timeline) and the first frame of every generated clip is forced to
+    an IDR, so no bitrate is spent predicting across a scene cut. Silent AAC
+    audio is generated alongside to keep Twitch ingest happy. Any url/file
+    path works as the sink; ``format='null'`` discards the output for
+    benchmarking.
+    """
+
+    name = "pyav"
+
+    AUDIO_RATE = 44100
+    AUDIO_FRAME_SAMPLES = 1024
+
+    def __init__(self, url: str, width: int, height: int, fps: float, pix_fmt: str = "yuv420p",
+                 format: str = "flv", bitrate: str = "1500k", gop: int = None, max_restarts: int = 5):
+        self.url = url
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.format = format
+        self.bitrate = bitrate
+        self.gop = gop or max(1, int(round(fps)))
+        self.max_restarts = max_restarts
+
+        self.container = None
+        self.video_stream = None
+        self.audio_stream = None
+        self._silence = None
+        self._audio_samples = 0
+        self.error = None
+
+        # Performance tracking
+        self.frames_encoded = 0
+        self.forced_keyframes = 0
+        self.packets_muxed = 0
+        self.cpu_time = 0.0
+        self.restarts = 0
+        self.last_restart_reason = None
+
+    def start(self):
+        import av
+
+        options = {"flvflags": "no_duration_filesize"} if self.format == "flv" else {}
+        self.container = av.open(self.url, mode="w", format=self.format, options=options)
+
+        rate = Fraction(self.fps).limit_denominator(1001)
+        video = self.container.add_stream("libx264", rate=rate)
+        video.width = self.width
+        video.height = self.height
+        video.pix_fmt = "yuv420p"
+        video.bit_rate = self._parse_bitrate(self.bitrate)
+        video.codec_context.time_base = 1 / rate
+        video.options = {
+            "preset": "faster",
+            "tune": "zerolatency",
+            "g": str(self.gop),
+            "maxrate": self.bitrate,
+            "bufsize": str(2 * self._parse_bitrate(self.bitrate)),
+        }
+        self.video_stream = video
+
+        audio = self.container.add_stream("aac", rate=self.AUDIO_RATE)
+        audio.layout = "stereo"
+        audio.bit_rate = 128000
+        self.audio_stream = audio
+
+        silence = av.AudioFrame(format="fltp", layout="stereo", samples=self.AUDIO_FRAME_SAMPLES)
+        for plane in silence.planes:
+            plane.update(bytes(plane.buffer_size))
+        silence.sample_rate = self.AUDIO_RATE
+        self._silence = silence
+        self._audio_samples = 0
+        self.error = None
+        queue_log.info(f"🎬 PyAV encoder opened: {self.format} -> {self.url[:50]} ({self.width}x{self.height} @ {self.fps}fps)")
+
+    def write_frames(self, frames, pts, keyframes=None):
+        import av
+
+        if self.error:
+            raise EncoderError(self.error)
+
+        cpu_start = time.thread_time()
+        try:
+            for offset, frame in enumerate(frames):
+                video_frame = av.VideoFrame.from_ndarray(frame, format=self.pix_fmt)
+                if self.pix_fmt != "yuv420p":
+                    video_frame = video_frame.reformat(format="yuv420p")
+                video_frame.pts = pts + offset
+                if keyframes and keyframes[offset]:
+                    video_frame.pict_type = self._picture_type_i(av)
+                    self.forced_keyframes += 1
+                self._mux(self.video_stream.encode(video_frame))
+                self.frames_encoded += 1
+                self._write_audio_until((pts + offset + 1) / self.fps)
+        except av.FFmpegError as e:
+            self.error = str(e)
+            raise EncoderError(self.error) from e
+        finally:
+            self.cpu_time += time.thread_time() - cpu_start
+
+    def _write_audio_until(self, seconds: float):
+        """Keep silent audio at least as far along as the video"""
+        target = int(seconds * self.AUDIO_RATE)
+        while self._audio_samples < target:
+            self._silence.pts = self._audio_samples
+            self._mux(self.audio_stream.encode(self._silence))
+            self._audio_samples += self.AUDIO_FRAME_SAMPLES
+
+    def _mux(self, packets):
+        for packet in packets:
+            self.container.mux(packet)
+            self.packets_muxed += 1
+
+    @staticmethod
+    def _picture_type_i(av):
+        # PyAV >= 12 exposes an enum, older versions accept the string name
+        picture_type = getattr(av.video.frame, "PictureType", None)
+        return picture_type.I if picture_type is not None else "I"
+
+    @staticmethod
+    def _parse_bitrate(bitrate: str) -> int:
+        bitrate = str(bitrate).lower()
+        if bitrate.endswith("k"):
+            return int(float(bitrate[:-1]) * 1000)
+        if bitrate.endswith("m"):
+            return int(float(bitrate[:-1]) * 1000000)
+        return int(bitrate)
+
+    def check_health(self):
+        if self.container is None:
+            return "encoder not open"
+        return self.error
+
+    def recover(self, reason):
+        if self.restarts >= self.max_restarts:
+            queue_log.error(f"❌ PyAV encoder restarted {self.restarts} times - giving up")
+            return False
+        self._close(flush=False)
+        try:
+            self.start()
+        except Exception as e:
+            queue_log.error(f"❌ PyAV encoder reopen failed: {e}")
+            return False
+        self.restarts += 1
+        self.last_restart_reason = reason
+        queue_log.warning(f"♻️ PyAV encoder reopened ({reason}) - restart #{self.restarts}")
+        return True
+
+    def stop(self):
+        self._close(flush=True)
+
+    def _close(self, flush: bool):
+        container, self.container = self.container, None
+        if container is None:
+            return
+        try:
+            if flush and not self.error:
+                self._flush(container)
+        except Exception as e:
+            queue_log.warning(f"⚠️ PyAV encoder flush failed: {e}")
+        finally:
+            try:
+                container.close()
+            except Exception:
+                pass
+
+    def _flush(self, container):
+        for stream in (self.video_stream, self.audio_stream):
+            for packet in stream.encode(None):
+                container.mux(packet)
+
+    def get_status(self):
+        return {
+            "backend": self.name,
+            "alive": self.container is not None and not self.error,
+            "frames_encoded": self.frames_encoded,
+            "forced_keyframes": self.forced_keyframes,
+            "packets_muxed": self.packets_muxed,
+            "fps_per_core": round(self.frames_encoded / self.cpu_time, 1) if self.cpu_time > 0 else 0.0,
+            "restarts": self.restarts,
+            "last_restart_reason": self.last_restart_reason,
+            "error": self.error,
+        }
+
+
+class NullEncoderBackend(EncoderBackend):
+    """
+    Encoder stand-in that accepts frames without encoding them.
+
+    Used for offline runs and benchmarks where there is no ffmpeg binary or
+    RTMP server: the pacing, ring and keyframe bookkeeping all run as usual
+    and only the encode is skipped. With ``path`` set, frames are appended
+    to that file as raw video in the ring's pixel format
+    (``ffplay -f rawvideo -pixel_format yuv420p -video_size WxH`` plays it).
+    """
+
+    name = "null"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._file = None
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.keyframes = 0
+        self.last_pts = None
+
+    def start(self):
+        if self.path:
+            self._file = open(self.path, "wb")
+            queue_log.info(f"🎬 Null encoder writing raw frames to {self.path}")
+
+    def write_frames(self, frames, pts, keyframes=None):
+        if self._file:
+            for frame in frames:
+                self._file.write(memoryview(frame))
+        self.frames_written += len(frames)
+        self.bytes_written += sum(frame.nbytes for frame in frames)
+        self.keyframes += sum(bool(flag) for flag in keyframes or ())
+        self.last_pts = pts + len(frames) - 1
+
+    def check_health(self):
+        return None
+
+    def recover(self, reason):
+        return True
+
+    def stop(self):
+        file, self._file = self._file, None
+        if file:
+            file.close()
+
+    def get_status(self):
+        return {
+            "backend": self.name,
+            "frames_written": self.frames_written,
+            "mb_written": round(self.bytes_written / 1024**2, 1),
+            "keyframes": self.keyframes,
+            "last_pts": self.last_pts,
+            "path": self.path,
+        }
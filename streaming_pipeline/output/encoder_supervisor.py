@@ -0,0 +1,196 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from streaming_pipeline.utils.logger_config import queue_log
+
+
+PROGRESS_LINE = re.compile(r"^(\w+)=\s*(.*)$")
+
+
+class EncoderSupervisor:
+    """
+    Keeps an ffmpeg encoder process alive for the RTMP streamer.
+
+    - Drains stderr on a background thread so a chatty encoder can never
+      block on a full pipe, parsing ``-progress`` key=value blocks (speed,
+      bitrate, dropped/duplicated frames) and keeping recent warnings.
+    - Can keep a pre-warmed standby process (``use_standby``), which makes
+      a restart cost milliseconds. ffmpeg opens its outputs when it starts,
+      so a standby publishing to the same RTMP key would knock the live
+      encoder off; the owner only enables it when no sink publishes or
+      writes a file. Otherwise the replacement is spawned at restart time,
+      after the old process has been reaped.
+    - Rate-limits restarts so a permanently failing endpoint gives up
+      instead of respawning forever.
+    """
+
+    def __init__(self, spawn_fn: Callable[[], Any], use_standby: bool = True,
+                 max_restarts: int = 5, restart_window: float = 60.0, stall_timeout: float = 10.0):
+        self.spawn_fn = spawn_fn
+        self.use_standby = use_standby
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.stall_timeout = stall_timeout
+
+        self.process = None
+        self._standby = None
+        self._standby_lock = threading.Lock()
+        self._restart_times: deque = deque()
+
+        # Parsed encoder state
+        self.progress: Dict[str, str] = {}
+        self.last_progress_time = None
+        self.recent_messages: deque = deque(maxlen=20)
+        self.restarts = 0
+        self.last_restart_reason = None
+
+    def start(self):
+        """Spawn the active encoder (and a standby) and return the active process"""
+        self.process = self._spawn()
+        if self.use_standby:
+            self._spawn_standby_async()
+        return self.process
+
+    def stop(self):
+        """Close the active encoder gracefully and kill the standby"""
+        process, self.process = self.process, None
+        if process:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+                process.wait()
+
+        with self._standby_lock:
+            standby, self._standby = self._standby, None
+        if standby:
+            standby.kill()
+            standby.wait()
+
+    def restart(self, reason: str):
+        """Replace a dead/stalled encoder, preferring the warm standby.
+
+        Returns the new process, or None if the restart budget is exhausted.
+        """
+        now = time.monotonic()
+        while self._restart_times and now - self._restart_times[0] > self.restart_window:
+            self._restart_times.popleft()
+        if len(self._restart_times) >= self.max_restarts:
+            queue_log.error(f"❌ Encoder restarted {self.max_restarts} times in {self.restart_window:.0f}s - giving up")
+            return None
+        self._restart_times.append(now)
+
+        old_process = self.process
+        if old_process:
+            if old_process.poll() is None:
+                old_process.kill()
+            try:
+                old_process.stdin.close()
+            except Exception:
+                pass  # Pipe already broken
+            try:
+                old_process.wait(timeout=5)  # Reap it (and let it drop its connection) before replacing it
+            except Exception:
+                pass
+
+        with self._standby_lock:
+            standby, self._standby = self._standby, None
+
+        if standby and standby.poll() is None:
+            self.process = standby
+            source = "standby"
+        else:
+            self.process = self._spawn()
+            source = "cold spawn"
+
+        self.restarts += 1
+        self.last_restart_reason = reason
+        self.last_progress_time = None
+        self.progress = {}
+        queue_log.warning(f"♻️ Encoder restarted from {source} ({reason}) - restart #{self.restarts}")
+
+        if self.use_standby:
+            self._spawn_standby_async()
+        return self.process
+
+    def check_health(self) -> Optional[str]:
+        """Return a reason string if the active encoder needs a restart"""
+        if self.process is None:
+            return "no encoder process"
+        if self.process.poll() is not None:
+            return f"ffmpeg exited with code {self.process.returncode}"
+        if self.last_progress_time and time.monotonic() - self.last_progress_time > self.stall_timeout:
+            return f"no progress for {self.stall_timeout:.0f}s"
+        return None
+
+    def _spawn(self):
+        process = self.spawn_fn()
+        threading.Thread(target=self._drain_stderr, args=(process,), daemon=True).start()
+        return process
+
+    def _spawn_standby_async(self):
+        def spawn():
+            try:
+                standby = self._spawn()
+            except Exception as e:
+                queue_log.error(f"❌ Failed to pre-warm standby encoder: {e}")
+                return
+            with self._standby_lock:
+                if self._standby is None and self.process is not None:
+                    self._standby = standby
+                    return
+            standby.kill()  # Supervisor stopped (or raced) meanwhile
+            standby.wait()
+
+        threading.Thread(target=spawn, daemon=True).start()
+
+    def _drain_stderr(self, process):
+        """Read stderr until EOF, parsing -progress blocks for the active process"""
+        stderr = process.stderr
+        if stderr is None:
+            return
+        block = {}
+        for raw_line in iter(stderr.readline, b''):
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            if not line:
+                continue
+
+            match = PROGRESS_LINE.match(line)
+            if match:
+                key, value = match.groups()
+                block[key] = value
+                if key == "progress":
+                    # End of one progress block - publish if this is the active encoder
+                    if process is self.process:
+                        self.progress = block
+                        self.last_progress_time = time.monotonic()
+                    block = {}
+                continue
+
+            if process is self.process:
+                self.recent_messages.append(line)
+                queue_log.warning(f"🎞️ ffmpeg: {line}")
+        stderr.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Encoder health and parsed progress"""
+        progress = self.progress
+        with self._standby_lock:
+            standby_ready = self._standby is not None and self._standby.poll() is None
+        return {
+            "alive": self.process is not None and self.process.poll() is None,
+            "standby_ready": standby_ready,
+            "restarts": self.restarts,
+            "last_restart_reason": self.last_restart_reason,
+            "speed": progress.get("speed"),
+            "bitrate": progress.get("bitrate"),
+            "encoder_fps": progress.get("fps"),
+            "encoded_frames": progress.get("frame"),
+            "drop_frames": progress.get("drop_frames"),
+            "dup_frames": progress.get("dup_frames"),
+            "recent_messages": list(self.recent_messages)[-5:],
+        }
@@ -0,0 +1,105 @@
+import time
+from typing import Any, Dict
+
+
+class FramePacer:
+    """
+    Clock-driven frame scheduler for a constant-fps output.
+
+    Every frame has an absolute deadline ``start + n / fps`` on the monotonic
+    clock, so a slow write delays only that frame instead of shifting every
+    later one. When the writer falls behind, ``wait_for_next()`` reports how
+    many frames are due so the caller can catch up (duplicating if needed).
+    After a stall longer than ``max_catchup_frames`` the missed deadlines are
+    skipped instead of bursting them into the encoder.
+    """
+
+    JITTER_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100)
+    MISS_BUCKETS = (1, 2, 5, 10)
+
+    def __init__(self, fps: float, max_catchup_frames: int = None):
+        self.fps = fps
+        self.frame_duration = 1.0 / fps
+        self.max_catchup_frames = max_catchup_frames or max(1, int(fps))
+        self.start_time = None
+        self.frame_index = 0
+        self.reset_metrics()
+
+    def start(self):
+        """Anchor the schedule at the current monotonic time"""
+        self.start_time = time.monotonic()
+        self.frame_index = 0
+
+    def wait_for_next(self) -> int:
+        """Sleep until the next deadline and return how many frames are due (>= 1)"""
+        if self.start_time is None:
+            self.start()
+
+        deadline = self.start_time + self.frame_index * self.frame_duration
+        now = time.monotonic()
+        if now < deadline:
+            time.sleep(deadline - now)
+            now = time.monotonic()
+
+        self._record_jitter(now - deadline)
+
+        # Every frame whose deadline has already passed is due now
+        due = int((now - self.start_time) * self.fps) - self.frame_index + 1
+        due = max(1, due)
+
+        if due > 1:
+            self.deadline_misses += due - 1
+            self._record_miss(due - 1)
+
+        if due > self.max_catchup_frames:
+            # Too far behind - skip the missed slots rather than burst them
+            skipped = due - 1
+            self.frame_index += skipped
+            self.skipped_frames += skipped
+            due = 1
+
+        return due
+
+    def advance(self, count: int = 1):
+        """Mark ``count`` frames as sent"""
+        self.frame_index += count
+
+    def _record_jitter(self, lateness: float):
+        lateness_ms = lateness * 1000
+        for bucket in self.JITTER_BUCKETS_MS:
+            if lateness_ms <= bucket:
+                self.jitter_histogram[f"<={bucket}ms"] += 1
+                break
+        else:
+            self.jitter_histogram[f">{self.JITTER_BUCKETS_MS[-1]}ms"] += 1
+        self.max_jitter_ms = max(self.max_jitter_ms, lateness_ms)
+
+    def _record_miss(self, missed: int):
+        for bucket in self.MISS_BUCKETS:
+            if missed <= bucket:
+                self.miss_histogram[f"<={bucket}"] += 1
+                break
+        else:
+            self.miss_histogram[f">{self.MISS_BUCKETS[-1]}"] += 1
+
+    def reset_metrics(self):
+        """Reset jitter and deadline statistics"""
+        self.jitter_histogram = {f"<={b}ms": 0 for b in self.JITTER_BUCKETS_MS}
+        self.jitter_histogram[f">{self.JITTER_BUCKETS_MS[-1]}ms"] = 0
+        self.miss_histogram = {f"<={b}": 0 for b in self.MISS_BUCKETS}
+        self.miss_histogram[f">{self.MISS_BUCKETS[-1]}"] = 0
+        self.max_jitter_ms = 0.0
+        self.deadline_misses = 0
+        self.skipped_frames = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Cadence metrics for monitoring"""
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        return {
+            "scheduled_fps": round(self.frame_index / elapsed, 2) if elapsed > 0 else 0.0,
+            "deadline_misses": self.deadline_misses,
+            "skipped_frames": self.skipped_frames,
+            "max_jitter_ms": round(self.max_jitter_ms, 2),
+            "jitter_histogram": dict(self.jitter_histogram),
+            "miss_histogram": dict(self.miss_histogram),
+        }
@@ -0,0 +1,200 @@
+import numpy as np
+import cv2
+from typing import List, Optional, Tuple
+
+
+class FrameRingBuffer:
+    """
+    Fixed-capacity ring of preallocated uint8 frame slots.
+
+    Single-producer / single-consumer: the generation side only moves
+    ``_write_index`` and the paced output thread only moves ``_read_index``.
+    Both indices grow monotonically and are plain ints, so every update is
+    a single atomic store under the GIL and neither side needs a lock.
+    A slot is only reused after the consumer has advanced past it.
+
+    Slots hold frames in the encoder's input pixel format: ``rgb24`` as
+    (H, W, 3), or ``yuv420p`` as planar I420 (H * 3 / 2, W), which halves
+    both memory and pipe bandwidth. RGB input is converted on write.
+    """
+
+    PIX_FMTS = ("rgb24", "yuv420p")
+
+    def __init__(self, capacity: int, width: int, height: int, pix_fmt: str = "rgb24"):
+        if pix_fmt not in self.PIX_FMTS:
+            raise ValueError(f"Unsupported pixel format '{pix_fmt}', expected one of {self.PIX_FMTS}")
+        if pix_fmt == "yuv420p" and (width % 2 or height % 2):
+            raise ValueError(f"yuv420p needs even dimensions, got {width}x{height}")
+
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        self.frame_shape = self.shape_for(width, height, pix_fmt)
+        self.slots = np.zeros((capacity,) + self.frame_shape, dtype=np.uint8)
+        # First frame of each generated clip - lets the encoder force an IDR at the cut
+        self.clip_starts = np.zeros(capacity, dtype=bool)
+        self._write_index = 0
+        self._read_index = 0
+        self._trim_request: Optional[Tuple[int, int]] = None  # (write index at request, frames to keep)
+
+        # Producer-side scratch for resizing before colour conversion
+        self._rgb_scratch = np.zeros((height, width, 3), dtype=np.uint8) if pix_fmt == "yuv420p" else None
+
+    @staticmethod
+    def shape_for(width: int, height: int, pix_fmt: str) -> Tuple[int, ...]:
+        """Array shape of one frame in ``pix_fmt``"""
+        if pix_fmt == "yuv420p":
+            return (height * 3 // 2, width)
+        return (height, width, 3)
+
+    def __len__(self) -> int:
+        return self._write_index - self._read_index
+
+    @property
+    def free_slots(self) -> int:
+        return self.capacity - len(self)
+
+    @property
+    def nbytes(self) -> int:
+        return self.slots.nbytes
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def write(self, frame, clip_start: bool = False) -> bool:
+        """Copy one frame into the next free slot (resizing if needed).
+
+        Returns False without blocking when the ring is full.
+        """
+        if self.free_slots <= 0:
+            return False
+
+        index = self._write_index
+        self.convert_into(frame, self.slots[index % self.capacity])
+        self.clip_starts[index % self.capacity] = clip_start
+
+        # Publish only after the slot is fully written
+        self._write_index = index + 1
+        return True
+
+    def write_batch(self, frames, clip_start: bool = True) -> int:
+        """Convert a whole clip into consecutive slots in one pass.
+
+        ``frames`` is a sequence of frames or an (N, ...) array. An array
+        already in slot format is copied in at most two block copies (the
+        ring may wrap). The first frame is flagged as a clip start unless
+        ``clip_start`` is False. Stops at the first frame that does not fit;
+        returns frames written.
+        """
+        if isinstance(frames, np.ndarray) and frames.shape[1:] == self.frame_shape:
+            return self._copy_block(frames, clip_start)
+
+        written = 0
+        for frame in frames:
+            if not self.write(frame, clip_start=clip_start and written == 0):
+                break
+            written += 1
+        return written
+
+    def _copy_block(self, frames: np.ndarray, clip_start: bool) -> int:
+        count = min(len(frames), self.free_slots)
+        if count <= 0:
+            return 0
+        index = self._write_index
+        first = index % self.capacity
+        head = min(count, self.capacity - first)
+        self.slots[first:first + head] = frames[:head]
+        self.slots[:count - head] = frames[head:count]
+        self.clip_starts[first:first + head] = False
+        self.clip_starts[:count - head] = False
+        self.clip_starts[first] = clip_start
+
+        # Publish only after every slot is fully written
+        self._write_index = index + count
+        return count
+
+    @property
+    def write_index(self) -> int:
+        """Absolute index the next written frame will get"""
+        return self._write_index
+
+    def request_trim(self, keep_frames: int):
+        """Ask the consumer to drop unplayed frames, keeping the next ``keep_frames``.
+
+        Only frames already written at the time of the request are affected,
+        so a clip written right after the request survives the trim.
+        """
+        self._trim_request = (self._write_index, max(0, keep_frames))
+
+    def convert_into(self, frame, out: np.ndarray) -> np.ndarray:
+        """Resize/convert an RGB frame (PIL or HxWx3 array) into ``out`` in the slot format"""
+        frame_array = np.asarray(frame)
+
+        if frame_array.shape == self.frame_shape:
+            # Already in slot format (or rgb24 at the right size)
+            np.copyto(out, frame_array)
+            return out
+
+        if self.pix_fmt == "rgb24":
+            # Resize straight into the slot - no intermediate allocation
+            cv2.resize(frame_array, (self.width, self.height), dst=out)
+            return out
+
+        if frame_array.shape[:2] != (self.height, self.width):
+            frame_array = cv2.resize(frame_array, (self.width, self.height), dst=self._rgb_scratch)
+        cv2.cvtColor(frame_array, cv2.COLOR_RGB2YUV_I420, dst=out)
+        return out
+
+    def new_frame(self, rgb_frame=None) -> np.ndarray:
+        """Allocate a standalone frame in the slot format (black if no RGB frame is given)"""
+        if rgb_frame is None:
+            rgb_frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        return self.convert_into(rgb_frame, np.empty(self.frame_shape, dtype=np.uint8))
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def peek(self) -> Optional[np.ndarray]:
+        """Return a view of the oldest unread slot, or None if empty.
+
+        The view stays valid until ``advance()`` is called.
+        """
+        if self._read_index == self._write_index:
+            return None
+        return self.slots[self._read_index % self.capacity]
+
+    def peek_batch(self, max_count: int) -> List[np.ndarray]:
+        """Return views of up to ``max_count`` oldest unread slots (for writev)"""
+        available = min(max_count, self._write_index - self._read_index)
+        return [self.slots[(self._read_index + i) % self.capacity] for i in range(available)]
+
+    @property
+    def read_index(self) -> int:
+        """Absolute index of the oldest unread slot"""
+        return self._read_index
+
+    def is_clip_start(self, index: int) -> bool:
+        """Whether the frame at absolute ``index`` starts a new clip"""
+        return bool(self.clip_starts[index % self.capacity])
+
+    def apply_trim(self) -> int:
+        """Consumer side of ``request_trim``; returns the number of frames dropped"""
+        request, self._trim_request = self._trim_request, None
+        if request is None:
+            return 0
+        write_index_at_request, keep_frames = request
+        target = write_index_at_request - keep_frames
+        dropped = max(0, target - self._read_index)
+        self._read_index += dropped
+        return dropped
+
+    def advance(self, count: int = 1):
+        """Release ``count`` slots back to the producer"""
+        self._read_index = min(self._read_index + count, self._write_index)
+
+    def clear(self):
+        """Drop all buffered frames (only call when the consumer is stopped)"""
+        self._read_index = self._write_index
@@ -0,0 +1,75 @@
+from typing import Any, Dict
+
+
+class PlaybackRateController:
+    """
+    Buffer-aware playback rate for a constant-fps output.
+
+    The encoder always receives ``fps`` frames per second; only the speed at
+    which we walk through the buffered source frames changes. A low buffer
+    slows playback (some source frames are shown twice), a high buffer speeds
+    it up (some source frames are skipped), always within ``[min_rate, max_rate]``.
+    The rate is smoothed so the change is not visible as a sudden jump.
+    """
+
+    def __init__(self, fps: float, target_buffer_seconds: float = 10.0,
+                 min_rate: float = 0.85, max_rate: float = 1.15, smoothing: float = 0.02):
+        if not 0 < min_rate <= 1.0 <= max_rate < 2.0:
+            raise ValueError(f"Invalid playback rate band: {min_rate}-{max_rate}")
+
+        self.fps = fps
+        self.target_buffer_seconds = target_buffer_seconds
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.smoothing = smoothing
+
+        self.rate = 1.0
+        self._phase = 0.0
+
+        # Statistics
+        self.stretched_frames = 0   # Source frames shown twice (rate < 1)
+        self.compressed_frames = 0  # Source frames skipped (rate > 1)
+
+    def update(self, buffered_frames: int) -> float:
+        """Move the rate toward the value implied by the current buffer level"""
+        buffered_seconds = buffered_frames / self.fps
+        error = (buffered_seconds - self.target_buffer_seconds) / self.target_buffer_seconds
+
+        # Empty buffer maps to min_rate, double the target maps to max_rate
+        if error < 0:
+            desired = 1.0 + error * (1.0 - self.min_rate)
+        else:
+            desired = 1.0 + error * (self.max_rate - 1.0)
+        desired = min(self.max_rate, max(self.min_rate, desired))
+
+        self.rate += self.smoothing * (desired - self.rate)
+        return self.rate
+
+    def step(self) -> int:
+        """Source frames to advance for one output frame (0, 1 or 2)"""
+        self._phase += self.rate
+        steps = int(self._phase)
+        self._phase -= steps
+
+        if steps == 0:
+            self.stretched_frames += 1
+        elif steps > 1:
+            self.compressed_frames += steps - 1
+        return steps
+
+    def reset(self):
+        """Return to normal speed and clear statistics"""
+        self.rate = 1.0
+        self._phase = 0.0
+        self.stretched_frames = 0
+        self.compressed_frames = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Rate controller metrics"""
+        return {
+            "playback_rate": round(self.rate, 3),
+            "rate_band": [self.min_rate, self.max_rate],
+            "target_buffer_seconds": self.target_buffer_seconds,
+            "stretched_frames": self.stretched_frames,
+            "compressed_frames": self.compressed_frames,
+        }
@@ -1,15 +1,26 @@
 import ffmpeg
+import os
 import threading
 import time
+from typing import List, Optional
 import numpy as np
-from queue import Queue, Empty
 from PIL import Image, ImageDraw, ImageFont
 import cv2
 from streaming_pipeline.utils.logger_config import queue_log
-from streaming_pipeline.models import Monitorable
+from streaming_pipeline.models import Monitorable, VideoClip
+from streaming_pipeline.output.frame_ring import FrameRingBuffer
+from streaming_pipeline.output.frame_pacer import FramePacer
+from streaming_pipeline.output.rate_controller import PlaybackRateController
+from streaming_pipeline.output.encoder_backends import EncoderError, NullEncoderBackend, PyAVEncoderBackend, SubprocessEncoderBackend
+from streaming_pipeline.video_generation.clip_decoder import decode_into_ring
 
 class FFmpegRTMPStreamer(Monitorable):
-    def __init__(self, stream_key: str, fps: int = 24, width: int = 640, height: int = 480):
+    def __init__(self, stream_key: str, fps: int = 24, width: int = 640, height: int = 480,
+                 buffer_capacity: int = 512, target_buffer_seconds: float = 10.0,
+                 playback_rate_band: tuple = (0.85, 1.15), input_pix_fmt: str = "rgb24",
+                 extra_outputs: Optional[List[str]] = None, record_path: Optional[str] = None,
+                 null_sink: bool = False, low_rendition: Optional[dict] = None,
+                 encoder_backend: str = "subprocess"):
         self.stream_key = stream_key
         self.fps = fps
         self.width = width
@@ -17,23 +28,53 @@ class FFmpegRTMPStreamer(Monitorable):
         # Fix: Use correct Twitch RTMP path
         self.rtmp_url = f"rtmp://live.twitch.tv/app/{stream_key}"
         
+        # Fan-out - one encode, many sinks (tee muxer), optional low-res rendition
+        self.extra_outputs = list(extra_outputs or [])
+        self.record_path = record_path
+        self.null_sink = null_sink
+        self.low_rendition = low_rendition  # {"height": 240, "bitrate": "400k", "outputs": [...]}
+        self._record_segment = 0
+        
+        # Encoder backend - "subprocess" (ffmpeg over a pipe), "pyav" (in-process libx264)
+        # or "null" (no encode; raw frames to record_path if set - offline runs)
+        self.encoder_backend = encoder_backend
+        
         # Stream state
         self.is_streaming = False
-        self.ffmpeg_process = None
+        self.encoder = None
+        self.pacer = None
         self.stream_thread = None
         self.monitor_thread = None
         
-        # Frame management - Optimized buffer size
-        self.frame_queue = Queue(maxsize=1000)  # ~9 seconds at 16fps
+        # Frame management - preallocated ring, (re)allocated in start_stream
+        # once the final resolution is known (~57 seconds at 9fps).
+        # yuv420p ships 1.5 bytes/pixel through the pipe instead of 3.
+        self.input_pix_fmt = input_pix_fmt
+        self.buffer_capacity = buffer_capacity
+        self.frame_buffer = None
+        self._hold_frame = None          # Copy of the last real frame for repeats
+        self._has_hold_frame = False
+        self._scratch_frame = None       # Output slot for varied/repeated frames
+        self._placeholder_frames = None  # (dark, blink) placeholder pair
         
+        # Adaptive playback - stretch/compress around a target buffer level
+        self.target_buffer_seconds = target_buffer_seconds
+        self.playback_rate_band = playback_rate_band
+        self.rate_controller = None
         
                 # Statistics - ADD MISSING VARIABLES
         self.frames_sent = 0
         self.frames_dropped = 0
+        self.frames_repeated = 0
         self.frames_added_total = 0
         self.frames_added_last_second = 0
         self.frames_dropped_last_second = 0
         self.start_time = None
+        self._keyframe_scan_index = 0    # Next ring index to check for clip starts
+        self._pts_base = 0               # Encoder timeline offset carried across pacer re-anchors
+        self._air_callbacks = {}         # Ring index of a clip's first frame -> called once it is sent
+        self._last_sent_index = -1       # Ring index of the newest real frame handed to the encoder
+        self.frames_trimmed = 0
 
     def start_stream(self):
         """Start FFmpeg RTMP stream to Twitch"""
@@ -47,44 +88,10 @@ class FFmpegRTMPStreamer(Monitorable):
             print(f"   FPS: {self.fps}")
             print(f"   RTMP URL: {self.rtmp_url[:50]}...")
             
-            # Fix: Create proper video and audio inputs
-            video_in = ffmpeg.input(
-                'pipe:',
-                format='rawvideo',
-                pix_fmt='rgb24',
-                s=f'{self.width}x{self.height}',
-                framerate=self.fps,  # Use 'framerate' instead of 'r' for raw pipe
-            )
-
-            # Fix: Add silent audio so Twitch doesn't drop the stream
-            audio_in = ffmpeg.input(
-                'anullsrc=channel_layout=stereo:sample_rate=44100',
-                f='lavfi'
-            )
-
-            self.ffmpeg_process = (
-                ffmpeg
-                .output(
-                    video_in, audio_in, self.rtmp_url,
-                    vcodec='libx264',
-                    pix_fmt='yuv420p',
-                    preset='faster',               # Changed from 'veryfast' to 'faster' for better quality
-                    tune='zerolatency',
-                    g=self.fps,                    # 1s keyframe interval (reduced from 2s)
-                    maxrate='1500k',               # Reduced bitrate from 2500k to 1500k
-                    bufsize='3000k',               # Reduced buffer from 10000k to 3000k
-                    **{'b:v': '1500k'},            # Reduced video bitrate
-                    acodec='aac',
-                    **{'b:a': '128k'},
-                    ar='44100',
-                    ac='2',
-                    f='flv',
-                    flvflags='no_duration_filesize',
-                )
-                .global_args('-loglevel', 'warning')
-                .overwrite_output()
-                .run_async(pipe_stdin=True, pipe_stderr=True)
-            )
+            self._allocate_buffers()
+            
+            self.encoder = self._create_encoder()
+            self.encoder.start()
             
             self.is_streaming = True
             self.start_time = time.time()
@@ -103,6 +110,168 @@ class FFmpegRTMPStreamer(Monitorable):
             queue_log.error(f"❌ Failed to start FFmpeg RTMP stream: {e}")
             self.is_streaming = False
 
+    def _create_encoder(self):
+        """Build the configured encoder backend"""
+        if self.encoder_backend == "pyav":
+            if self.extra_outputs or self.record_path or self.low_rendition:
+                queue_log.warning("⚠️ PyAV encoder feeds a single sink - ignoring extra outputs, recording and low rendition")
+            if self.stream_key and not self.null_sink:
+                url, container = self.rtmp_url, "flv"
+            else:
+                url, container = "-", "null"
+            return PyAVEncoderBackend(url, self.width, self.height, self.fps, pix_fmt=self.frame_buffer.pix_fmt, format=container)
+        if self.encoder_backend == "null":
+            return NullEncoderBackend(self.record_path)
+        if self.encoder_backend != "subprocess":
+            raise ValueError(f"Unknown encoder backend '{self.encoder_backend}', expected 'subprocess', 'pyav' or 'null'")
+        # Supervisor owns the ffmpeg process, a warm standby (when safe) and stderr draining
+        return SubprocessEncoderBackend(self._spawn_ffmpeg, use_standby=self._standby_safe())
+
+    def _standby_safe(self) -> bool:
+        """Whether a pre-warmed standby encoder can run next to the live one.
+
+        ffmpeg opens its outputs at startup, so a standby would publish a second
+        time to the same RTMP endpoints while the live encoder is still on them,
+        and would create its recording segment before it ever records (left
+        empty, with a gap in the numbering, if it is never promoted).
+        """
+        publishes = self.stream_key or self.extra_outputs or \
+            (self.low_rendition and self.low_rendition.get('outputs'))
+        return not publishes and not self.record_path
+
+    def _output_targets(self) -> List[tuple]:
+        """(url, muxer) pairs fed by the main rendition; the first one is primary"""
+        targets = []
+        if self.stream_key:
+            targets.append((self.rtmp_url, 'flv'))
+        targets.extend((url, 'flv') for url in self.extra_outputs)
+        if self.record_path:
+            # Each encoder process records its own segment so a restart never truncates the file.
+            # Only active encoders are spawned while recording (no standby), so segments stay consecutive.
+            self._record_segment += 1
+            path = self.record_path
+            if self._record_segment > 1:
+                base, ext = os.path.splitext(path)
+                path = f"{base}-{self._record_segment:03d}{ext}"
+            targets.append((path, 'mp4' if path.endswith('.mp4') else 'flv'))
+        if self.null_sink or not targets:
+            targets.append(('-', 'null'))
+        return targets
+
+    @staticmethod
+    def _sink_args(targets: List[tuple]) -> tuple:
+        """Output url and muxer kwargs - a plain muxer for one sink, the tee muxer for several"""
+        muxer_options = {
+            'flv': 'flvflags=no_duration_filesize',
+            'mp4': 'movflags=+frag_keyframe+empty_moov',  # Playable even if the process dies
+            'null': None,
+        }
+        if len(targets) == 1:
+            url, muxer = targets[0]
+            kwargs = {'f': muxer}
+            if muxer == 'flv':
+                kwargs['flvflags'] = 'no_duration_filesize'
+            elif muxer == 'mp4':
+                kwargs['movflags'] = '+frag_keyframe+empty_moov'
+            return url, kwargs
+
+        slaves = []
+        for index, (url, muxer) in enumerate(targets):
+            options = [f"f={muxer}"]
+            if muxer_options[muxer]:
+                options.append(muxer_options[muxer])
+            if index > 0:
+                options.append("onfail=ignore")  # A failing secondary must not kill the primary
+            slaves.append(f"[{':'.join(options)}]{url}")
+        return "|".join(slaves), {'f': 'tee', 'flags': '+global_header'}
+
+    def _spawn_ffmpeg(self):
+        """Spawn one ffmpeg encoder process reading rawvideo from stdin"""
+        # Fix: Create proper video and audio inputs
+        video_in = ffmpeg.input(
+            'pipe:',
+            format='rawvideo',
+            pix_fmt=self.frame_buffer.pix_fmt,
+            s=f'{self.width}x{self.height}',
+            framerate=self.fps,  # Use 'framerate' instead of 'r' for raw pipe
+        )
+
+        # Fix: Add silent audio so Twitch doesn't drop the stream
+        audio_in = ffmpeg.input(
+            'anullsrc=channel_layout=stereo:sample_rate=44100',
+            f='lavfi'
+        )
+
+        audio_args = {
+            'acodec': 'aac',
+            'b:a': '128k',
+            'ar': '44100',
+            'ac': '2',
+        }
+        
+        main_video = video_in
+        low_video = None
+        if self.low_rendition:
+            # Split inside the same process - decoded input is shared, only the encode is doubled
+            split = video_in.filter_multi_output('split')
+            main_video = split.stream(0)
+            low_video = split.stream(1).filter('scale', -2, self.low_rendition.get('height', 240))
+
+        main_url, main_mux = self._sink_args(self._output_targets())
+        outputs = [
+            ffmpeg.output(
+                main_video, audio_in, main_url,
+                vcodec='libx264',
+                pix_fmt='yuv420p',
+                preset='faster',               # Changed from 'veryfast' to 'faster' for better quality
+                tune='zerolatency',
+                g=self.fps,                    # 1s keyframe interval (reduced from 2s)
+                maxrate='1500k',               # Reduced bitrate from 2500k to 1500k
+                bufsize='3000k',               # Reduced buffer from 10000k to 3000k
+                **{'b:v': '1500k'},            # Reduced video bitrate
+                **audio_args,
+                **main_mux,
+            )
+        ]
+
+        if low_video is not None:
+            bitrate = self.low_rendition.get('bitrate', '400k')
+            low_targets = [(url, 'flv') for url in self.low_rendition.get('outputs', [])] or [('-', 'null')]
+            low_url, low_mux = self._sink_args(low_targets)
+            outputs.append(
+                ffmpeg.output(
+                    low_video, audio_in, low_url,
+                    vcodec='libx264',
+                    pix_fmt='yuv420p',
+                    preset='veryfast',
+                    tune='zerolatency',
+                    g=self.fps,
+                    maxrate=bitrate,
+                    bufsize=bitrate,
+                    **{'b:v': bitrate},
+                    **audio_args,
+                    **low_mux,
+                )
+            )
+
+        return (
+            ffmpeg
+            .merge_outputs(*outputs)
+            # Machine-readable progress on stderr, drained by the supervisor
+            .global_args('-loglevel', 'warning', '-nostats', '-progress', 'pipe:2')
+            .overwrite_output()
+            .run_async(pipe_stdin=True, pipe_stderr=True)
+        )
+
+    def _recover_encoder(self, reason: str) -> bool:
+        """Swap in a fresh encoder; buffered frames stay in the ring"""
+        if not self.encoder or not self.encoder.recover(reason):
+            return False
+        # New encoder starts a new timeline - re-anchor the schedule
+        self._pts_base = 0
+        self.pacer.start()
+        return True
+
     def stop_stream(self):
         """Stop FFmpeg RTMP stream"""
         if not self.is_streaming:
@@ -111,14 +280,13 @@ class FFmpegRTMPStreamer(Monitorable):
         print("🛑 Stopping FFmpeg RTMP stream...")
         self.is_streaming = False
         
-        # Close FFmpeg process
-        if self.ffmpeg_process:
-            try:
-                self.ffmpeg_process.stdin.close()
-                self.ffmpeg_process.wait(timeout=5)
-            except:
-                self.ffmpeg_process.kill()
-            self.ffmpeg_process = None
+        # Let the loop finish its current write - the in-process encoder must not be closed mid-frame
+        if self.stream_thread and self.stream_thread is not threading.current_thread():
+            self.stream_thread.join(timeout=2)
+        
+        # Close the encoder (and any warm standby)
+        if self.encoder:
+            self.encoder.stop()
         
         # Clear queue and reset metrics when stopped
         self._reset_metrics()
@@ -126,52 +294,104 @@ class FFmpegRTMPStreamer(Monitorable):
 
     def _reset_metrics(self):
         """Reset all metrics and clear queue when stream stops"""
-        # Clear the frame queue
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except:
-                break
+        # Drop buffered frames - slots stay allocated for the next session
+        if self.frame_buffer is not None:
+            self.frame_buffer.clear()
+        self._has_hold_frame = False
         
         # Reset counters
         self.frames_sent = 0
         self.frames_dropped = 0
+        self.frames_repeated = 0
         self.frames_added_total = 0
         self.frames_added_last_second = 0
         self.frames_dropped_last_second = 0
         self.start_time = None
+        self._keyframe_scan_index = 0
+        self._air_callbacks = {}
+        self._last_sent_index = -1
+        self.frames_trimmed = 0
         print("🧹 RTMP metrics and queue cleared")
 
     
 
+    def _allocate_buffers(self):
+        """Preallocate the frame ring and scratch frames for the current resolution"""
+        pix_fmt = self.input_pix_fmt
+        if pix_fmt == "yuv420p" and (self.width % 2 or self.height % 2):
+            queue_log.warning(f"⚠️ yuv420p needs even dimensions ({self.width}x{self.height}) - using rgb24")
+            pix_fmt = "rgb24"
+        
+        buffer = self.frame_buffer
+        if buffer is None or (buffer.width, buffer.height, buffer.pix_fmt) != (self.width, self.height, pix_fmt):
+            buffer = FrameRingBuffer(self.buffer_capacity, self.width, self.height, pix_fmt)
+            self.frame_buffer = buffer
+            self._hold_frame = buffer.new_frame()
+            self._scratch_frame = buffer.new_frame()
+            blink_rgb = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            blink_rgb[10:20, 10:20] = [30, 30, 30]  # Small dark gray square
+            self._placeholder_frames = (buffer.new_frame(), buffer.new_frame(blink_rgb))
+            queue_log.info(f"🧱 Frame ring allocated: {self.buffer_capacity} x {self.width}x{self.height} {pix_fmt} "
+                           f"({buffer.nbytes / 1024**2:.0f} MB)")
+        self._has_hold_frame = False
+
+    def _write_frame(self, frame) -> bool:
+        """Copy a single frame into the ring, counting it as dropped if full"""
+        if isinstance(frame, Image.Image) and frame.mode != 'RGB':
+            frame = frame.convert('RGB')
+        if self.frame_buffer.write(frame):
+            self.frames_added_total += 1
+            return True
+        self.frames_dropped += 1
+        return False
+
     def add_frame(self, pil_frame):
         """Add PIL Image frame to stream queue"""
         if not self.is_streaming:
             return
         
         try:
-            # Convert PIL frame to numpy array for FFmpeg
-            frame_array = np.array(pil_frame.convert('RGB'))
-            if frame_array.shape[:2] != (self.height, self.width):
-                frame_array = cv2.resize(frame_array, (self.width, self.height))
-            
-            # Add to queue with non-blocking put
-            try:
-                self.frame_queue.put_nowait(frame_array)
-            except:
-                # Queue full - drop oldest frame and add new one
-                try:
-                    self.frame_queue.get_nowait()
-                    self.frames_dropped += 1
-                    self.frame_queue.put_nowait(frame_array)
-                except Empty:
-                    pass
-            
+            self._write_frame(pil_frame)
         except Exception as e:
             print(f"❌ Error processing frame: {e}")
 
-    def add_frame_batch(self, pil_frames):
-        """Add multiple frames efficiently using batch processing"""
+    def _wait_for_free_slot(self, deadline: float) -> bool:
+        """Block until the consumer frees a ring slot; False on timeout or stop"""
+        while self.frame_buffer.free_slots == 0:
+            if not self.is_streaming or time.monotonic() >= deadline:
+                return False
+            time.sleep(1.0 / self.fps)
+        return True
+
+    def trim_buffer(self, keep_seconds: float = 0.0):
+        """Drop not-yet-played frames beyond the next ``keep_seconds`` (applied by the stream loop)"""
+        if self.frame_buffer is None:
+            return
+        self.frame_buffer.request_trim(int(keep_seconds * self.fps))
+
+    def _register_on_air(self, on_air):
+        """Call ``on_air()`` from the stream loop once the next written frame has been sent"""
+        if on_air is not None:
+            self._air_callbacks[self.frame_buffer.write_index] = on_air
+
+    def _fire_on_air(self):
+        for index in list(self._air_callbacks):
+            if index <= self._last_sent_index:
+                callback = self._air_callbacks.pop(index, None)
+                try:
+                    if callback:
+                        callback()
+                except Exception as e:
+                    queue_log.error(f"❌ On-air callback failed: {e}")
+
+    def add_frame_batch(self, pil_frames, block_timeout: float = 0.0, on_air=None, clip_start: bool = True):
+        """Convert a clip straight into the preallocated ring slots in one pass
+        
+        With ``block_timeout`` > 0 a full ring makes the producer wait (up to
+        that many seconds) for playback to free slots instead of dropping frames.
+        ``on_air`` is called (on the stream thread) when the clip's first frame is sent.
+        ``clip_start=False`` (a later chunk of the same clip) does not force a keyframe.
+        """
         if not self.is_streaming:
             queue_log.warning(f"❌ RTMP not streaming - rejecting {len(pil_frames) if pil_frames else 0} frames")
             return 0
@@ -181,140 +401,255 @@ class FFmpegRTMPStreamer(Monitorable):
             return 0
         
         queue_log.info(f"📺 BATCH START: Processing {len(pil_frames)} frames...")
-        queue_log.info(f"📊 Current queue size: {self.frame_queue.qsize()}/{self.frame_queue.maxsize}")
+        queue_log.info(f"📊 Current queue size: {len(self.frame_buffer)}/{self.frame_buffer.capacity}")
         
         batch_start_time = time.time()
-        processed_count = 0
         
-        # Simply loop through frames and reuse existing add_frame logic
-        for pil_frame in pil_frames:
-            try:
-                self.add_frame(pil_frame)  # Reuse existing optimized logic
-                processed_count += 1
-            except Exception as e:
-                print(f"❌ Error processing frame in batch: {e}")
-                continue
+        try:
+            if isinstance(pil_frames, VideoClip):
+                # One contiguous array: block-copied into the ring when it is already in slot format
+                frames = pil_frames.array
+            else:
+                frames = [frame.convert('RGB') if isinstance(frame, Image.Image) and frame.mode != 'RGB' else frame
+                          for frame in pil_frames]
+            self._register_on_air(on_air)
+            processed_count = self.frame_buffer.write_batch(frames, clip_start=clip_start)
+            if processed_count < len(frames) and block_timeout > 0:
+                deadline = time.monotonic() + block_timeout
+                queue_log.info(f"⏳ Ring full - waiting for playback to free {len(frames) - processed_count} slots")
+                while processed_count < len(frames) and self._wait_for_free_slot(deadline):
+                    processed_count += self.frame_buffer.write_batch(frames[processed_count:], clip_start=clip_start and processed_count == 0)
+        except Exception as e:
+            print(f"❌ Error processing frame in batch: {e}")
+            processed_count = 0
+        
+        self.frames_added_total += processed_count
+        dropped = len(pil_frames) - processed_count
+        self.frames_dropped += dropped
         
         batch_duration = time.time() - batch_start_time
         batch_fps = processed_count / batch_duration if batch_duration > 0 else 0
         
         queue_log.info(f"📺 BATCH COMPLETE: {processed_count}/{len(pil_frames)} frames in {batch_duration:.2f}s ({batch_fps:.1f} fps)")
-        queue_log.info(f"📊 Final queue size: {self.frame_queue.qsize()}/{self.frame_queue.maxsize}")
+        if dropped:
+            queue_log.warning(f"⚠️ Ring full - dropped {dropped} frames")
+        queue_log.info(f"📊 Final queue size: {len(self.frame_buffer)}/{self.frame_buffer.capacity}")
         
         return processed_count
 
+    def add_encoded_clip(self, video_source, block_timeout: float = 0.0, on_air=None, on_last_frame=None):
+        """Decode an encoded clip (URL, path or file-like) straight into the ring slots.
+        
+        The decoder scales to the stream size and converts to the ring's pixel
+        format in one swscale pass - no PIL or RGB intermediate. Returns
+        (frames written, last frame as RGB array) or (0, None) when not streaming.
+        ``on_last_frame`` gets the last frame as soon as it is decoded, before
+        the clip has fit into the ring. ``block_timeout`` and ``on_air`` work
+        as in ``add_frame_batch``.
+        """
+        if not self.is_streaming:
+            queue_log.warning("❌ RTMP not streaming - rejecting encoded clip")
+            return 0, None
+        
+        try:
+            wait_for_space = None
+            if block_timeout > 0:
+                deadline = time.monotonic() + block_timeout
+                wait_for_space = lambda: self._wait_for_free_slot(deadline)
+            self._register_on_air(on_air)
+            written, decoded, last_frame, duration, first_frame_time = decode_into_ring(
+                video_source, self.frame_buffer, wait_for_space=wait_for_space, on_last_frame=on_last_frame
+            )
+        except Exception as e:
+            queue_log.error(f"❌ Failed to decode clip into ring: {e}")
+            return 0, None
+        
+        self.frames_added_total += written
+        self.frames_dropped += decoded - written
+        
+        decode_fps = decoded / duration if duration > 0 else 0
+        queue_log.info(f"📺 CLIP DECODED: {written}/{decoded} frames into ring in {duration:.2f}s ({decode_fps:.1f} fps)"
+                       + (f", first frame after {first_frame_time:.2f}s" if first_frame_time is not None else ""))
+        if decoded > written:
+            queue_log.warning(f"⚠️ Ring full - dropped {decoded - written} frames")
+        
+        return written, last_frame
+
     def _stream_loop(self):
-        """Send frames to FFmpeg at consistent FPS - REDUCED LOGGING"""
+        """Send frames to FFmpeg on an absolute monotonic schedule"""
         frame_duration = 1.0 / self.fps
-        last_real_frame = None
         frame_repeat_count = 0
         last_queue_size = 0
         
         queue_log.info("📺 Starting continuous frame streaming loop...")
         queue_log.info(f"📺 Target FPS: {self.fps}, Frame duration: {frame_duration:.3f}s")
         
+        self.pacer = FramePacer(self.fps)
+        self.pacer.start()
+        self._pts_base = 0
+        self.rate_controller = PlaybackRateController(
+            self.fps,
+            target_buffer_seconds=self.target_buffer_seconds,
+            min_rate=self.playback_rate_band[0],
+            max_rate=self.playback_rate_band[1],
+        )
+        
         loop_count = 0
-        while self.is_streaming and self.ffmpeg_process:
+        while self.is_streaming and self.encoder:
             loop_count += 1
             
-            # Fix: Check if ffmpeg already exited
-            if self.ffmpeg_process.poll() is not None:
-                queue_log.error("❌ FFmpeg process ended; stopping stream loop.")
-                self.is_streaming = False
-                break
+            # Health check: dead or stalled encoder gets hot-swapped
+            if loop_count % max(1, int(self.fps)) == 0:
+                problem = self.encoder.check_health()
+                if problem:
+                    queue_log.error(f"❌ Encoder unhealthy: {problem}")
+                    if not self._recover_encoder(problem):
+                        self.is_streaming = False
+                        break
                 
             # Debug logging every 30 seconds
             if loop_count % (self.fps * 30) == 0:
-                queue_log.info(f"🔄 Stream loop alive: {loop_count} iterations, queue: {self.frame_queue.qsize()}")
+                queue_log.info(f"🔄 Stream loop alive: {loop_count} iterations, queue: {len(self.frame_buffer)}")
 
-            loop_start = time.time()
+            # Sleep until the next absolute deadline; >1 means we are catching up
+            frames_due = self.pacer.wait_for_next()
             
             try:
-                # Try to get a real frame from the queue
-                current_queue_size = self.frame_queue.qsize()
+                # Preemption: drop unplayed frames so a reaction clip airs right away
+                trimmed = self.frame_buffer.apply_trim()
+                if trimmed:
+                    self.frames_trimmed += trimmed
+                    queue_log.info(f"✂️ Trimmed {trimmed} unplayed frames ({trimmed / self.fps:.1f}s)")
+                    # Clips whose first frame was trimmed never air
+                    for index in [i for i in list(self._air_callbacks) if i < self.frame_buffer.read_index]:
+                        self._air_callbacks.pop(index, None)
                 
-              
+                current_queue_size = len(self.frame_buffer)
+                frames, keyframes, consumed, underruns = self._collect_frames(frames_due, frame_repeat_count)
                 
-                try:
-                    # Use shorter timeout for better responsiveness
-                    timeout = 0.1 if current_queue_size == 0 else 0.001
-                    frame = self.frame_queue.get(timeout=timeout)
-                    last_real_frame = frame
+                if underruns < len(frames):
                     frame_repeat_count = 0
-                    
                     # Only log significant queue changes
                     if last_queue_size == 0 and current_queue_size > 5:
                         print(f"📺 Queue building up: {current_queue_size} frames")
-                        
-                except Empty:
-                    # Use last frame with subtle variation
-                    if last_real_frame is not None:
-                        frame = self._create_varied_frame(last_real_frame, frame_repeat_count)
-                        frame_repeat_count += 1
-                        
-                        # Only log queue empty occasionally
-                        if frame_repeat_count % (self.fps * 5) == 0:  # Every 5 seconds
-                            print(f"⚠️ Queue empty for {frame_repeat_count/self.fps:.1f}s - repeating frames")
-                    else:
-                        frame = self._create_placeholder_frame(self.frames_sent)
-                        if self.frames_sent % (self.fps * 5) == 0:  # Every 5 seconds
-                            print(f"⚠️ No frames available - using placeholder")
+                else:
+                    frame_repeat_count += len(frames)
+                    # Only log queue empty occasionally
+                    if self._has_hold_frame and frame_repeat_count % (self.fps * 5) == 0:  # Every 5 seconds
+                        print(f"⚠️ Queue empty for {frame_repeat_count/self.fps:.1f}s - repeating frames")
+                    elif not self._has_hold_frame and self.frames_sent % (self.fps * 5) == 0:
+                        print(f"⚠️ No frames available - using placeholder")
 
                 last_queue_size = current_queue_size
 
-                # Fix: Check if stdin is still available
-                if not self.ffmpeg_process or not self.ffmpeg_process.stdin:
-                    print("❌ FFmpeg stdin unavailable.")
+                # Send all due frames in one call - zero-copy from slot memory.
+                # PTS is the schedule index, so skipped deadlines stay skipped on the timeline.
+                self.encoder.write_frames(frames, self._pts_base + self.pacer.frame_index, keyframes)
+                self.frames_sent += len(frames)
+                self.frames_repeated += underruns
+                
+                # Release slots only after the encoder has the frames
+                if consumed:
+                    self.frame_buffer.advance(consumed)
+                if self._air_callbacks:
+                    self._fire_on_air()
+
+            except (BrokenPipeError, ValueError, EncoderError) as e:
+                print(f"❌ Streaming error (encoder closed): {e}")
+                # Unwritten frames were never released, so the new encoder resends them
+                if not self.is_streaming or not self._recover_encoder(f"encoder closed: {e}"):
                     self.is_streaming = False
                     break
-
-                # Send frame to FFmpeg
-                self.ffmpeg_process.stdin.write(frame.tobytes())
-                self.ffmpeg_process.stdin.flush()
-                self.frames_sent += 1
-
-            except (BrokenPipeError, ValueError) as e:
-                print(f"❌ Streaming error (pipe closed): {e}")
-                self.is_streaming = False
-                break
+                continue
             except Exception as e:
                 print(f"❌ Streaming error: {e}")
                 time.sleep(0.1)
+                # Re-anchor so the error pause is not replayed as a burst (same encoder, same timeline)
+                self._pts_base += self.pacer.frame_index
+                self.pacer.start()
                 continue
             
-            # Maintain precise FPS timing
-            elapsed = time.time() - loop_start
-            sleep_time = max(0, frame_duration - elapsed)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            else:
-                # Only log performance issues occasionally
-                if elapsed > frame_duration * 2 and self.frames_sent % (self.fps * 2) == 0:  # Every 2 seconds, only if 2x slower
-                    print(f"⚠️ Frame processing slow: {elapsed:.3f}s (target: {frame_duration:.3f}s)")
+            self.pacer.advance(len(frames))
         
         print("📺 Frame streaming loop ended")
 
-    def _create_placeholder_frame(self, frame_count):
-        """Create a black placeholder frame when no content is available"""
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+    def _collect_frames(self, count, repeat_count):
+        """Gather ``count`` output frames, resampling the buffer at the current playback rate.
+        
+        Returns (frames, keyframe_flags, consumed_slots, underrun_frames).
+        """
+        available = len(self.frame_buffer)
+        
+        if available == 0:
+            # Buffer empty - use last frame with subtle variation, or a placeholder
+            if self._has_hold_frame:
+                frame = self._create_varied_frame(self._hold_frame, repeat_count)
+            else:
+                frame = self._create_placeholder_frame(self.frames_sent)
+            return [frame] * count, [False] * count, 0, count
+        
+        # Each output frame advances the source by 0, 1 or 2 slots depending on the rate
+        self.rate_controller.update(available)
+        views = self.frame_buffer.peek_batch(2 * count)
+        read_index = self.frame_buffer.read_index
+        frames = []
+        keyframes = []
+        position = 0
+        underruns = 0
+        for _ in range(count):
+            if position < len(views):
+                frames.append(views[position])
+                keyframes.append(self._reaches_clip_start(read_index + position))
+                self._last_sent_index = read_index + position
+                position += self.rate_controller.step()
+            else:
+                # Catching up past the end of the buffer - repeat the newest real frame
+                frames.append(views[-1])
+                keyframes.append(False)
+                underruns += 1
+        consumed = min(position, len(views))
         
-        # Optional: Add subtle visual indicator
-        if frame_count % (self.fps * 4) < (self.fps * 2):  # Blink every 4 seconds
-            frame[10:20, 10:20] = [30, 30, 30]  # Small dark gray square
+        # About to release the last buffered slot - keep a copy for repeats
+        if consumed == available:
+            np.copyto(self._hold_frame, views[-1])
+            self._has_hold_frame = True
         
-        return frame
+        return frames, keyframes, consumed, underruns
+
+    def _reaches_clip_start(self, index: int) -> bool:
+        """True if a clip starts at or since the last scanned slot (compressed playback may skip it)"""
+        start = max(self._keyframe_scan_index, self.frame_buffer.read_index)
+        if index < start:
+            return False  # Same slot shown again
+        self._keyframe_scan_index = index + 1
+        return any(self.frame_buffer.is_clip_start(i) for i in range(start, index + 1))
+
+    def _create_placeholder_frame(self, frame_count):
+        """Return a preallocated black placeholder frame when no content is available"""
+        # Blink a small indicator every 4 seconds
+        blink = frame_count % (self.fps * 4) < (self.fps * 2)
+        return self._placeholder_frames[1 if blink else 0]
 
     def _create_varied_frame(self, base_frame, variation_count):
         """Create subtle variation of the last frame to avoid static appearance"""
-        # Make a copy to avoid modifying the original
-        frame = base_frame.copy()
-        
-        # Add very subtle brightness variation (±1-2 levels)
+        # Very subtle brightness variation (±1 level), saturated into the scratch slot
         variation = (variation_count % 3) - 1  # -1, 0, or 1
-        if variation != 0:
-            frame = np.clip(frame.astype(np.int16) + variation, 0, 255).astype(np.uint8)
+        if variation == 0:
+            return base_frame
+        
+        if self.frame_buffer.pix_fmt == "yuv420p":
+            # Only touch the luma plane - chroma is copied unchanged
+            luma_rows = self.height
+            np.copyto(self._scratch_frame[luma_rows:], base_frame[luma_rows:])
+            base, out, delta = base_frame[:luma_rows], self._scratch_frame[:luma_rows], 1
+        else:
+            base, out, delta = base_frame, self._scratch_frame, (1, 1, 1, 0)
         
-        return frame
+        if variation > 0:
+            cv2.add(base, delta, dst=out)
+        else:
+            cv2.subtract(base, delta, dst=out)
+        return self._scratch_frame
 
 
     def get_status(self) -> dict:
@@ -323,8 +658,19 @@ class FFmpegRTMPStreamer(Monitorable):
             "is_streaming": self.is_streaming,
             "frames_sent": self.frames_sent,
             "frames_dropped": self.frames_dropped,
-            "queue_size": self.frame_queue.qsize(),
+            "queue_size": len(self.frame_buffer) if self.frame_buffer is not None else 0,
+            "buffer_capacity": self.buffer_capacity,
+            "input_pix_fmt": self.frame_buffer.pix_fmt if self.frame_buffer is not None else self.input_pix_fmt,
+            "buffer_mb": round(self.frame_buffer.nbytes / 1024**2, 1) if self.frame_buffer is not None else 0,
             "current_fps": round(self.frames_sent / max(1, time.time() - (self.start_time or time.time())), 1),
-            "target_fps": self.fps
+            "target_fps": self.fps,
+            "outputs": bool(self.stream_key) + len(self.extra_outputs) + bool(self.record_path) + bool(self.null_sink),
+            "low_rendition": bool(self.low_rendition),
+            "encoder_backend": self.encoder_backend,
+            "frames_repeated": self.frames_repeated,
+            "frames_trimmed": self.frames_trimmed,
+            "pacing": self.pacer.get_status() if self.pacer else {},
+            "playback": self.rate_controller.get_status() if self.rate_controller else {},
+            "encoder": self.encoder.get_status() if self.encoder else {}
         }
 
@@ -0,0 +1,186 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from streaming_pipeline.models import Monitorable, VideoClip
+
+
+class ClipTransition(Monitorable):
+    """
+    Blends the tail of clip N into the head of clip N+1.
+
+    The last ``overlap_frames`` of every clip are held back. When the next
+    clip arrives they are blended with its first frames over the whole
+    overlap window at once (batched NumPy, no per-frame Python loop):
+
+    - ``crossfade``: eased linear mix from the old tail to the new head
+    - ``motion_blend``: crossfade followed by a 3-tap temporal filter, which
+      smears motion across the cut like a short shutter blur (no optical flow)
+    """
+
+    MODES = ("none", "crossfade", "motion_blend")
+
+    def __init__(self, mode: str = "crossfade", overlap_frames: int = 8):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown transition mode '{mode}', expected one of {self.MODES}")
+
+        self.mode = mode
+        self.overlap_frames = overlap_frames
+
+        # Frames held back from the previous clip (K, H, W, 3) uint8
+        self._held_tail: Optional[np.ndarray] = None
+
+        # Performance tracking for monitoring
+        self.transitions_applied = 0
+        self.total_blend_time = 0.0
+        self.last_blend_time = 0.0
+        self.last_blend_frames = 0
+
+    def apply(self, frames, continuation: bool = False):
+        """Blend with the held tail and hold back this clip's tail.
+
+        Accepts a VideoClip (blended in place, returned as a view without the
+        tail) or a list of PIL images or HxWx3 uint8 arrays, and returns the
+        same kind. The result is shorter than the input by the overlap
+        length, which is released with the next clip. ``continuation`` marks
+        a later chunk of the same clip: the held tail goes back in front of
+        it unblended and the chunk's own tail is held instead.
+        """
+        if self.mode == "none" or self.overlap_frames <= 0 or frames is None or not len(frames):
+            return frames
+        if continuation:
+            return self._continue(frames)
+        if isinstance(frames, VideoClip):
+            return self._apply_clip(frames)
+
+        as_pil = isinstance(frames[0], Image.Image)
+        overlap = min(self.overlap_frames, len(frames) // 2)
+        if overlap == 0:
+            return frames
+
+        body = list(frames[:len(frames) - overlap])
+        new_tail = np.stack([np.asarray(frame) for frame in frames[len(frames) - overlap:]])
+
+        tail = self._held_tail
+        self._held_tail = new_tail
+
+        if tail is None or tail.shape[1:] != new_tail.shape[1:]:
+            # First clip (or resolution change) - nothing to blend against
+            return body
+
+        window = min(len(tail), len(body))
+        start_time = time.time()
+
+        head = np.stack([np.asarray(frame) for frame in body[:window]])
+        blended = self._blend(tail[-window:], head)
+
+        self.last_blend_time = time.time() - start_time
+        self.last_blend_frames = window
+        self.total_blend_time += self.last_blend_time
+        self.transitions_applied += 1
+
+        if as_pil:
+            blended_frames = [Image.fromarray(frame) for frame in blended]
+        else:
+            blended_frames = list(blended)
+        return blended_frames + body[window:]
+
+    def _apply_clip(self, clip: VideoClip) -> VideoClip:
+        overlap = min(self.overlap_frames, len(clip) // 2)
+        if overlap == 0:
+            return clip
+
+        body = clip[:len(clip) - overlap]
+        tail = self._held_tail
+        # Copied so the held frames don't keep the whole clip array alive
+        self._held_tail = clip.array[len(clip) - overlap:].copy()
+
+        if tail is None or tail.shape[1:] != self._held_tail.shape[1:]:
+            return body
+
+        window = min(len(tail), len(body))
+        start_time = time.time()
+        body.array[:window] = self._blend(tail[-window:], body.array[:window])
+
+        self.last_blend_time = time.time() - start_time
+        self.last_blend_frames = window
+        self.total_blend_time += self.last_blend_time
+        self.transitions_applied += 1
+        return body
+
+    def _continue(self, frames):
+        """Release the held tail ahead of this chunk and hold the chunk's tail (no cut to blend)"""
+        overlap = min(self.overlap_frames, len(frames))
+        tail = self._held_tail
+        if isinstance(frames, VideoClip):
+            self._held_tail = frames.array[len(frames) - overlap:].copy()
+            body = frames[:len(frames) - overlap]
+            if tail is None or tail.shape[1:] != self._held_tail.shape[1:]:
+                return body
+            return VideoClip(np.concatenate([tail, body.array]))
+
+        as_pil = isinstance(frames[0], Image.Image)
+        self._held_tail = np.stack([np.asarray(frame) for frame in frames[len(frames) - overlap:]])
+        body = list(frames[:len(frames) - overlap])
+        if tail is None or tail.shape[1:] != self._held_tail.shape[1:]:
+            return body
+        held = [Image.fromarray(frame) for frame in tail] if as_pil else list(tail)
+        return held + body
+
+    def _blend(self, tail: np.ndarray, head: np.ndarray) -> np.ndarray:
+        """Blend two (K, H, W, 3) uint8 windows into one"""
+        count = len(head)
+
+        # Smoothstep weights, excluding the pure endpoints
+        weights = np.arange(1, count + 1, dtype=np.float32) / (count + 1)
+        weights = (weights * weights * (3.0 - 2.0 * weights)).reshape(count, 1, 1, 1)
+
+        # tail + w * (head - tail), computed in place on one float buffer
+        mixed = head.astype(np.float32)
+        mixed -= tail
+        mixed *= weights
+        mixed += tail
+
+        if self.mode == "motion_blend" and count >= 3:
+            padded = np.concatenate([mixed[:1], mixed, mixed[-1:]])
+            mixed = 0.25 * padded[:-2] + 0.5 * padded[1:-1] + 0.25 * padded[2:]
+
+        # Convex combinations of uint8 inputs never leave [0, 255]
+        return np.rint(mixed, out=mixed).astype(np.uint8)
+
+    @property
+    def held_tail(self) -> Optional[np.ndarray]:
+        """Frames held back for the next blend (not yet on air)"""
+        return self._held_tail
+
+    def restore_tail(self, tail: Optional[np.ndarray]):
+        """Hold ``tail`` as if it were the end of the previous clip (warm resume)"""
+        self._held_tail = np.asarray(tail, dtype=np.uint8) if tail is not None and len(tail) else None
+
+    def flush(self) -> List[np.ndarray]:
+        """Release the held tail without blending (e.g. when no clip will follow)"""
+        tail, self._held_tail = self._held_tail, None
+        return list(tail) if tail is not None else []
+
+    def reset_metrics(self):
+        """Reset performance metrics and drop the held tail"""
+        self._held_tail = None
+        self.transitions_applied = 0
+        self.total_blend_time = 0.0
+        self.last_blend_time = 0.0
+        self.last_blend_frames = 0
+        print("🧹 Clip transition metrics reset")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get clip transition performance metrics"""
+        return {
+            "mode": self.mode,
+            "overlap_frames": self.overlap_frames,
+            "transitions_applied": self.transitions_applied,
+            "last_blend_time": round(self.last_blend_time, 4),
+            "last_blend_per_frame": round(self.last_blend_time / max(1, self.last_blend_frames), 5),
+            "avg_blend_time": round(self.total_blend_time / max(1, self.transitions_applied), 4),
+            "holding_frames": len(self._held_tail) if self._held_tail is not None else 0,
+        }
@@ -1,7 +1,8 @@
 from PIL import Image, ImageDraw, ImageFont
 from typing import Optional, Dict, Any, List
 import time
-from streaming_pipeline.models import Monitorable
+import numpy as np
+from streaming_pipeline.models import Monitorable, VideoClip
 
 
 class TextOverlay(Monitorable):
@@ -22,6 +23,9 @@ class TextOverlay(Monitorable):
         self.cached_font = None
         self._initialize_font()  # Cache font once at startup
         
+        # Text rendered once per string for array frames: (text, frame size, patch)
+        self._cached_patch = None
+        
         # Performance tracking for monitoring
         self.total_frames_processed = 0
         self.total_processing_time = 0.0
@@ -57,44 +61,117 @@ class TextOverlay(Monitorable):
                 self.cached_font = None
         return self.cached_font
     
-    def apply_overlay(self, frame: Image.Image) -> Image.Image:
+    def _draw_text(self, draw: ImageDraw.ImageDraw, text: str, text_x: int, text_y: int,
+                   border=(0, 0, 0), fill=(255, 255, 255)):
+        """Draw text with a simple 1px border using the cached font"""
+        font = self.cached_font
+        
+        # Draw text with simple black border
+        for adj_x in [-1, 0, 1]:
+            for adj_y in [-1, 0, 1]:
+                if adj_x != 0 or adj_y != 0:
+                    draw.text((text_x + adj_x, text_y + adj_y), text, font=font, fill=border)
+        
+        # Draw white text on top
+        draw.text((text_x, text_y), text, font=font, fill=fill)
+    
+    def apply_overlay(self, frame: Image.Image, text: Optional[str] = None) -> Image.Image:
         """Apply text overlay to frame - optimized with cached font"""
-        if not self.current_text:
+        text = text if text is not None else self.current_text
+        if not text:
             return frame
         
         # Create copy to avoid modifying original
         overlay_frame = frame.copy()
         draw = ImageDraw.Draw(overlay_frame)
         
-        # Use cached font for performance
-        font = self.cached_font
+        # Position at bottom of frame (frame height - generation size may change with adaptive quality)
+        self._draw_text(draw, text, 20, overlay_frame.height - 60)
         
-        # Position at bottom of frame
-        text_y = self.height - 60
-        text_x = 20
+        return overlay_frame
+    
+    def _text_patch(self, text: str, frame_height: int, frame_width: int):
+        """Render ``text`` once into an RGBA strip and return (y0, y1, premultiplied rgb, 1 - alpha)"""
+        key = (text, frame_height, frame_width)
+        if self._cached_patch and self._cached_patch[0] == key:
+            return self._cached_patch[1]
         
-        # Draw text with simple black border
-        for adj_x in [-1, 0, 1]:
-            for adj_y in [-1, 0, 1]:
-                if adj_x != 0 or adj_y != 0:
-                    draw.text((text_x + adj_x, text_y + adj_y), self.current_text, font=font, fill=(0, 0, 0))
+        strip = Image.new("RGBA", (frame_width, frame_height), (0, 0, 0, 0))
+        self._draw_text(ImageDraw.Draw(strip), text, 20, frame_height - 60,
+                        border=(0, 0, 0, 255), fill=(255, 255, 255, 255))
+        rgba = np.asarray(strip)
+        rows = np.flatnonzero(rgba[..., 3].any(axis=1))
+        if len(rows) == 0:
+            patch = None
+        else:
+            y0, y1 = rows[0], rows[-1] + 1
+            rgb = rgba[y0:y1, :, :3].astype(np.float32)
+            alpha = rgba[y0:y1, :, 3:].astype(np.float32) / 255.0
+            patch = (y0, y1, rgb * alpha, 1.0 - alpha)
+        self._cached_patch = (key, patch)
+        return patch
+    
+    def _apply_overlay_arrays(self, frames: List[np.ndarray], text: str) -> List[np.ndarray]:
+        """Alpha-blend the pre-rendered text strip onto HxWx3 uint8 frames (only the text rows are touched)"""
+        height, width = frames[0].shape[:2]
+        patch = self._text_patch(text, height, width)
+        if patch is None:
+            return frames
+        y0, y1, premultiplied, inverse_alpha = patch
         
-        # Draw white text on top
-        draw.text((text_x, text_y), self.current_text, font=font, fill=(255, 255, 255))
+        overlaid_frames = []
+        for frame in frames:
+            overlaid = frame.copy()
+            region = overlaid[y0:y1]
+            np.rint(region * inverse_alpha + premultiplied, out=region, casting="unsafe")
+            overlaid_frames.append(overlaid)
+        return overlaid_frames
+    
+    # Frames blended per step - bounds the float scratch to a few tens of MB
+    CLIP_CHUNK = 32
+    
+    def _apply_overlay_clip(self, clip: VideoClip, text: str, in_place: bool) -> VideoClip:
+        """Blend the text strip onto every frame of a clip at once (only the text rows are touched)"""
+        patch = self._text_patch(text, clip.height, clip.width)
+        if patch is None:
+            return clip
+        y0, y1, premultiplied, inverse_alpha = patch
         
-        return overlay_frame
+        if not in_place:
+            clip = clip.copy()
+        rows = clip.array[:, y0:y1]
+        scratch = np.empty((min(self.CLIP_CHUNK, len(clip)),) + rows.shape[1:], dtype=np.float32)
+        for start in range(0, len(clip), self.CLIP_CHUNK):
+            region = rows[start:start + self.CLIP_CHUNK]
+            blend = scratch[:len(region)]
+            np.multiply(region, inverse_alpha, out=blend)
+            blend += premultiplied
+            np.rint(blend, out=blend)
+            region[...] = blend  # Blends of uint8 values stay in [0, 255]
+        return clip
     
-    def apply_overlay_batch(self, frames: List[Image.Image]) -> List[Image.Image]:
-        """Apply overlay to multiple frames with performance tracking"""
-        if not frames:
+    def apply_overlay_batch(self, frames, text: Optional[str] = None, in_place: bool = False):
+        """Apply overlay to a VideoClip (or a list of PIL images / RGB arrays) with performance tracking
+        
+        ``text`` overrides the current overlay text, so a clip can carry the
+        text that was live when it was generated. ``in_place`` draws straight
+        into a VideoClip's array instead of a copy.
+        """
+        if frames is None or not len(frames):
             return frames
         
+        text = text if text is not None else self.current_text
         start_time = time.time()
         
-        overlaid_frames = []
-        for frame in frames:
-            overlaid_frame = self.apply_overlay(frame)
-            overlaid_frames.append(overlaid_frame)
+        if isinstance(frames, VideoClip):
+            overlaid_frames = self._apply_overlay_clip(frames, text, in_place) if text else frames
+        elif isinstance(frames[0], np.ndarray):
+            overlaid_frames = self._apply_overlay_arrays(frames, text) if text else list(frames)
+        else:
+            overlaid_frames = []
+            for frame in frames:
+                overlaid_frame = self.apply_overlay(frame, text)
+                overlaid_frames.append(overlaid_frame)
         
         # Track performance
         self.last_batch_time = time.time() - start_time
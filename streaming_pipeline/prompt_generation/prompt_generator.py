@@ -55,12 +55,13 @@ class PromptGenerator(Monitorable):
         self.last_input_length = 0
         self.last_output_length = 0 
         self.last_generation_time = 0.0
+        self.last_call_span = None
     
     def _select_model_and_client(self, context):
         """Select optimal model and client based on requirements"""
         
         if self.USE_GROQ and self.groq_client:
-            if self.VISUAL_MODE and context.current_frame_base64:
+            if self.VISUAL_MODE and context.current_frame is not None:
                 # Use Groq's Llama 4 Scout for vision - fast and capable!
                 print("🖼️ Using Groq Llama 4 Scout for FAST vision inference")
                 return "meta-llama/llama-4-scout-17b-16e-instruct", self.groq_client
@@ -70,7 +71,7 @@ class PromptGenerator(Monitorable):
                 return "llama-3.1-8b-instant", self.groq_client
         
         # Fallback to OpenAI only if Groq not available
-        elif self.VISUAL_MODE and context.current_frame_base64:
+        elif self.VISUAL_MODE and context.current_frame is not None:
             print("🔄 Falling back to OpenAI GPT-4o for vision")
             return "gpt-4o", self.openai_client
         else:
@@ -103,7 +104,7 @@ class PromptGenerator(Monitorable):
         messages = [{"role": "system", "content": formatted_prompt}]
         
         # Add visual context if enabled and available
-        if self.VISUAL_MODE and context.current_frame_base64:
+        if self.VISUAL_MODE and context.current_frame is not None:
             try:
                 user_message = {
                     "role": "user", 
@@ -147,6 +148,7 @@ class PromptGenerator(Monitorable):
             
             # Track timing
             self.last_generation_time = time.time() - start_time
+            self.last_call_span = (start_time, start_time + self.last_generation_time)  # For tracing
             self.total_response_time += self.last_generation_time
             self.total_prompts += 1
             
@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from streaming_pipeline.input.twitch_listener import TwitchChatListener
+
+
+DEFAULT_MESSAGES = [
+    "make it rain",
+    "turn the sky purple",
+    "add a dragon flying over the city",
+    "lol",
+    "KEKW KEKW",
+    "show a giant cat walking through the streets",
+    "zoom in on the tower now",
+    "this is so cool",
+    "!followage",
+    "make everything explode into confetti",
+    "what model is this",
+    "put a spaceship in the sky",
+]
+
+
+class ScriptedChatListener(TwitchChatListener):
+    """
+    Twitch listener that replays a chat script instead of connecting to IRC.
+
+    Messages go through the real IRC line parser, comment queue and comment
+    callbacks. The script is a list of ``(seconds_from_start, username,
+    message)``; without one, messages from ``messages`` arrive as a Poisson
+    process at ``rate`` per second.
+    """
+
+    def __init__(self, channel_name: str = "simulation", script: Optional[List[Tuple[float, str, str]]] = None,
+                 rate: float = 0.5, messages: Optional[List[str]] = None, seed: Optional[int] = None):
+        super().__init__(channel_name)
+        self.script = sorted(script or [], key=lambda entry: entry[0])
+        self.rate = rate
+        self.messages = messages or DEFAULT_MESSAGES
+        self._rng = random.Random(seed)
+        self.comments_sent = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ScriptedChatListener":
+        """Load a JSONL script: one ``{"t": seconds, "user": name, "message": text}`` per line"""
+        script = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    script.append((float(entry["t"]), entry["user"], entry["message"]))
+        return cls(script=script, **kwargs)
+
+    def _listen_loop(self):
+        start_time = time.time()
+        for offset, username, message in self._timeline():
+            while self.is_listening and time.time() - start_time < offset:
+                # The offset may pass between the check and here - never sleep a negative time
+                time.sleep(max(0.0, min(0.1, offset - (time.time() - start_time))))
+            if not self.is_listening:
+                return
+            self._process_message(f":{username}!{username}@{username}.tmi.twitch.tv "
+                                  f"PRIVMSG #{self.channel_name} :{message}")
+            self.comments_sent += 1
+
+    def _timeline(self):
+        if self.script:
+            yield from self.script
+            return
+        if self.rate <= 0:
+            return
+        offset = 0.0
+        while self.is_listening:
+            offset += self._rng.expovariate(self.rate)
+            yield offset, f"viewer{self._rng.randint(1, 50)}", self._rng.choice(self.messages)
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status["comments_sent"] = self.comments_sent
+        return status
@@ -0,0 +1,378 @@
+import base64
+import io
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+import av
+import numpy as np
+import requests
+from PIL import Image
+
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames, Monitorable, VideoClip
+from streaming_pipeline.simulation.generator import LatencyModel, render_clip
+from streaming_pipeline.video_generation.clip_decoder import HTTPStream, decode_frames
+from streaming_pipeline.video_generation.fal_jobs import FalJobManager
+
+
+# Status objects named like fal_client's, so FalJobManager treats both the same
+class Queued:
+    def __init__(self, position: int):
+        self.position = position
+
+
+class InProgress:
+    def __init__(self, logs=None):
+        self.logs = logs
+
+
+class Completed:
+    def __init__(self, logs=None, metrics=None):
+        self.logs = logs
+        self.metrics = metrics or {}
+
+
+class LocalRequestHandle:
+    """``fal_client.SyncRequestHandle`` stand-in talking to a LocalFalQueue over HTTP"""
+
+    def __init__(self, session: requests.Session, payload: Dict[str, Any]):
+        self.session = session
+        self.request_id = payload["request_id"]
+        self.status_url = payload["status_url"]
+        self.response_url = payload["response_url"]
+        self.cancel_url = payload["cancel_url"]
+
+    def status(self, with_logs: bool = False):
+        response = self.session.get(self.status_url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if data["status"] == "IN_QUEUE":
+            return Queued(data.get("queue_position", 0))
+        if data["status"] == "IN_PROGRESS":
+            return InProgress()
+        return Completed()
+
+    def get(self) -> Dict[str, Any]:
+        response = self.session.get(self.response_url, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def cancel(self):
+        self.session.put(self.cancel_url, timeout=10).raise_for_status()
+
+
+class LocalQueueClient:
+    """The ``fal_client.submit`` part of fal_client, pointed at a LocalFalQueue"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def submit(self, application: str, arguments: Dict[str, Any]) -> LocalRequestHandle:
+        response = self.session.post(f"{self.base_url}/{application}", json=arguments, timeout=10)
+        response.raise_for_status()
+        return LocalRequestHandle(self.session, response.json())
+
+
+class LocalFalQueue(Monitorable):
+    """
+    Local stand-in for the fal queue REST protocol, for exercising the API path offline.
+
+    - ``POST /<app>`` queues a job and returns its request id and its
+      status, response and cancel URLs.
+    - ``GET .../requests/<id>/status`` reports IN_QUEUE (with queue
+      position), IN_PROGRESS or COMPLETED.
+    - ``GET .../requests/<id>`` returns ``{"video": {"url": ...}}``.
+    - ``PUT .../requests/<id>/cancel`` cancels a job that is still
+      queued or running.
+
+    ``workers`` jobs run at a time. Each takes a time drawn from
+    ``latency`` and produces a fragmented MP4 that continues the job's
+    ``image_url``, served from ``/files/<id>.mp4``. The MP4 decodes while
+    it downloads, like fal's CDN clips. ``bandwidth`` (bytes/s) throttles
+    downloads so the download time shows up.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None, workers: int = 1, width: int = 640,
+                 height: int = 360, fps: int = 24, bandwidth: Optional[float] = None):
+        self.latency = latency or LatencyModel(base=3.0, per_frame=0.02)
+        self.workers = workers
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.bandwidth = bandwidth
+
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, bytes] = {}
+        self._queue = []
+        self._cond = threading.Condition()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url = ""
+        self.reset_metrics()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "LocalFalQueue":
+        queue = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._json(200, queue._submit(self.path.strip("/"), json.loads(body or b"{}")))
+
+            def do_GET(self):
+                if self.path.startswith("/files/"):
+                    return self._file(self.path.rsplit("/", 1)[-1].split(".")[0])
+                code, payload = queue._lookup(self.path)
+                self._json(code, payload)
+
+            def do_PUT(self):
+                code, payload = queue._cancel(self.path)
+                self._json(code, payload)
+
+            def _json(self, code: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _file(self, request_id: str):
+                data = queue.files.get(request_id)
+                if data is None:
+                    return self._json(404, {"detail": "Not found"})
+                self.send_response(200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                chunk = 64 * 1024
+                for offset in range(0, len(data), chunk):
+                    self.wfile.write(data[offset:offset + chunk])
+                    if queue.bandwidth:
+                        time.sleep(chunk / queue.bandwidth)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        for _ in range(self.workers):
+            threading.Thread(target=self._work_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+
+    def _submit(self, application: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = uuid.uuid4().hex
+        base = f"{self.url}/{application}/requests/{request_id}"
+        job = {"status": "IN_QUEUE", "arguments": arguments, "submitted_at": time.time(), "result": None,
+               "cancelled": threading.Event()}
+        with self._cond:
+            self.jobs[request_id] = job
+            self._queue.append(request_id)
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._cond.notify()
+        return {"request_id": request_id, "status_url": f"{base}/status", "response_url": base,
+                "cancel_url": f"{base}/cancel", "queue_position": len(self._queue) - 1}
+
+    def _job_for(self, path: str):
+        parts = path.strip("/").split("/")
+        if "requests" not in parts:
+            return None, None, parts
+        request_id = parts[parts.index("requests") + 1]
+        return request_id, self.jobs.get(request_id), parts
+
+    def _lookup(self, path: str):
+        request_id, job, parts = self._job_for(path)
+        if job is None:
+            return 404, {"detail": "Request not found"}
+        if parts[-1] == "status":
+            status = {"status": job["status"], "request_id": request_id}
+            if job["status"] == "IN_QUEUE":
+                with self._cond:
+                    status["queue_position"] = self._queue.index(request_id) if request_id in self._queue else 0
+            return 200, status
+        if job["status"] != "COMPLETED":
+            return 400, {"detail": "Request is still in progress"}
+        return 200, job["result"]
+
+    def _cancel(self, path: str):
+        request_id, job, _ = self._job_for(path)
+        if job is None:
+            return 404, {"detail": "Request not found"}
+        with self._cond:
+            if job["status"] == "COMPLETED":
+                return 400, {"status": "ALREADY_COMPLETED"}
+            job["cancelled"].set()
+            if request_id in self._queue:
+                self._queue.remove(request_id)
+            job["status"] = "CANCELLED"
+            self.cancelled += 1
+        return 202, {"status": "CANCELLATION_REQUESTED"}
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _work_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                request_id = self._queue.pop(0)
+                job = self.jobs[request_id]
+                job["status"] = "IN_PROGRESS"
+            self._run(request_id, job)
+
+    def _run(self, request_id: str, job: Dict[str, Any]):
+        arguments = job["arguments"]
+        num_frames = int(arguments.get("duration", 6)) * self.fps
+        if job["cancelled"].wait(self.latency.sample(num_frames)):
+            return
+
+        frames = render_clip(self._decode_image(arguments.get("image_url", "")), num_frames)
+        self.files[request_id] = self._encode(frames)
+        with self._cond:
+            if job["cancelled"].is_set():
+                return
+            job["result"] = {"video": {"url": f"{self.url}/files/{request_id}.mp4",
+                                       "content_type": "video/mp4"}}
+            job["status"] = "COMPLETED"
+            self.completed += 1
+
+    def _decode_image(self, image_url: str) -> np.ndarray:
+        try:
+            data = base64.b64decode(image_url.split(",", 1)[1] if "," in image_url else image_url)
+            image = Image.open(io.BytesIO(data)).convert("RGB").resize((self.width, self.height))
+            return np.array(image)
+        except Exception:
+            return np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def _encode(self, frames) -> bytes:
+        buffer = io.BytesIO()
+        # Fragmented MP4: playable from the first fragment, so it decodes while downloading
+        container = av.open(buffer, "w", format="mp4", options={"movflags": "frag_keyframe+empty_moov"})
+        stream = container.add_stream("libx264", rate=self.fps, options={"preset": "ultrafast"})
+        stream.width, stream.height, stream.pix_fmt = self.width, self.height, "yuv420p"
+        for frame in frames:
+            for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format="rgb24")):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+        container.close()
+        return buffer.getvalue()
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def reset_metrics(self):
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.max_queue_depth = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": "local-fal-queue",
+            "url": self.url,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "queued": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class FalQueueGenerator(Monitorable):
+    """
+    CPU stand-in for RealtimeGenerator's ltxv2-preview path, against a LocalFalQueue.
+
+    Uses the real FalJobManager and clip decoder. Each request is submitted
+    to the queue and collected in order. The clip the manager prefetched is
+    then decoded to frames or, with ``decode_frames=False``, handed back as
+    ``video_source`` for the engine to decode straight into the ring. A
+    ``cancel_event`` cancels the job on the queue.
+    """
+
+    ENDPOINT = "fal-ai/ltxv-2-preview/image-to-video/fast"
+
+    def __init__(self, queue: LocalFalQueue, poll_interval: float = 0.1):
+        self.queue = queue
+        self.fal_jobs = FalJobManager(self.ENDPOINT, client=LocalQueueClient(queue.url), poll_interval=poll_interval)
+        self.reset_metrics()
+
+    def setup(self):
+        pass
+
+    def generate_video_from_image(self, request: LTXVideoRequestI2V, cancel_event: Optional[threading.Event] = None,
+                                  stream: str = "default") -> LTXVideoResponseWithFrames:
+        start_time = time.time()
+        image_data = request.image_base64
+        if not image_data and request.conditioning_frame is not None:
+            image_data = request.conditioning_frame.base64
+        fal_input = {"image_url": image_data if image_data.startswith("data:image")
+                     else f"data:image/jpeg;base64,{image_data}", "prompt": request.prompt}
+        if request.duration:
+            fal_input["duration"] = int(request.duration)
+
+        try:
+            job = self.fal_jobs.result(self.fal_jobs.submit(fal_input, stream=stream), cancel_event)
+        except GenerationPreempted:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        video = job.video or HTTPStream(job.video_url)
+
+        frames = None
+        if request.decode_frames:
+            frames = VideoClip.from_frames(decode_frames(video, request.width, request.height))
+            self.frames_generated += len(frames)
+        else:
+            self.frames_generated += int(fal_input.get("duration", 6)) * self.queue.fps
+
+        self.last_generation_time = time.time() - start_time
+        self.total_generation_time += self.last_generation_time
+        self.generations += 1
+        return LTXVideoResponseWithFrames(frames=frames, video_url=job.video_url,
+                                          video_source=None if request.decode_frames else video)
+
+    def reset_metrics(self):
+        self.generations = 0
+        self.cancelled = 0
+        self.failures = 0
+        self.frames_generated = 0
+        self.total_generation_time = 0.0
+        self.last_generation_time = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": "fal-queue",
+            "generations": self.generations,
+            "cancelled": self.cancelled,
+            "failures": self.failures,
+            "frames_generated": self.frames_generated,
+            "last_generation_time": round(self.last_generation_time, 2),
+            "avg_generation_time": round(self.total_generation_time / max(1, self.generations), 2),
+            "fal_jobs": self.fal_jobs.get_status(),
+        }
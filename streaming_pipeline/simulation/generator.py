@@ -0,0 +1,152 @@
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames, Monitorable, VideoClip
+
+
+class LatencyModel:
+    """
+    Generation time for a clip: ``base + per_frame * num_frames``, scaled by
+    lognormal jitter (``jitter`` is sigma of the log) and occasionally by
+    ``spike_factor`` with probability ``spike_probability`` (GPU contention,
+    cold caches, slow API queue).
+    """
+
+    def __init__(self, base: float = 2.0, per_frame: float = 0.05, jitter: float = 0.15,
+                 spike_probability: float = 0.0, spike_factor: float = 3.0, seed: Optional[int] = None):
+        self.base = base
+        self.per_frame = per_frame
+        self.jitter = jitter
+        self.spike_probability = spike_probability
+        self.spike_factor = spike_factor
+        self._rng = random.Random(seed)
+
+    def sample(self, num_frames: int) -> float:
+        latency = self.base + self.per_frame * num_frames
+        if self.jitter > 0:
+            latency *= self._rng.lognormvariate(0.0, self.jitter)
+        if self.spike_probability > 0 and self._rng.random() < self.spike_probability:
+            latency *= self.spike_factor
+        return latency
+
+
+def render_clip(base: np.ndarray, num_frames: int) -> np.ndarray:
+    """(N, H, W, 3) clip continuing ``base``: slow pan plus a sweeping bar so clip boundaries and dropped frames are visible"""
+    height, width = base.shape[:2]
+    frames = np.empty((num_frames, height, width, 3), dtype=np.uint8)
+    bar_width = max(4, width // 32)
+    for index, frame in enumerate(frames):
+        frame[:] = np.roll(base, shift=index, axis=1)  # 1px/frame pan keeps the next conditioning frame related
+        x = (index * 4) % max(1, width - bar_width)
+        cv2.rectangle(frame, (x, 0), (x + bar_width, height // 16), (255, 255, 255), -1)
+    return frames
+
+
+class ProceduralGenerator(Monitorable):
+    """
+    CPU stand-in for RealtimeGenerator.
+
+    Renders a clip from the conditioning frame (slow pan plus a sweeping bar
+    so clip boundaries and dropped frames are visible in a dump) and sleeps
+    out the rest of the time drawn from ``latency``. Honours ``cancel_event``
+    like the real backends, so preemption can be exercised offline. With
+    ``failure_probability`` a job fails at the end of its latency instead of
+    returning, like an API error or timeout. With ``request.chunk_frames``
+    (ltxv1 requests only, as with the real generator) the clip is rendered and timed chunk by chunk (each chunk paying the
+    latency of its frames plus the overlap it re-generates), and each chunk
+    is passed to ``on_frames`` when its time is up.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None, cancel_poll_interval: float = 0.05,
+                 failure_probability: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency or LatencyModel()
+        self.cancel_poll_interval = cancel_poll_interval
+        self.failure_probability = failure_probability
+        self._rng = random.Random(seed)
+        self.reset_metrics()
+
+    def setup(self):
+        pass
+
+    def generate_video_from_image(self, request: LTXVideoRequestI2V, cancel_event: Optional[threading.Event] = None,
+                                  on_frames=None) -> LTXVideoResponseWithFrames:
+        start_time = time.time()
+        frames = self._render(request)
+
+        if request.model_type == "ltxv1" and request.chunk_frames and request.chunk_frames < request.num_frames:
+            chunk_size = request.chunk_frames - request.chunk_overlap
+            # Same limits as the LTX pipeline, so a bad config fails here too
+            for name, value in (("chunk_frames", request.chunk_frames), ("chunk_overlap", request.chunk_overlap)):
+                if value < 1 or (value - 1) % 8:
+                    raise ValueError(f"{name} must be 8k + 1 (9, 17, 25, 33, 41, ...), got {value}")
+            if chunk_size <= 0:
+                raise ValueError(f"chunk_frames ({request.chunk_frames}) must be larger than "
+                                 f"chunk_overlap ({request.chunk_overlap})")
+            spans = [(0, request.chunk_frames)] + [(index, min(index + chunk_size, len(frames)))
+                                                   for index in range(request.chunk_frames, len(frames), chunk_size)]
+        else:
+            spans = [(0, len(frames))]
+
+        deadline = start_time
+        for index, (first, last) in enumerate(spans):
+            rendered = last - first + (request.chunk_overlap if index else 0)
+            target_time = self.latency.sample(rendered)
+            deadline += target_time
+            self._wait_until(deadline, cancel_event, start_time, target_time)
+            if index == len(spans) - 1 and self.failure_probability > 0 \
+                    and self._rng.random() < self.failure_probability:
+                self.failures += 1
+                raise RuntimeError(f"simulated generation failure after {time.time() - start_time:.1f}s")
+            if len(spans) > 1 and on_frames is not None:
+                on_frames(frames[first:last])
+
+        self.last_generation_time = time.time() - start_time
+        self.total_generation_time += self.last_generation_time
+        self.generations += 1
+        self.frames_generated += len(frames)
+        return LTXVideoResponseWithFrames(frames=frames)
+
+    def _wait_until(self, deadline: float, cancel_event: Optional[threading.Event], start_time: float,
+                    target_time: float):
+        """Sleep until ``deadline`` in slices so a cancel lands quickly"""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancelled += 1
+                raise GenerationPreempted(f"cancelled after {time.time() - start_time:.1f}s of {target_time:.1f}s")
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, self.cancel_poll_interval))
+
+    def _render(self, request: LTXVideoRequestI2V):
+        width, height = request.width, request.height
+        if request.conditioning_frame is not None:
+            base = request.conditioning_frame.resized(width, height).array
+        else:
+            base = np.zeros((height, width, 3), dtype=np.uint8)
+        return VideoClip(render_clip(base, request.num_frames))
+
+    def reset_metrics(self):
+        self.generations = 0
+        self.cancelled = 0
+        self.failures = 0
+        self.frames_generated = 0
+        self.total_generation_time = 0.0
+        self.last_generation_time = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": "procedural",
+            "generations": self.generations,
+            "cancelled": self.cancelled,
+            "failures": self.failures,
+            "frames_generated": self.frames_generated,
+            "last_generation_time": round(self.last_generation_time, 2),
+            "avg_generation_time": round(self.total_generation_time / max(1, self.generations), 2),
+        }
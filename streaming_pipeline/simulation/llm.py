@@ -0,0 +1,68 @@
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+
+class FakeChatCompletions:
+    """``client.chat.completions`` stand-in returning the JSON the prompt generator expects"""
+
+    COMMENT_LINE = re.compile(r"^- ([^:\s]+): (.+)$", re.MULTILINE)
+
+    SCENES = [
+        "the camera drifts through a neon-lit alley as rain starts to fall",
+        "a flock of paper birds lifts off and circles the tower",
+        "the sky cracks open and warm light floods the valley",
+        "a giant koi swims slowly through the clouds",
+        "the street market folds itself into an origami city",
+    ]
+
+    def __init__(self, latency: float = 0.4, jitter: float = 0.2, select_probability: float = 0.7,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.select_probability = select_probability
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def create(self, model: str, messages, **kwargs):
+        time.sleep(max(0.0, self._rng.gauss(self.latency, self.latency * self.jitter)))
+        self.calls += 1
+
+        comments = self.COMMENT_LINE.findall(messages[0]["content"])
+        if comments and self._rng.random() < self.select_probability:
+            _, selected = self._rng.choice(comments)
+            prompt = f"{selected.strip()}, cinematic, smooth camera motion"
+            reasoning = "simulated: acted on a chat comment"
+        else:
+            selected = "null"
+            prompt = f"{self._rng.choice(self.SCENES)}, cinematic"
+            reasoning = "simulated: evolved the scene"
+
+        content = json.dumps({
+            "visual_description": "simulated frame",
+            "selected_comment": selected,
+            "prompt": prompt,
+            "reasoning": reasoning,
+        })
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], model=model)
+
+
+class FakeLLMClient:
+    """Drop-in for the OpenAI/Groq client used by PromptGenerator"""
+
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(**kwargs))
+
+
+def make_prompt_generator(latency: float = 0.4, seed: Optional[int] = None):
+    """Real PromptGenerator (formatting, parsing, comment matching) talking to FakeLLMClient"""
+    from streaming_pipeline.prompt_generation.prompt_generator import PromptGenerator
+
+    prompt_generator = PromptGenerator("simulated-key")
+    prompt_generator.openai_client = FakeLLMClient(latency=latency, seed=seed)
+    prompt_generator.groq_client = None
+    return prompt_generator
@@ -1,26 +1,57 @@
 import os
+import threading
 import time
-# Removed unused typing imports
+from typing import Any, Dict, Optional
 from streaming_pipeline.video_generation.video_generator import RealtimeGenerator
 from streaming_pipeline.utils.monitoring import ComponentMonitor
 from streaming_pipeline.output.rtmp_streamer import FFmpegRTMPStreamer
 from streaming_pipeline.core.streaming_engine import RealtimeVideoStreamer
+from streaming_pipeline.core.generation_scheduler import BufferWatermarkScheduler
+from streaming_pipeline.core.quality_ladder import QualityLadder
+from streaming_pipeline.core.preemption import PreemptionController
+from streaming_pipeline.core.checkpoint import SessionCheckpointer
+from streaming_pipeline.core.gpu_scheduler import GPUScheduler
+from streaming_pipeline.video_generation.backends import GeneratorBackend
+from streaming_pipeline.video_generation.backend_router import BackendRouter
+from streaming_pipeline.utils.tracing import Tracer
+from streaming_pipeline.utils.asset_cache import AssetCache
 from streaming_pipeline.input.twitch_listener import TwitchChatListener
 from streaming_pipeline.prompt_generation.prompt_generator import PromptGenerator
 from streaming_pipeline.postprocessing.text_overlay import TextOverlay
+from streaming_pipeline.postprocessing.clip_transition import ClipTransition
 #from dotenv import load_dotenv
 
 #load_dotenv()
 
 class StreamingService:
-    """Shared streaming service with core logic (no FAL decorators)"""
+    """Shared streaming service with core logic (no FAL decorators)
+    
+    Hosts several independent streams (channel, stream key, config) that share
+    one loaded generator. Their GPU jobs are interleaved by a weighted fair
+    ``GPUScheduler``; everything else (chat, prompts, encoder, buffer) is per stream.
+    """
+    
+    DEFAULT_STREAM = "default"
     
     def __init__(self):
         self.video_generator = None
-        self.video_streamer = None
-        self.monitor = None
+        self.gpu_scheduler = None
+        self.asset_cache = None
+        self.streams: Dict[str, RealtimeVideoStreamer] = {}
+        self.monitors: Dict[str, ComponentMonitor] = {}
+        self._lock = threading.Lock()
         self._initialized = False
     
+    @property
+    def video_streamer(self):
+        """The default stream's engine"""
+        return self.streams.get(self.DEFAULT_STREAM)
+    
+    @property
+    def monitor(self):
+        """The default stream's monitor"""
+        return self.monitors.get(self.DEFAULT_STREAM)
+    
     def setup(self):
         """Setup the streaming components"""
         if self._initialized:
@@ -28,56 +59,145 @@ class StreamingService:
             
     
         
-        # Initialize the video generator
+        # Initialize the video generator - loaded once, shared by every stream
         self.video_generator = RealtimeGenerator()
         self.video_generator.setup()
+        self.gpu_scheduler = GPUScheduler(self.video_generator)
+        self.asset_cache = AssetCache(cache_dir=os.getenv("ASSET_CACHE_DIR", "cache/assets"))
         
         # Get environment variables
         twitch_channel = os.getenv("TWITCH_CHANNEL", "shroud")
-        openai_key = os.getenv("OPENAI_API_KEY")
-        groq_key = os.getenv("GROQ_API_KEY")
+        self.openai_key = os.getenv("OPENAI_API_KEY")
+        self.groq_key = os.getenv("GROQ_API_KEY")
         stream_key = os.getenv("TWITCH_STREAM_KEY")
         
-        if not openai_key:
+        if not self.openai_key:
             raise ValueError("OPENAI_API_KEY environment variable required")
         if not stream_key:
             raise ValueError("TWITCH_STREAM_KEY environment variable required")
         
+        self._create_stream(self.DEFAULT_STREAM, twitch_channel, stream_key)
+        
+        self._initialized = True
+        print("✅ Complete streaming pipeline setup complete!")
+    
+    @staticmethod
+    def _stream_path(path: Optional[str], stream_id: str) -> Optional[str]:
+        """Per-stream variant of a configured file path (the default stream keeps it as is)"""
+        if not path or stream_id == StreamingService.DEFAULT_STREAM:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}-{stream_id}{ext}"
+    
+    def _create_stream(self, stream_id: str, twitch_channel: str, stream_key: str,
+                       weight: float = 1.0) -> RealtimeVideoStreamer:
+        """Build one stream's components around the shared generator and register it"""
         # Create all dependencies independently (Dependency Injection pattern)
-        self.twitch_listener = TwitchChatListener(twitch_channel)
-        self.prompt_generator = PromptGenerator(openai_key, groq_key)
-        self.rtmp_streamer = FFmpegRTMPStreamer(
+        twitch_listener = TwitchChatListener(twitch_channel)
+        prompt_generator = PromptGenerator(self.openai_key, self.groq_key)
+        rtmp_streamer = FFmpegRTMPStreamer(
             stream_key=stream_key,
             fps=9,  # 233 frames ÷ 9 FPS = 25.9 seconds (safe buffer)
             width=640,
-            height=480
+            height=480,
+            input_pix_fmt="yuv420p"  # Half the pipe bandwidth/buffer memory of rgb24
+        )
+        text_overlay = TextOverlay(width=640, height=480)
+        clip_transition = ClipTransition(mode="crossfade", overlap_frames=8)
+        generation_scheduler = BufferWatermarkScheduler(fps=9)
+        quality_ladder = QualityLadder(fps=9, api_fallback=bool(os.getenv("FAL_KEY")))
+        preemption = PreemptionController()
+        # Per-clip latency traces; TRACE_EXPORT_PATH also appends them to a JSONL file
+        tracer = Tracer(export_path=self._stream_path(os.getenv("TRACE_EXPORT_PATH"), stream_id))
+        # Point CHECKPOINT_DIR at persistent storage for resume across redeploys
+        checkpoint_dir = os.getenv("CHECKPOINT_DIR", "cache/checkpoints")
+        if stream_id != self.DEFAULT_STREAM:
+            checkpoint_dir = os.path.join(checkpoint_dir, stream_id)
+        checkpointer = SessionCheckpointer(checkpoint_dir)
+        # This stream's handle on the shared GPU
+        stream_generator = self.gpu_scheduler.register(stream_id, weight)
+        # model="auto" routes each clip to local LTX or the fal API, hedging slow ones on the other
+        router = BackendRouter(
+            [GeneratorBackend("local", stream_generator, "ltxv1"),
+             GeneratorBackend("api", stream_generator, "ltxv2-preview", is_available=lambda: bool(os.getenv("FAL_KEY")),
+                              expected_latency=float(os.getenv("API_EXPECTED_LATENCY", "30")))],
+            hedging=os.getenv("HEDGE_GENERATION", "1") != "0"
         )
-        self.text_overlay = TextOverlay(width=640, height=480)
         
         # Inject all dependencies into video streamer
-        self.video_streamer = RealtimeVideoStreamer(
-            twitch_listener=self.twitch_listener,
-            prompt_generator=self.prompt_generator,
-            realtime_generator=self.video_generator,
-            rtmp_streamer=self.rtmp_streamer,
-            text_overlay=self.text_overlay
+        video_streamer = RealtimeVideoStreamer(
+            twitch_listener=twitch_listener,
+            prompt_generator=prompt_generator,
+            realtime_generator=router,
+            rtmp_streamer=rtmp_streamer,
+            text_overlay=text_overlay,
+            clip_transition=clip_transition,
+            generation_scheduler=generation_scheduler,
+            quality_ladder=quality_ladder,
+            preemption=preemption,
+            tracer=tracer,
+            asset_cache=self.asset_cache,
+            checkpointer=checkpointer
         )
+        # Seconds below the low watermark - the GPU scheduler serves the emptiest buffer first
+        stream_generator.deficit = lambda: (generation_scheduler.low_watermark
+                                            - generation_scheduler.buffered_seconds(video_streamer._buffered_frames()))
+        # Routing budget: seconds of playback left before the stream stalls
+        router.time_budget = lambda: generation_scheduler.buffered_seconds(video_streamer._buffered_frames())
         
         # Create generic component monitor
-        self.monitor = ComponentMonitor({
-            "rtmp": self.rtmp_streamer,
-            "video": self.video_streamer,
-            "prompt": self.prompt_generator,
-            "generator": self.video_generator,
-            "overlay": self.text_overlay,
-            "twitch": self.twitch_listener
+        monitor = ComponentMonitor({
+            "rtmp": rtmp_streamer,
+            "video": video_streamer,
+            "prompt": prompt_generator,
+            "generator": stream_generator,
+            "router": router,
+            "gpu": self.gpu_scheduler,
+            "overlay": text_overlay,
+            "transition": clip_transition,
+            "scheduler": generation_scheduler,
+            "quality": quality_ladder,
+            "preemption": preemption,
+            "tracing": tracer,
+            "assets": self.asset_cache,
+            "checkpoint": checkpointer,
+            "twitch": twitch_listener
         })
         
         # Start monitoring all components
-        self.monitor.start_monitoring()
+        monitor.start_monitoring()
         
-        self._initialized = True
-        print("✅ Complete streaming pipeline setup complete!")
+        with self._lock:
+            old_monitor = self.monitors.get(stream_id)
+            self.streams[stream_id] = video_streamer
+            self.monitors[stream_id] = monitor
+        if old_monitor:
+            old_monitor.stop_monitoring()
+        print(f"📺 Stream '{stream_id}' ready: #{twitch_channel} (GPU weight {weight})")
+        return video_streamer
+    
+    def _stream_for_request(self, request) -> RealtimeVideoStreamer:
+        """Existing stream for the request, or a new one when it names a new stream or target"""
+        stream_id = request.stream_id or self.DEFAULT_STREAM
+        weight = request.stream_weight or 1.0
+        video_streamer = self.streams.get(stream_id)
+        
+        if video_streamer is None:
+            if not request.stream_key:
+                raise ValueError(f"stream_key required to create stream '{stream_id}'")
+            return self._create_stream(stream_id, request.twitch_channel or os.getenv("TWITCH_CHANNEL", "shroud"),
+                                       request.stream_key, weight)
+        
+        retarget = ((request.twitch_channel and request.twitch_channel.lower() != video_streamer.twitch_listener.channel_name)
+                    or (request.stream_key and request.stream_key != video_streamer.rtmp_streamer.stream_key))
+        if retarget:
+            if video_streamer.state.is_running:
+                raise ValueError(f"Stream '{stream_id}' is running - stop it before changing its channel or stream key")
+            return self._create_stream(stream_id, request.twitch_channel or video_streamer.twitch_listener.channel_name,
+                                       request.stream_key or video_streamer.rtmp_streamer.stream_key, weight)
+        
+        self.gpu_scheduler.register(stream_id, weight)
+        return video_streamer
     
     def start_streaming(self, request):
         """Start the complete Twitch streaming pipeline with full LTX configuration"""
@@ -85,6 +205,13 @@ class StreamingService:
             self.setup()
             
         try:
+            stream_id = request.stream_id or self.DEFAULT_STREAM
+            video_streamer = self._stream_for_request(request)
+            rtmp_streamer = video_streamer.rtmp_streamer
+            generation_scheduler = video_streamer.generation_scheduler
+            quality_ladder = video_streamer.quality_ladder
+            preemption = video_streamer.preemption
+            print(f"📺 Stream: {stream_id}")
 
             # Update LTX configuration cleanly using the base model
             ltx_updates = {}
@@ -109,6 +236,11 @@ class StreamingService:
                 ltx_updates['width'] = request.width
             if request.height:
                 ltx_updates['height'] = request.height
+            if request.chunk_frames is not None:
+                ltx_updates['chunk_frames'] = request.chunk_frames or None
+                print(f"   🧩 Chunked generation: {request.chunk_frames or 'off'}")
+            if request.chunk_overlap is not None:
+                ltx_updates['chunk_overlap'] = request.chunk_overlap
             
             # LTXv2-specific parameters
             if request.duration is not None:
@@ -125,62 +257,110 @@ class StreamingService:
             
             # Apply all updates at once
             if ltx_updates:
-                self.video_streamer.update_ltx_config(**ltx_updates)
+                video_streamer.update_ltx_config(**ltx_updates)
+            
+            # Warm resume: continue the last session instead of the initial image/prompt.
+            # Saved config applies except where this request sets a value explicitly.
+            checkpoint = video_streamer.checkpointer.load() if request.resume and not video_streamer.state.is_running else None
+            if checkpoint:
+                explicit = {"model_type" if name == "model" else name for name in request.__fields_set__}
+                restored_config = {key: value for key, value in checkpoint["config"].items() if key not in explicit}
+                if restored_config:
+                    video_streamer.update_ltx_config(**restored_config)
+                video_streamer.restore_checkpoint(checkpoint)
+                print(f"   ♻️ Resuming from generation #{checkpoint['generation_count']} ({checkpoint['age']:.0f}s old)")
+            elif request.resume:
+                print(f"   ♻️ No usable checkpoint - cold start")
             
             # Update streaming configuration (direct access to RTMP streamer)
             if request.target_fps:
-                self.rtmp_streamer.fps = request.target_fps
+                rtmp_streamer.fps = request.target_fps
+                generation_scheduler.fps = request.target_fps
+                quality_ladder.fps = request.target_fps
                 print(f"   🎛️ Set target_fps: {request.target_fps}")
             
+            quality_ladder.enabled = bool(request.adaptive_quality)
+            preemption.enabled = bool(request.preemption)
+            if request.preemption_threshold is not None:
+                preemption.threshold = request.preemption_threshold
+            print(f"   ⚡ Preemption: {'on (threshold ' + str(preemption.threshold) + ')' if preemption.enabled else 'off'}")
+            print(f"   🪜 Adaptive quality: {'on' if quality_ladder.enabled else 'off'}")
+            
+            if request.low_watermark_seconds and request.high_watermark_seconds:
+                if request.low_watermark_seconds >= request.high_watermark_seconds:
+                    raise ValueError("low_watermark_seconds must be below high_watermark_seconds")
+                generation_scheduler.low_watermark = request.low_watermark_seconds
+                generation_scheduler.high_watermark = request.high_watermark_seconds
+                print(f"   🎛️ Buffer watermarks: {request.low_watermark_seconds}s - {request.high_watermark_seconds}s")
+            
             if request.width and request.height:
-                self.rtmp_streamer.width = request.width
-                self.rtmp_streamer.height = request.height
+                rtmp_streamer.width = request.width
+                rtmp_streamer.height = request.height
                 print(f"   🎛️ Set resolution: {request.width}x{request.height}")
             
+            rtmp_streamer.encoder_backend = request.encoder_backend or "subprocess"
+            print(f"   🎛️ Encoder backend: {rtmp_streamer.encoder_backend}")
+            
+            # Output fan-out - extra sinks share the single encode
+            rtmp_streamer.extra_outputs = list(request.extra_rtmp_urls or [])
+            rtmp_streamer.record_path = request.record_path
+            if request.low_rendition_url:
+                rtmp_streamer.low_rendition = {
+                    "height": request.low_rendition_height or 240,
+                    "outputs": [request.low_rendition_url],
+                }
+            else:
+                rtmp_streamer.low_rendition = None
+            if rtmp_streamer.extra_outputs or request.record_path or request.low_rendition_url:
+                print(f"   📡 Fan-out: {len(rtmp_streamer.extra_outputs)} extra RTMP, "
+                      f"record={request.record_path}, low rendition={bool(request.low_rendition_url)}")
+            
             # Set custom initial state if provided
             if request.initial_prompt or request.initial_image_url:
                 print(f"🎨 Using custom initial state:")
                 if request.initial_prompt:
                     print(f"   📝 Custom prompt: {request.initial_prompt}")
-                    self.video_streamer.initial_prompt = request.initial_prompt
+                    video_streamer.initial_prompt = request.initial_prompt
                 if request.initial_image_url:
                     print(f"   🖼️ Custom image: {request.initial_image_url}")
-                    self.video_streamer.initial_image_url = request.initial_image_url
+                    video_streamer.initial_image_url = request.initial_image_url
             else:
                 print(f"�� Using default initial state:")
-                print(f"   📝 Default prompt: {self.video_streamer.initial_prompt}")
-                print(f"   🖼️ Default image: {self.video_streamer.initial_image_url}")
+                print(f"   📝 Default prompt: {video_streamer.initial_prompt}")
+                print(f"   🖼️ Default image: {video_streamer.initial_image_url}")
             
             # Set generation mode in streaming state
             if hasattr(request, 'mode') and request.mode:
-                self.video_streamer.state.mode = request.mode
+                video_streamer.state.mode = request.mode
                 print(f"   🎭 Mode: {request.mode}")
             else:
-                self.video_streamer.state.mode = "regular"
+                video_streamer.state.mode = "regular"
                 print(f"   🎭 Mode: regular (default)")
             
             # Restart monitoring if it was stopped
-            if self.monitor and not self.monitor.monitoring:
-                self.monitor.start_monitoring()
+            monitor = self.monitors[stream_id]
+            if not monitor.monitoring:
+                monitor.start_monitoring()
             
             # Start video generation and streaming (RTMP is started internally)
-            self.video_streamer.start_streaming()
+            video_streamer.start_streaming()
             
             return {
                 "status": "started",
+                "stream_id": stream_id,
                 "message": "Now live on Twitch! AI-generated content streaming with chat reactivity.",
-                "twitch_channel_input": self.video_streamer.twitch_listener.channel_name,
-                "rtmp_url": self.rtmp_streamer.rtmp_url,
-                "initial_prompt": self.video_streamer.initial_prompt,
-                "initial_image_url": self.video_streamer.initial_image_url,
+                "twitch_channel_input": video_streamer.twitch_listener.channel_name,
+                "rtmp_url": rtmp_streamer.rtmp_url,
+                "initial_prompt": video_streamer.initial_prompt,
+                "initial_image_url": video_streamer.initial_image_url,
                 "configuration": {
-                    "num_frames": self.video_streamer.ltx_config.num_frames,
-                    "timesteps": self.video_streamer.ltx_config.timesteps,
-                    "target_fps": self.rtmp_streamer.fps,
-                    "resolution": f"{self.video_streamer.ltx_config.width}x{self.video_streamer.ltx_config.height}",
-                    "guidance_scale": self.video_streamer.ltx_config.guidance_scale,
-                    "strength": self.video_streamer.ltx_config.strength,
-                    "negative_prompt": self.video_streamer.ltx_config.negative_prompt
+                    "num_frames": video_streamer.ltx_config.num_frames,
+                    "timesteps": video_streamer.ltx_config.timesteps,
+                    "target_fps": rtmp_streamer.fps,
+                    "resolution": f"{video_streamer.ltx_config.width}x{video_streamer.ltx_config.height}",
+                    "guidance_scale": video_streamer.ltx_config.guidance_scale,
+                    "strength": video_streamer.ltx_config.strength,
+                    "negative_prompt": video_streamer.ltx_config.negative_prompt
                 }
             }
             
@@ -190,26 +370,32 @@ class StreamingService:
                 "message": f"Failed to start streaming: {e}"
             }
     
-    def stop_streaming(self):
-        """Stop the streaming pipeline"""
+    def stop_streaming(self, stream_id: Optional[str] = None):
+        """Stop one stream, or every stream when ``stream_id`` is None"""
         try:
-            print("🛑 Stopping streaming pipeline...")
-            print(f"   video_streamer: {self.video_streamer}")
-            print(f"   monitor: {self.monitor}")
+            stream_ids = [stream_id] if stream_id else list(self.streams)
+            if stream_id and stream_id not in self.streams:
+                raise ValueError(f"Unknown stream '{stream_id}'")
+            print(f"🛑 Stopping streaming pipeline ({', '.join(stream_ids) or 'no streams'})...")
             
             # Stop components in the right order and return immediately
             # Don't wait for threads to finish to avoid blocking the response
             
-            # Keep monitor running to show "stopped" state
+            # Keep monitors running to show "stopped" state
             # Monitor will continue showing metrics with is_streaming=False
             
-            if self.video_streamer:
-                print("   Stopping video streamer (includes internal RTMP)...")
-                self.video_streamer.stop_streaming()
+            stopped = []
+            for current_id in stream_ids:
+                video_streamer = self.streams[current_id]
+                if video_streamer.state.is_running:
+                    print(f"   Stopping video streamer '{current_id}' (includes internal RTMP)...")
+                    video_streamer.stop_streaming()
+                    stopped.append(current_id)
             
             result = {
                 "status": "stopped",
-                "message": "Streaming pipeline stopped successfully"
+                "message": "Streaming pipeline stopped successfully",
+                "streams": stopped
             }
             print(f"   Stop result: {result}")
             return result
@@ -222,12 +408,30 @@ class StreamingService:
             print(f"   Stop error: {error_result}")
             return error_result
     
-    def get_metrics(self):
-        """Get latest streaming metrics - clean and simple"""
+    def list_streams(self) -> Dict[str, Any]:
+        """Summary of every hosted stream plus how the GPU is being shared"""
+        streams = {}
+        for stream_id, video_streamer in list(self.streams.items()):
+            scheduler = video_streamer.generation_scheduler
+            streams[stream_id] = {
+                "is_running": video_streamer.state.is_running,
+                "twitch_channel_input": video_streamer.twitch_listener.channel_name,
+                "generation_count": video_streamer.state.generation_count,
+                "buffered_seconds": round(scheduler.buffered_seconds(video_streamer._buffered_frames()), 1),
+            }
+        return {
+            "streams": streams,
+            "gpu": self.gpu_scheduler.get_status() if self.gpu_scheduler else None,
+            "timestamp": time.time()
+        }
+    
+    def get_metrics(self, stream_id: Optional[str] = None):
+        """Get latest streaming metrics for one stream (the default stream unless given)"""
         try:
+            monitor = self.monitors.get(stream_id or self.DEFAULT_STREAM)
             # Get latest metrics if monitor exists and is monitoring
-            if self.monitor and self.monitor.monitoring:
-                latest_metrics = self.monitor.get_latest_metrics()
+            if monitor and monitor.monitoring:
+                latest_metrics = monitor.get_latest_metrics()
                 
                 if latest_metrics is None:
                     return {"error": "No metrics available yet"}
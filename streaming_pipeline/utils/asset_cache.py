@@ -0,0 +1,260 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from streaming_pipeline.models import Monitorable
+
+
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',          # JPEG
+    b'\x89PNG\r\n\x1a\n',     # PNG
+    b'GIF87a',                # GIF87a
+    b'GIF89a',                # GIF89a
+    b'RIFF',                  # WEBP (starts with RIFF)
+)
+
+
+class AssetCache(Monitorable):
+    """
+    Content-addressed cache for initial images and other fetched assets.
+
+    - Remote URLs are fetched through one pooled ``requests.Session``. The
+      URL's ETag/Last-Modified and content hash are remembered. Within
+      ``revalidate_after`` seconds the URL is trusted without a request;
+      after that it is revalidated with a conditional GET, so a 304 costs
+      one round trip and no body.
+    - Data URLs and raw base64 are hashed directly, with no network.
+    - Processed frames (RGB, resized to the target resolution) are keyed by
+      (content hash, width, height). They live in a small in-memory LRU and,
+      with ``cache_dir``, as ``.npy`` files that survive restarts.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_frames: int = 16,
+                 revalidate_after: float = 300.0, timeout: float = 10.0):
+        self.cache_dir = cache_dir
+        self.max_memory_frames = max_memory_frames
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+        self._lock = threading.Lock()
+        self._frames: "OrderedDict[Tuple[str, int, int], np.ndarray]" = OrderedDict()
+        self._urls: Dict[str, Dict[str, Any]] = {}  # url -> {"hash", "etag", "last_modified", "checked"}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_index()
+
+        self.reset_metrics()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_frame(self, source: str, width: int, height: int) -> np.ndarray:
+        """RGB uint8 (height, width, 3) frame for an image URL, data URL or raw base64 string"""
+        start_time = time.time()
+        content_hash, data = self._resolve(source)
+        key = (content_hash, width, height)
+
+        frame = self._memory_get(key)
+        if frame is None:
+            frame = self._disk_get(key)
+            if frame is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                if data is None:
+                    data = self._read_source_bytes(content_hash) or self._download(source, conditional=False)[0]
+                frame = self._process(data, width, height)
+                self._disk_put(key, frame)
+            self._memory_put(key, frame)
+        else:
+            self.memory_hits += 1
+
+        self.last_lookup_time = time.time() - start_time
+        return frame
+
+    # ------------------------------------------------------------------
+    # Source resolution
+    # ------------------------------------------------------------------
+
+    def _resolve(self, source: str) -> Tuple[str, Optional[bytes]]:
+        """(content hash, raw bytes if they had to be read anyway)"""
+        inline = self._decode_inline(source)
+        if inline is not None:
+            return self._hash(inline), inline
+
+        entry = self._urls.get(source)
+        if entry and time.time() - entry["checked"] < self.revalidate_after:
+            return entry["hash"], None
+
+        data, entry = self._download(source, conditional=entry is not None)
+        return entry["hash"], data
+
+    @staticmethod
+    def _decode_inline(source: str) -> Optional[bytes]:
+        """Bytes of a data URL or raw base64 image, None for anything else"""
+        if source.startswith("data:image"):
+            return base64.b64decode(source.split(",", 1)[1] if "," in source else source)
+        if len(source) < 100 or source.startswith(("http://", "https://")):
+            return None
+        try:
+            data = base64.b64decode(source, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        return data if data.startswith(IMAGE_SIGNATURES) else None
+
+    def _download(self, url: str, conditional: bool) -> Tuple[Optional[bytes], Dict[str, Any]]:
+        headers = {}
+        entry = self._urls.get(url)
+        if conditional and entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry:
+            self.revalidations += 1
+            entry["checked"] = time.time()
+            self._save_index()
+            return None, entry
+        response.raise_for_status()
+
+        data = response.content
+        self.downloads += 1
+        self.bytes_downloaded += len(data)
+        entry = {
+            "hash": self._hash(data),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "checked": time.time(),
+        }
+        with self._lock:
+            self._urls[url] = entry
+        self._write_source_bytes(entry["hash"], data)
+        self._save_index()
+        return data, entry
+
+    @staticmethod
+    def _hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _process(data: bytes, width: int, height: int) -> np.ndarray:
+        image = Image.open(BytesIO(data)).convert("RGB")
+        if image.size != (width, height):
+            image = image.resize((width, height))
+        return np.asarray(image)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def _memory_put(self, key, frame: np.ndarray):
+        frame.setflags(write=False)  # Shared between callers
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_memory_frames:
+                self._frames.popitem(last=False)
+
+    def _path(self, name: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, name) if self.cache_dir else None
+
+    def _disk_get(self, key) -> Optional[np.ndarray]:
+        path = self._path(f"{key[0]}_{key[1]}x{key[2]}.npy")
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key, frame: np.ndarray):
+        path = self._path(f"{key[0]}_{key[1]}x{key[2]}.npy")
+        if path:
+            self._atomic_write(path, lambda f: np.save(f, frame))
+
+    def _read_source_bytes(self, content_hash: str) -> Optional[bytes]:
+        path = self._path(f"{content_hash}.src")
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _write_source_bytes(self, content_hash: str, data: bytes):
+        path = self._path(f"{content_hash}.src")
+        if path and not os.path.exists(path):
+            self._atomic_write(path, lambda f: f.write(data))
+
+    def _load_index(self):
+        try:
+            with open(self._path("index.json")) as f:
+                self._urls = json.load(f)
+        except (OSError, ValueError):
+            self._urls = {}
+
+    def _save_index(self):
+        path = self._path("index.json")
+        if path:
+            with self._lock:
+                index = json.dumps(self._urls)
+            self._atomic_write(path, lambda f: f.write(index.encode("utf-8")))
+
+    @staticmethod
+    def _atomic_write(path: str, write):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def reset_metrics(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.revalidations = 0
+        self.bytes_downloaded = 0
+        self.last_lookup_time = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "downloads": self.downloads,
+            "revalidations": self.revalidations,
+            "mb_downloaded": round(self.bytes_downloaded / 1024**2, 2),
+            "frames_in_memory": len(self._frames),
+            "urls_known": len(self._urls),
+            "last_lookup_time": round(self.last_lookup_time, 4),
+            "cache_dir": self.cache_dir,
+        }
@@ -10,8 +10,9 @@ from typing import Dict
 def setup_loggers() -> Dict[str, logging.Logger]:
     """Setup separate loggers for different components"""
     
-    # Create logs directory
-    os.makedirs('logs', exist_ok=True)
+    # Create logs directory (LOG_DIR moves it, e.g. for offline simulation runs)
+    log_dir = os.getenv('LOG_DIR', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
     
     # Shared formatter
     formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
@@ -20,7 +21,7 @@ def setup_loggers() -> Dict[str, logging.Logger]:
     
     # Server logger - API startup, config, health
     server_logger = logging.getLogger('server')
-    server_handler = logging.FileHandler('logs/server.log')
+    server_handler = logging.FileHandler(os.path.join(log_dir, 'server.log'))
     server_handler.setFormatter(formatter)
     server_logger.addHandler(server_handler)
     server_logger.setLevel(logging.INFO)
@@ -28,7 +29,7 @@ def setup_loggers() -> Dict[str, logging.Logger]:
     
     # Generation logger - Video generation pipeline
     generation_logger = logging.getLogger('generation')
-    generation_handler = logging.FileHandler('logs/generation.log')
+    generation_handler = logging.FileHandler(os.path.join(log_dir, 'generation.log'))
     generation_handler.setFormatter(formatter)
     generation_logger.addHandler(generation_handler)
     generation_logger.setLevel(logging.INFO)
@@ -36,7 +37,7 @@ def setup_loggers() -> Dict[str, logging.Logger]:
     
     # Queue logger - Queue monitoring and RTMP streaming
     queue_logger = logging.getLogger('queue')
-    queue_handler = logging.FileHandler('logs/queue.log')
+    queue_handler = logging.FileHandler(os.path.join(log_dir, 'queue.log'))
     queue_handler.setFormatter(formatter)
     queue_logger.addHandler(queue_handler)
     queue_logger.setLevel(logging.INFO)
@@ -0,0 +1,189 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+
+
+class Trace:
+    """
+    Timeline of one generated clip, from the chat comment it answers (if any)
+    to its first frame reaching the encoder.
+
+    Spans are (name, start, end) in wall-clock seconds so they line up with
+    ``TwitchComment.timestamp``; recording one is a tuple append.
+    """
+
+    __slots__ = ("trace_id", "generation_id", "comment", "attrs", "spans", "start", "end", "outcome")
+
+    def __init__(self, trace_id: str, generation_id: int, comment=None, **attrs):
+        self.trace_id = trace_id
+        self.generation_id = generation_id
+        self.comment = comment
+        self.attrs = attrs
+        self.spans: List[tuple] = []
+        self.start = comment.timestamp if comment is not None else time.time()
+        self.end: Optional[float] = None
+        self.outcome: Optional[str] = None
+
+    def add_span(self, name: str, start: float, end: float):
+        if start is not None and end is not None:
+            self.spans.append((name, start, end))
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.spans.append((name, start, time.time()))
+
+    @property
+    def comment_to_air(self) -> Optional[float]:
+        if self.comment is None or self.outcome != "aired":
+            return None
+        return self.end - self.comment.timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "generation_id": self.generation_id,
+            "outcome": self.outcome,
+            "start": self.start,
+            "end": self.end,
+            "comment_to_air": self.comment_to_air,
+            "comment": {
+                "username": self.comment.username,
+                "message": self.comment.message,
+                "timestamp": self.comment.timestamp,
+            } if self.comment is not None else None,
+            "attrs": self.attrs,
+            "spans": [{"name": name, "start": start, "duration": round(end - start, 4)}
+                      for name, start, end in self.spans],
+        }
+
+
+class Tracer(Monitorable):
+    """
+    Collects per-clip traces and reports where comment-to-air time goes.
+
+    The engine opens a trace per generation (keyed by generation id), adds
+    spans as the clip moves through prompt, generate, post-process, enqueue
+    and the buffer, and finishes it when the clip's first frame is handed
+    to the encoder (or when it is cancelled/fails). Finished traces are kept
+    in a bounded window for percentiles and, with ``export_path`` set,
+    appended to a JSONL file by a background writer so the stream thread
+    never touches the disk.
+    """
+
+    def __init__(self, export_path: Optional[str] = None, max_traces: int = 500, enabled: bool = True):
+        self.export_path = export_path
+        self.enabled = enabled
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.traces: deque = deque(maxlen=max_traces)
+        self._sequence = itertools.count(1)  # A preempted clip and its replacement share a generation id
+
+        self._lock = threading.Lock()
+        self._export_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer = None
+        self.exported = 0
+        self.export_errors = 0
+
+        self.reset_metrics()
+
+    def start_trace(self, generation_id: int, comment=None, **attrs) -> Optional[Trace]:
+        """New trace for a generation, or None when tracing is off"""
+        if not self.enabled:
+            return None
+        return Trace(f"{self.session}-{next(self._sequence)}", generation_id, comment, **attrs)
+
+    def finish(self, trace: Optional[Trace], outcome: str = "aired", at: Optional[float] = None):
+        """Close a trace: "aired" when its first frame reached the encoder, otherwise why it did not.
+
+        Safe to call from several threads; only the first call counts.
+        """
+        if trace is None:
+            return
+        with self._lock:
+            if trace.end is not None:
+                return
+            trace.end = at or time.time()
+            trace.outcome = outcome
+        self.traces.append(trace)
+        self.finished += 1
+        if outcome != "aired":
+            self.not_aired += 1
+        if self.export_path:
+            self._export_queue.put(trace)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._export_loop, daemon=True)
+                self._writer.start()
+
+    def _export_loop(self):
+        while True:
+            trace = self._export_queue.get()
+            try:
+                with open(self.export_path, "a") as f:
+                    f.write(json.dumps(trace.to_dict()) + "\n")
+                    # Drain whatever piled up while the file was open
+                    while True:
+                        try:
+                            trace = self._export_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        f.write(json.dumps(trace.to_dict()) + "\n")
+                        self.exported += 1
+                self.exported += 1
+            except Exception as e:
+                self.export_errors += 1
+                generation_log.warning(f"⚠️ Trace export failed: {e}")
+
+    @staticmethod
+    def _percentiles(samples: List[float]) -> Dict[str, Any]:
+        if not samples:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {"count": len(samples), "p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                "p99": round(float(p99), 2)}
+
+    def comment_to_air(self) -> Dict[str, Any]:
+        """p50/p95/p99 of chat comment -> first frame on air over the window"""
+        return self._percentiles([trace.comment_to_air for trace in list(self.traces)
+                                  if trace.comment_to_air is not None])
+
+    def span_breakdown(self, comments_only: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Per-span duration percentiles over aired traces (those answering a comment by default)"""
+        durations: Dict[str, List[float]] = {}
+        for trace in list(self.traces):
+            if trace.outcome != "aired" or (comments_only and trace.comment is None):
+                continue
+            for name, start, end in trace.spans:
+                durations.setdefault(name, []).append(end - start)
+        return {name: self._percentiles(samples) for name, samples in durations.items()}
+
+    def reset_metrics(self):
+        """Drop the trace window and counters (already exported traces stay in the file)"""
+        self.traces.clear()
+        self.finished = 0
+        self.not_aired = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get comment-to-air percentiles and where the time goes"""
+        return {
+            "enabled": self.enabled,
+            "traces": self.finished,
+            "not_aired": self.not_aired,
+            "comment_to_air": self.comment_to_air(),
+            "spans": self.span_breakdown(),
+            "export_path": self.export_path,
+            "exported": self.exported,
+            "export_errors": self.export_errors,
+        }
@@ -0,0 +1,342 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames, Monitorable
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.video_generation.backends import GenerationBackend
+
+
+class BackendStats:
+    """Latency and error tracking for one backend (EWMA mean and deviation, like TCP's RTT estimator)"""
+
+    def __init__(self, smoothing: float = 0.3):
+        self.smoothing = smoothing
+        self.latency: Optional[float] = None
+        self.deviation = 0.0
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.wins = 0
+        self.hedges = 0
+        self.probes = 0
+        self.in_flight = 0
+        self.last_sample_at: Optional[float] = None
+        self.last_probe_at: Optional[float] = None
+
+    def record_success(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+            self.deviation = latency / 2
+        else:
+            self.deviation += self.smoothing * (abs(latency - self.latency) - self.deviation)
+            self.latency += self.smoothing * (latency - self.latency)
+        self.error_rate *= 1 - self.smoothing
+        self.last_sample_at = time.time()
+
+    def record_failure(self):
+        self.failures += 1
+        self.error_rate += self.smoothing * (1 - self.error_rate)
+
+    def estimate(self, default: float, deviations: float = 2.0) -> float:
+        """Pessimistic completion time: mean plus ``deviations`` deviations"""
+        return default if self.latency is None else self.latency + deviations * self.deviation
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ewma": round(self.latency, 2) if self.latency is not None else None,
+            "latency_deviation": round(self.deviation, 2),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "wins": self.wins,
+            "hedges": self.hedges,
+            "probes": self.probes,
+            "in_flight": self.in_flight,
+        }
+
+
+class BackendRouter(Monitorable):
+    """
+    Sends each generation to the backend most likely to finish before the buffer runs dry.
+
+    Drop-in for ``RealtimeGenerator`` (same ``generate_video_from_image``).
+
+    - A request with model_type ``"auto"`` is routed. ``time_budget`` (set
+      by the owner) returns the seconds of buffered playback left. Backends
+      whose pessimistic latency (EWMA + 2 deviations) fits the budget
+      qualify, taken in ``backends`` order so the preferred one wins ties.
+      Backends above ``max_error_rate`` qualify only when nothing else does.
+      When none fits, the fastest expected backend is used, with its time
+      scaled by its error rate.
+    - Exploration: a healthy backend with no latency sample, or none in the
+      last ``probe_interval`` seconds, is sent the next request when
+      hedging can still fall back on the best backend within the budget. Without this a
+      backend that starts out ranked second never gets a request, so its
+      prior is never corrected.
+    - Hedging: if the chosen backend is late (past its mean plus
+      ``hedge_deviations`` deviations, or earlier, at the last point where
+      the alternative could still make the budget), the same request goes
+      to the next-best backend. The
+      first success wins and the other is cancelled. A failure fails over
+      to the alternative straight away.
+    - A request naming a specific model_type goes to that backend only, but
+      still feeds the stats.
+    - Chunked generation (``on_frames``): the first attempt to hand on a
+      chunk owns the clip, because its frames are already on their way to
+      air. The other attempt is cancelled, and there is no hedge or failover
+      after that point.
+    """
+
+    def __init__(self, backends: List[GenerationBackend], hedging: bool = True, max_error_rate: float = 0.5,
+                 default_latency: float = 30.0, hedge_deviations: float = 1.0, min_hedge_delay: float = 2.0,
+                 poll_interval: float = 0.05, probe_interval: float = 120.0):
+        if not backends:
+            raise ValueError("BackendRouter needs at least one backend")
+        self.backends = backends
+        self.hedging = hedging
+        self.max_error_rate = max_error_rate
+        self.default_latency = default_latency  # For a backend with no samples and no expected_latency
+        self.hedge_deviations = hedge_deviations
+        self.min_hedge_delay = min_hedge_delay
+        self.poll_interval = poll_interval
+        self.probe_interval = probe_interval
+        self.time_budget: Optional[Callable[[], float]] = None
+
+        self.stats: Dict[str, BackendStats] = {backend.name: BackendStats() for backend in backends}
+        self._stats_lock = threading.Lock()  # Attempts update the stats from their own threads
+        self.decisions: deque = deque(maxlen=20)
+        self.reset_metrics()
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def _budget(self) -> Optional[float]:
+        if self.time_budget is None:
+            return None
+        try:
+            return self.time_budget()
+        except Exception:
+            return None
+
+    def _estimate(self, backend: GenerationBackend, deviations: float = 2.0) -> float:
+        prior = backend.expected_latency if backend.expected_latency is not None else self.default_latency
+        return self.stats[backend.name].estimate(prior, deviations)
+
+    def rank(self, budget: Optional[float] = None) -> List[GenerationBackend]:
+        """Available backends, best choice first"""
+        available = [backend for backend in self.backends if backend.available()]
+        if budget is None:
+            budget = float("inf")
+        estimate = self._estimate
+
+        def healthy(backend):
+            return self.stats[backend.name].error_rate <= self.max_error_rate
+
+        fits = [backend for backend in available if healthy(backend) and estimate(backend) <= budget]
+        rest = sorted((backend for backend in available if backend not in fits),
+                      key=lambda backend: estimate(backend) / max(0.05, 1 - self.stats[backend.name].error_rate))
+        return fits + rest
+
+    def _probe(self, candidates: List[GenerationBackend], budget: Optional[float]) -> Optional[GenerationBackend]:
+        """A backend whose latency estimate is missing or stale, if it is safe to try it now"""
+        best = candidates[0]
+        if budget is not None and (not self.hedging or budget < self._estimate(best) + self.min_hedge_delay):
+            return None  # No room to fall back on the best backend if the probe is slow
+        now = time.time()
+
+        def stale(stats: BackendStats) -> bool:
+            return (stats.last_sample_at is None or now - stats.last_sample_at > self.probe_interval) \
+                and (stats.last_probe_at is None or now - stats.last_probe_at > self.probe_interval)
+
+        for backend in candidates[1:]:
+            stats = self.stats[backend.name]
+            if stats.error_rate <= self.max_error_rate and stale(stats):
+                return backend
+        return None
+
+    def _backend_for(self, model_type: str) -> GenerationBackend:
+        for backend in self.backends:
+            if backend.model_type == model_type:
+                return backend
+        raise ValueError(f"No backend for model_type '{model_type}'")
+
+    def _hedge_delay(self, primary: GenerationBackend, alternative: GenerationBackend,
+                     budget: Optional[float]) -> float:
+        delay = self._estimate(primary, self.hedge_deviations)
+        if budget is not None:
+            # Past this point the alternative could no longer finish within the budget. If it
+            # can't make it even now, hedging early buys nothing - wait for the primary's tail.
+            deadline = budget - self._estimate(alternative)
+            if self.min_hedge_delay <= deadline < delay:
+                delay = deadline
+        return max(self.min_hedge_delay, delay)
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+
+    def generate_video_from_image(self, request: LTXVideoRequestI2V, cancel_event: Optional[threading.Event] = None,
+                                  on_frames=None) -> LTXVideoResponseWithFrames:
+        start_time = time.time()
+        if request.model_type != "auto":
+            candidates = [self._backend_for(request.model_type)]
+            budget = None
+        else:
+            budget = self._budget()
+            candidates = self.rank(budget)
+            if not candidates:
+                raise RuntimeError("No generation backend available")
+            probe = self._probe(candidates, budget) if len(candidates) > 1 else None
+            if probe is not None:
+                # Try it first; the best backend becomes its hedge
+                candidates = [probe] + [backend for backend in candidates if backend is not probe]
+                with self._stats_lock:
+                    self.stats[probe.name].probes += 1
+                    self.stats[probe.name].last_probe_at = start_time
+                    self.probed += 1
+                generation_log.info(f"🔭 Probing {probe.name} (no recent latency sample)")
+
+        primary = candidates[0]
+        alternative = candidates[1] if len(candidates) > 1 else None
+        hedge_at = start_time + self._hedge_delay(primary, alternative, budget) \
+            if self.hedging and alternative else None
+        self.decisions.append({"time": start_time, "backend": primary.name,
+                               "budget": round(budget, 1) if budget is not None else None})
+        if request.model_type == "auto":
+            generation_log.info(f"🧭 Routing to {primary.name}"
+                                + (f" (budget {budget:.1f}s)" if budget is not None else ""))
+
+        results: "queue.Queue" = queue.Queue()
+        attempts: Dict[str, threading.Event] = {}
+        claim = threading.Lock()
+        owner: List[Optional[str]] = [None]  # Attempt whose chunks are being streamed
+
+        def chunk_sink(backend: GenerationBackend):
+            def emit(chunk):
+                with claim:
+                    if owner[0] is None:
+                        owner[0] = backend.name
+                        for name, attempt_cancel in list(attempts.items()):
+                            if name != backend.name:
+                                attempt_cancel.set()
+                    if owner[0] != backend.name:
+                        return
+                on_frames(chunk)
+            return emit
+
+        def launch(backend: GenerationBackend):
+            attempts[backend.name] = threading.Event()
+            sink = chunk_sink(backend) if on_frames is not None else None
+            threading.Thread(target=self._attempt, args=(backend, request, attempts[backend.name], results, sink),
+                             daemon=True).start()
+
+        def cancel_all():
+            for attempt_cancel in attempts.values():
+                attempt_cancel.set()
+
+        launch(primary)
+        pending = 1
+        last_error: Optional[BaseException] = None
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                cancel_all()
+                raise GenerationPreempted("cancelled while routed")
+            try:
+                backend, response, error, generation_time = results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if hedge_at is not None and time.time() >= hedge_at and alternative.name not in attempts \
+                        and owner[0] is None:
+                    generation_log.info(f"🪁 {primary.name} slow after {time.time() - start_time:.1f}s - "
+                                        f"hedging on {alternative.name}")
+                    with self._stats_lock:
+                        self.stats[alternative.name].hedges += 1
+                        self.hedged += 1
+                    launch(alternative)
+                    pending += 1
+                continue
+
+            pending -= 1
+            if owner[0] is not None and backend.name != owner[0]:
+                if pending == 0:
+                    raise last_error or error
+                continue  # Only the attempt already streaming chunks can finish the clip
+            if error is None:
+                cancel_all()  # The slower attempt gives up its GPU/queue slot
+                with self._stats_lock:
+                    self.stats[backend.name].wins += 1
+                # The backend's own time (no GPU queue wait), so the quality ladder sees the model's speed
+                self.last_generation_time = generation_time or (time.time() - start_time)
+                self.last_backend = backend.name
+                return response
+
+            last_error = error
+            if owner[0] is None and alternative is not None and alternative.name not in attempts:
+                generation_log.warning(f"⚠️ {backend.name} failed ({error}) - failing over to {alternative.name}")
+                with self._stats_lock:
+                    self.failovers += 1
+                launch(alternative)
+                pending += 1
+            elif pending == 0:
+                raise last_error
+
+    def _attempt(self, backend: GenerationBackend, request: LTXVideoRequestI2V,
+                 cancel_event: threading.Event, results: "queue.Queue", on_frames=None):
+        stats = self.stats[backend.name]
+        with self._stats_lock:
+            stats.requests += 1
+            stats.in_flight += 1
+        start_time = time.time()
+        try:
+            response = backend.generate(request, cancel_event=cancel_event, on_frames=on_frames)
+        except GenerationPreempted as e:
+            results.put((backend, None, e, None))  # Cancelled by us - says nothing about the backend
+        except Exception as e:
+            with self._stats_lock:
+                stats.record_failure()
+            results.put((backend, None, e, None))
+        else:
+            # Routing needs the wall time (queue wait included); the ladder wants the backend's own
+            latency = time.time() - start_time
+            with self._stats_lock:
+                stats.record_success(latency)
+            results.put((backend, response, None, backend.generation_time() or latency))
+        finally:
+            with self._stats_lock:
+                stats.in_flight -= 1
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def reset_metrics(self):
+        """Reset counters; latency estimates are kept so routing stays warm across restarts"""
+        with self._stats_lock:
+            for stats in self.stats.values():
+                stats.requests = stats.failures = stats.wins = stats.hedges = stats.probes = 0
+            self.hedged = 0
+            self.failovers = 0
+            self.probed = 0
+        self.last_generation_time = 0.0
+        self.last_backend: Optional[str] = None
+        self.decisions.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        budget = self._budget()
+        return {
+            "hedging": self.hedging,
+            "budget": round(budget, 1) if budget is not None else None,
+            "ranking": [backend.name for backend in self.rank(budget)],
+            "last_backend": self.last_backend,
+            "last_generation_time": round(self.last_generation_time, 2),
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "probed": self.probed,
+            "backends": {backend.name: {**backend.get_status(), **self.stats[backend.name].to_dict()}
+                         for backend in self.backends},
+            "recent_decisions": list(self.decisions)[-5:],
+        }
@@ -0,0 +1,70 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames
+
+
+class GenerationBackend(ABC):
+    """
+    One place a clip can be generated (local GPU pipeline, fal API, CPU stub).
+
+    ``generate`` must honour ``cancel_event`` by raising GenerationPreempted,
+    because that is how the router stops the slower half of a hedged pair.
+    A backend that generates in chunks passes each one to ``on_frames``.
+    """
+
+    name: str = "backend"
+    model_type: str = "ltxv1"
+    expected_latency: Optional[float] = None  # Prior for routing until the backend has finished a job
+
+    @abstractmethod
+    def generate(self, request: LTXVideoRequestI2V, cancel_event: Optional[threading.Event] = None,
+                 on_frames=None) -> LTXVideoResponseWithFrames:
+        """Generate one clip for ``request`` (its model_type is already this backend's)"""
+
+    def available(self) -> bool:
+        """Whether the backend can take jobs at all (loaded, configured)"""
+        return True
+
+    def generation_time(self) -> Optional[float]:
+        """The backend's own time for its last clip, without queue waits (None if it doesn't know)"""
+        return None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"name": self.name, "model_type": self.model_type, "available": self.available()}
+
+
+class GeneratorBackend(GenerationBackend):
+    """
+    Backend over anything with ``generate_video_from_image(request, cancel_event)``.
+
+    That covers RealtimeGenerator, a multi-stream StreamGenerator handle and
+    the simulation's ProceduralGenerator. The request is sent with this
+    backend's ``model_type``. ``is_available``, if given, gates the backend
+    (e.g. on FAL_KEY being set).
+    """
+
+    def __init__(self, name: str, generator, model_type: str,
+                 is_available: Optional[Callable[[], bool]] = None, expected_latency: Optional[float] = None):
+        self.name = name
+        self.generator = generator
+        self.model_type = model_type
+        self.is_available = is_available
+        self.expected_latency = expected_latency
+
+    def generate(self, request: LTXVideoRequestI2V, cancel_event: Optional[threading.Event] = None,
+                 on_frames=None) -> LTXVideoResponseWithFrames:
+        if request.model_type != self.model_type:
+            request = request.copy(update={"model_type": self.model_type})
+        if on_frames is not None:
+            return self.generator.generate_video_from_image(request, cancel_event=cancel_event, on_frames=on_frames)
+        return self.generator.generate_video_from_image(request, cancel_event=cancel_event)
+
+    def generation_time(self) -> Optional[float]:
+        return getattr(self.generator, "last_generation_time", None) or None
+
+    def available(self) -> bool:
+        if self.is_available is not None and not self.is_available():
+            return False
+        return getattr(self.generator, "pipeline", True) is not None or self.model_type != "ltxv1"
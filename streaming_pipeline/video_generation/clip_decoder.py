@@ -0,0 +1,286 @@
+import io
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class _Download:
+    """Response body filling an in-memory buffer on a background thread (shared by HTTPStream readers)"""
+
+    def __init__(self, url: str, timeout: float, chunk_size: int, session=None):
+        import requests
+
+        self.url = url
+        self.opened_at = time.time()
+        self.response = (session or requests).get(url, stream=True, timeout=timeout)
+        self.response.raise_for_status()
+        length = self.response.headers.get("Content-Length")
+        encoded = self.response.headers.get("Content-Encoding", "identity") != "identity"
+        self.length = int(length) if length and not encoded else None  # Decoded size unknown when compressed
+
+        self.first_byte_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self.buffer = bytearray()
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.readers = 0
+        self.cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, args=(chunk_size,), daemon=True)
+        self._thread.start()
+
+    def _run(self, chunk_size: int):
+        try:
+            for chunk in self.response.iter_content(chunk_size):
+                with self.cond:
+                    if self.done:
+                        return  # Every reader closed
+                    if self.first_byte_at is None:
+                        self.first_byte_at = time.time()
+                    self.buffer += chunk
+                    self.cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.response.close()
+            with self.cond:
+                self.done = True
+                self.completed_at = self.completed_at or time.time()
+                self.cond.notify_all()
+
+    def wait_for(self, size: Optional[int]):
+        """Block until ``size`` bytes are buffered (or the download ends); None waits for the end"""
+        with self.cond:
+            while not self.done and (size is None or len(self.buffer) < size):
+                self.cond.wait()
+        if self.error is not None and (size is None or len(self.buffer) < size):
+            raise IOError(f"Download of {self.url} failed: {self.error}")
+
+    def release(self):
+        with self.cond:
+            self.readers -= 1
+            if self.readers > 0 or self.done:
+                return
+            self.done = True  # Nobody left to read - stop downloading
+            self.cond.notify_all()
+        self.response.close()
+
+
+class HTTPStream(io.RawIOBase):
+    """Seekable file-like view of an HTTP download that is still in progress.
+
+    A background thread appends the response body to an in-memory buffer as
+    chunks arrive, and reads block only until the bytes they need are there.
+    The decoder therefore starts on the first chunk instead of after the
+    last one. A faststart MP4 (moov atom first) decodes while it downloads.
+    A clip with its index at the end still works: the decoder seeks there
+    and waits for it. Nothing is written to disk.
+
+    ``reader()`` opens another independent cursor over the same download,
+    so a clip can be decoded twice without fetching it twice. The download
+    stops early once every reader is closed.
+    """
+
+    def __init__(self, url: str, timeout: float = 60.0, chunk_size: int = 64 * 1024, session=None,
+                 _download: Optional[_Download] = None):
+        super().__init__()
+        self._download = _download or _Download(url, timeout, chunk_size, session)
+        with self._download.cond:
+            self._download.readers += 1
+        self._position = 0
+
+    def reader(self) -> "HTTPStream":
+        return HTTPStream(self.url, _download=self._download)
+
+    @property
+    def url(self) -> str:
+        return self._download.url
+
+    @property
+    def length(self) -> Optional[int]:
+        return self._download.length
+
+    @property
+    def opened_at(self) -> float:
+        return self._download.opened_at
+
+    @property
+    def first_byte_at(self) -> Optional[float]:
+        return self._download.first_byte_at
+
+    @property
+    def completed_at(self) -> Optional[float]:
+        return self._download.completed_at
+
+    @property
+    def downloaded(self) -> int:
+        return len(self._download.buffer)
+
+    def wait(self):
+        """Block until the whole body has arrived"""
+        self._download.wait_for(None)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Partial reads are fine for the decoder - hand over whatever has arrived
+        download = self._download
+        download.wait_for(self._position + 1)
+        with download.cond:
+            available = memoryview(download.buffer)[self._position:self._position + len(buffer)]
+            size = len(available)
+            buffer[:size] = available
+            available.release()
+        self._position += size
+        return size
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            if self.length is None:
+                self.wait()
+            self._position = (self.length if self.length is not None else self.downloaded) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self._download.release()
+
+
+def _open(source):
+    """(container, video stream, HTTPStream to close afterwards or None)"""
+    import av
+
+    if isinstance(source, str) and source.startswith(("http://", "https://")):
+        source = HTTPStream(source)
+    http = source if isinstance(source, HTTPStream) else None
+    try:
+        container = av.open(source)
+    except Exception:
+        if http is not None:
+            http.close()
+        raise
+    stream = container.streams.video[0]
+    stream.thread_type = "AUTO"  # Frame + slice threaded decode
+    return container, stream, http
+
+
+def _close(container, http: Optional[HTTPStream]):
+    container.close()
+    # PyAV wraps the file object (container.file is its PyIOFile), so close our own reference
+    if http is not None:
+        http.close()  # Stops the download if decoding ended early
+
+
+def iter_frames(source, width: Optional[int] = None, height: Optional[int] = None,
+                pix_fmt: str = "rgb24", interpolation: str = "BICUBIC") -> Iterator[np.ndarray]:
+    """Decode a clip to uint8 arrays one at a time, scaled and converted by swscale in the decoder.
+
+    ``source`` is a URL, path or file-like object. URLs are decoded while
+    they download. Frames come back as (H, W, 3) for rgb24 or planar
+    (H * 3 / 2, W) for yuv420p, at ``width`` x ``height`` if given,
+    otherwise at the clip's own size. An HTTPStream source (or the one
+    opened for a URL) is closed when decoding ends.
+    """
+    container, stream, http = _open(source)
+    try:
+        for frame in container.decode(stream):
+            yield frame.to_ndarray(width=width, height=height, format=pix_fmt, interpolation=interpolation)
+    finally:
+        _close(container, http)
+
+
+def decode_frames(source, width: Optional[int] = None, height: Optional[int] = None,
+                  pix_fmt: str = "rgb24", interpolation: str = "BICUBIC",
+                  on_frames: Optional[Callable[[List[np.ndarray]], None]] = None,
+                  batch_size: int = 24) -> List[np.ndarray]:
+    """All frames of a clip (see ``iter_frames``).
+
+    ``on_frames``, if given, is called with each new batch of ``batch_size``
+    frames as soon as it is decoded, so a caller can start on the head of
+    the clip while the tail is still downloading.
+    """
+    frames = []
+    batch_start = 0
+    for frame in iter_frames(source, width, height, pix_fmt, interpolation):
+        frames.append(frame)
+        if on_frames is not None and len(frames) - batch_start >= batch_size:
+            on_frames(frames[batch_start:])
+            batch_start = len(frames)
+    if on_frames is not None and len(frames) > batch_start:
+        on_frames(frames[batch_start:])
+    return frames
+
+
+def decode_into_ring(source, ring, interpolation: str = "BICUBIC",
+                     wait_for_space: Optional[Callable[[], bool]] = None,
+                     on_last_frame: Optional[Callable[[Optional[np.ndarray]], None]] = None
+                     ) -> Tuple[int, int, Optional[np.ndarray], float, Optional[float]]:
+    """Decode a clip straight into ``ring`` in its slot size and pixel format.
+
+    Skips the RGB intermediate entirely when the ring holds yuv420p. The
+    first frame is flagged as a clip start. URLs are decoded while they
+    download, so the first frames reach the ring before the clip has fully
+    arrived.
+
+    Decoding never waits for the ring: frames that don't fit yet are held
+    in slot format, so the last frame is reached at decode speed and passed
+    to ``on_last_frame`` (RGB, for conditioning the next generation) before
+    the held frames are written. Those then wait on ``wait_for_space`` (if
+    given), which should block until a slot frees up and return False to
+    give up. Returns (written, decoded, last frame as RGB, seconds, seconds
+    until the first frame was in the ring or None).
+    """
+    start_time = time.time()
+    container, stream, http = _open(source)
+    written = decoded = 0
+    first_frame_time = None
+    ring_full = False
+    pending: deque = deque()  # Decoded slot frames waiting for ring space
+
+    def flush(block: bool):
+        nonlocal written, first_frame_time, ring_full
+        while pending and not ring_full:
+            if ring.write(pending[0], clip_start=written == 0):
+                pending.popleft()
+                written += 1
+                if first_frame_time is None:
+                    first_frame_time = time.time() - start_time
+            elif not block:
+                return
+            elif wait_for_space is None or not wait_for_space():
+                ring_full = True  # Gave up on space - the rest of the clip is dropped
+
+    last_frame = None
+    try:
+        for frame in container.decode(stream):
+            decoded += 1
+            last_frame = frame
+            pending.append(frame.to_ndarray(width=ring.width, height=ring.height,
+                                            format=ring.pix_fmt, interpolation=interpolation))
+            flush(block=False)
+        last_rgb = None
+        if last_frame is not None:
+            last_rgb = last_frame.to_ndarray(width=ring.width, height=ring.height,
+                                             format="rgb24", interpolation=interpolation)
+    finally:
+        _close(container, http)
+    if on_last_frame is not None:
+        on_last_frame(last_rgb)
+    flush(block=True)
+    return written, decoded, last_rgb, time.time() - start_time, first_frame_time
@@ -0,0 +1,239 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from streaming_pipeline.utils.logger_config import generation_log
+from streaming_pipeline.models import Monitorable
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.video_generation.clip_decoder import HTTPStream
+
+
+class FalJob:
+    """One remote generation: its queue handle, where it is, and its result once done"""
+
+    def __init__(self, sequence: int, stream: str, arguments: Dict[str, Any], handle):
+        self.sequence = sequence
+        self.stream = stream
+        self.arguments = arguments
+        self.handle = handle
+        self.state = "queued"  # queued -> running -> completed | failed | cancelled
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.video: Optional[HTTPStream] = None  # Prefetch of the result clip, started on completion
+        self.done = threading.Event()
+
+    @property
+    def request_id(self) -> str:
+        return getattr(self.handle, "request_id", "?")
+
+    @property
+    def video_url(self) -> Optional[str]:
+        return self.result["video"]["url"] if self.result else None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("completed", "failed", "cancelled")
+
+
+class FalJobManager(Monitorable):
+    """
+    Keeps several fal queue jobs in flight instead of one blocking ``subscribe``.
+
+    - ``submit`` hands the arguments to the queue (``client.submit``) and
+      returns at once, so the caller can submit the next clip as soon as its
+      conditioning frame is known.
+    - One poller thread follows every in-flight job. When a job completes,
+      it fetches the result and starts downloading the clip right away,
+      while the caller may still be busy with the previous clip.
+    - ``result`` waits for a job. Jobs from the same stream are handed back
+      in submission order (by sequence number), even if a later one
+      finishes first.
+
+    ``client`` is ``fal_client`` by default; anything with the same
+    ``submit(application, arguments)`` and request-handle interface works
+    (``simulation.fal_queue.LocalQueueClient`` for offline runs). Status
+    objects are matched by class name (Queued / InProgress / Completed).
+    """
+
+    def __init__(self, endpoint: str, client=None, poll_interval: float = 0.5,
+                 prefetch_video: bool = True, max_status_errors: int = 5):
+        self.endpoint = endpoint
+        self.client = client
+        self.poll_interval = poll_interval
+        self.prefetch_video = prefetch_video
+        self.max_status_errors = max_status_errors  # Consecutive status failures before a job is given up
+
+        self._sequences: Dict[str, itertools.count] = {}
+        self._order: Dict[str, Deque[FalJob]] = {}  # Per stream, submission order, not yet handed back
+        self._in_flight: Dict[int, FalJob] = {}
+        self._status_errors: Dict[int, int] = {}
+        self._lock = threading.Condition()
+        self._wakeup = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+        self.reset_metrics()
+
+    def _get_client(self):
+        if self.client is None:
+            import fal_client
+            self.client = fal_client
+        return self.client
+
+    # ------------------------------------------------------------------
+    # Submission and results
+    # ------------------------------------------------------------------
+
+    def submit(self, arguments: Dict[str, Any], stream: str = "default") -> FalJob:
+        """Queue a job and return immediately"""
+        handle = self._get_client().submit(self.endpoint, arguments=arguments)
+        with self._lock:
+            sequence = next(self._sequences.setdefault(stream, itertools.count(1)))
+            job = FalJob(sequence, stream, arguments, handle)
+            self._order.setdefault(stream, deque()).append(job)
+            self._in_flight[id(job)] = job
+            self.submitted += 1
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+                self._poller.start()
+        self._wakeup.set()
+        generation_log.info(f"📤 fal job {job.request_id} submitted ({stream} #{sequence}, "
+                            f"{len(self._in_flight)} in flight)")
+        return job
+
+    def result(self, job: FalJob, cancel_event: Optional[threading.Event] = None) -> FalJob:
+        """Wait until ``job`` is done and every earlier job of its stream has been handed back"""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancel(job)
+                raise GenerationPreempted(f"fal job {job.request_id} abandoned")
+            with self._lock:
+                if job.done.is_set() and job.state != "completed":
+                    break  # Already out of the stream's order
+                order = self._order.get(job.stream)
+                if job.done.is_set() and order and order[0] is job:
+                    order.popleft()
+                    self._lock.notify_all()
+                    break
+                self._lock.wait(self.poll_interval)
+
+        if job.state == "cancelled":
+            raise GenerationPreempted(f"fal job {job.request_id} was cancelled")
+        if job.state == "failed":
+            raise RuntimeError(f"fal job {job.request_id} failed: {job.error}")
+        return job
+
+    def cancel(self, job: FalJob):
+        """Cancel a job on the queue (best effort) and stop waiting for it"""
+        if job.state == "completed":
+            # Finished but never collected - drop it so later jobs of the stream are not held up
+            with self._lock:
+                order = self._order.get(job.stream)
+                if order and job in order:
+                    order.remove(job)
+                    self._lock.notify_all()
+            if job.video is not None:
+                job.video.close()
+            return
+        if job.finished:
+            return
+        try:
+            job.handle.cancel()
+        except Exception as e:
+            generation_log.warning(f"⚠️ fal job cancel failed (abandoning it): {e}")
+        self._finish(job, "cancelled")
+
+    def _finish(self, job: FalJob, state: str, error: Optional[BaseException] = None):
+        with self._lock:
+            if job.finished:
+                return
+            job.state = state
+            job.error = error
+            job.completed_at = time.time()
+            self._in_flight.pop(id(job), None)
+            self._status_errors.pop(id(job), None)
+            if state != "completed":
+                # Nobody will collect a cancelled/failed job in order - don't block the ones after it
+                order = self._order.get(job.stream)
+                if order and job in order:
+                    order.remove(job)
+            setattr(self, state, getattr(self, state) + 1)
+            job.done.set()
+            self._lock.notify_all()
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                jobs = list(self._in_flight.values())
+            if not jobs:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            for job in jobs:
+                if not job.finished:
+                    self._poll(job)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _poll(self, job: FalJob):
+        try:
+            status = type(job.handle.status()).__name__
+            self._status_errors.pop(id(job), None)
+        except Exception as e:
+            errors = self._status_errors[id(job)] = self._status_errors.get(id(job), 0) + 1
+            if errors >= self.max_status_errors:
+                self._finish(job, "failed", e)
+            return
+
+        if status == "InProgress" and job.state == "queued":
+            job.state = "running"
+            job.started_at = time.time()
+            self.total_queue_time += job.started_at - job.submitted_at
+        elif status == "Completed":
+            if job.started_at is None:
+                job.started_at = time.time()  # Finished between two polls
+                self.total_queue_time += job.started_at - job.submitted_at
+            try:
+                job.result = job.handle.get()
+                if self.prefetch_video and job.video_url:
+                    job.video = HTTPStream(job.video_url)
+            except Exception as e:
+                self._finish(job, "failed", e)
+                return
+            self.total_run_time += time.time() - job.started_at
+            self._finish(job, "completed")
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def reset_metrics(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.total_queue_time = 0.0
+        self.total_run_time = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = list(self._in_flight.values())
+        return {
+            "in_flight": len(in_flight),
+            "queued": sum(1 for job in in_flight if job.state == "queued"),
+            "running": sum(1 for job in in_flight if job.state == "running"),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "avg_queue_time": round(self.total_queue_time / max(1, self.completed), 2),
+            "avg_run_time": round(self.total_run_time / max(1, self.completed), 2),
+        }
@@ -4,10 +4,16 @@ from PIL import Image
 from io import BytesIO
 import base64
 import os
+import time
+import numpy as np
 
 
-from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames, Monitorable
-from typing import Dict, Any, List
+from streaming_pipeline.models import LTXVideoRequestI2V, LTXVideoResponseWithFrames, Monitorable, VideoClip
+from streaming_pipeline.video_generation.clip_decoder import HTTPStream, decode_frames
+from streaming_pipeline.video_generation.fal_jobs import FalJob, FalJobManager
+from streaming_pipeline.core.preemption import GenerationPreempted
+from typing import Dict, Any, Optional
+import threading
 
 def safe_snapshot_download(
     repo_id: str,
@@ -51,11 +57,16 @@ class RealtimeGenerator(Monitorable):
         self.total_videos = 0
         self.total_generation_time = 0.0
         self.last_generation_time = 0.0
+        self.last_first_chunk_time = 0.0  # Chunked generation: time until the first frames were ready
+        self.chunked_videos = 0
         
         # Configure fal client
         fal_key = os.getenv("FAL_KEY")
         if fal_key:
             os.environ["FAL_KEY"] = fal_key
+        
+        # ltxv2-preview jobs go through the fal queue; several can be in flight
+        self.fal_jobs = FalJobManager(self.FAL_ENDPOINT, poll_interval=self.FAL_POLL_INTERVAL)
 
 
     def setup(self):
@@ -118,65 +129,59 @@ class RealtimeGenerator(Monitorable):
         buffer.seek(0)
         return base64.b64encode(buffer.read()).decode('utf-8')
     
-    def download_video_frames(self, video_url: str, target_width: int = None, target_height: int = None) -> List[Image.Image]:
-        """Download video from URL and extract frames
+    def download_video_frames(self, video_url, target_width: int = None, target_height: int = None,
+                              on_frames=None) -> VideoClip:
+        """Decode a video's frames to RGB arrays while it downloads (no temp file)
         
         Args:
-            video_url: URL of the video to download
-            target_width: If set, resize frames to this width
-            target_height: If set, resize frames to this height
+            video_url: URL of the video to download, or an HTTPStream already downloading it
+            target_width: If set, scale frames to this width (in the decoder, via swscale)
+            target_height: If set, scale frames to this height
+            on_frames: Optional callback receiving each batch of frames as soon as it is decoded
         """
-        import requests
-        import tempfile
-        import cv2
+        print(f"📥 Streaming video from: {getattr(video_url, 'url', video_url)}")
+        start_time = time.time()
+        first_batch_time = None
         
-        print(f"📥 Downloading video from: {video_url}")
+        def frames_ready(batch):
+            nonlocal first_batch_time
+            if first_batch_time is None:
+                first_batch_time = time.time() - start_time
+            if on_frames is not None:
+                on_frames(batch)
         
-        # Download video to temp file
-        response = requests.get(video_url, stream=True)
-        response.raise_for_status()
+        frames = decode_frames(video_url, target_width, target_height, on_frames=frames_ready)
         
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp_file.write(chunk)
-            tmp_path = tmp_file.name
+        print(f"✅ Decoded {len(frames)} frames in {time.time() - start_time:.2f}s"
+              + (f" (first frames after {first_batch_time:.2f}s)" if first_batch_time is not None else ""))
+        if target_width and target_height:
+            print(f"📐 Scaled frames to {target_width}x{target_height}")
+        return VideoClip.from_frames(frames) if frames else None
+    
+    FAL_ENDPOINT = "fal-ai/ltxv-2-preview/image-to-video/fast"
+    FAL_POLL_INTERVAL = 0.5
+    
+    def _run_fal_job(self, fal_input: Dict[str, Any], cancel_event: Optional[threading.Event],
+                     stream: str = "default") -> FalJob:
+        """Submit a fal job and wait for it, abandoning it as soon as ``cancel_event`` is set
         
-        try:
-            # Extract frames using OpenCV
-            frames = []
-            cap = cv2.VideoCapture(tmp_path)
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                # Convert to PIL Image
-                pil_frame = Image.fromarray(frame_rgb)
-                
-                # Resize if target dimensions are specified
-                if target_width and target_height:
-                    pil_frame = pil_frame.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                
-                frames.append(pil_frame)
-            
-            cap.release()
-            print(f"✅ Extracted {len(frames)} frames from video")
-            if target_width and target_height:
-                print(f"📐 Resized frames to {target_width}x{target_height}")
-            return frames
-            
-        finally:
-            # Clean up temp file
-            os.unlink(tmp_path)
+        The job manager polls every in-flight job from one thread and starts
+        downloading the clip the moment a job completes.
+        
+        Within a stream the API path stays sequential: job N+1 is conditioned
+        on clip N's last frame, so it cannot be submitted before that frame is
+        decoded. It is submitted as soon as it is, while clip N is still going
+        into the ring and airing. Jobs from different streams are in flight
+        together.
+        """
+        job = self.fal_jobs.submit(fal_input, stream=stream)
+        return self.fal_jobs.result(job, cancel_event)
     
-    def generate_video_with_fal_api(self, request: LTXVideoRequestI2V) -> LTXVideoResponseWithFrames:
+    def generate_video_with_fal_api(self, request: LTXVideoRequestI2V,
+                                    cancel_event: Optional[threading.Event] = None,
+                                    stream: str = "default") -> LTXVideoResponseWithFrames:
         """Generate video using fal.ai ltxv2-preview API"""
-        import time
         import traceback
-        import fal_client
         
         print(f"🎬 Starting fal.ai ltxv2-preview generation")
         print(f"   Prompt: {request.prompt}")
@@ -189,6 +194,8 @@ class RealtimeGenerator(Monitorable):
         try:
             # Ensure we have a proper image URL or data URI
             image_data = request.image_base64
+            if not image_data and request.conditioning_frame is not None:
+                image_data = request.conditioning_frame.base64  # Memoized - shared with the vision LLM
             if not image_data.startswith('data:image'):
                 # Add data URI prefix if it's just base64
                 image_data = f"data:image/jpeg;base64,{image_data}"
@@ -218,24 +225,25 @@ class RealtimeGenerator(Monitorable):
             print(f"   - aspect_ratio: {fal_input.get('aspect_ratio', '16:9')}")
             print(f"   - image_url length: {len(image_data)}")
             
-            # Call fal API with subscribe (waits for completion)
             print(f"⏳ Waiting for fal.ai to complete generation...")
-            result = fal_client.subscribe(
-                "fal-ai/ltxv-2-preview/image-to-video/fast",
-                arguments=fal_input,
-                with_logs=True,
-            )
+            job = self._run_fal_job(fal_input, cancel_event, stream)
             
             print(f"✅ fal.ai API completed!")
-            print(f"📊 Result keys: {list(result.keys())}")
+            print(f"📊 Result keys: {list(job.result.keys())}")
             
             # Get video URL from result
-            video_url = result["video"]["url"]
+            video_url = job.video_url
             print(f"📹 Video URL: {video_url}")
+            # Already downloading since the job completed
+            video = job.video or HTTPStream(video_url)
             
             # Download and extract frames, resizing to match target resolution
-            # This ensures text overlay and RTMP streaming work correctly
-            frames = self.download_video_frames(video_url, request.width, request.height)
+            # This ensures text overlay and RTMP streaming work correctly.
+            # With decode_frames=False the caller decodes the clip itself (straight into the RTMP ring)
+            # from the same download, once; that decode also yields the next job's conditioning frame
+            frames = None
+            if request.decode_frames:
+                frames = self.download_video_frames(video, request.width, request.height)
             
             # Track generation performance
             self.last_generation_time = time.time() - start_time
@@ -245,9 +253,13 @@ class RealtimeGenerator(Monitorable):
             print(f"✅ Complete generation in {self.last_generation_time:.2f}s!")
             
             return LTXVideoResponseWithFrames(
-                frames=frames
+                frames=frames,
+                video_url=video_url,
+                video_source=None if request.decode_frames else video,
             )
             
+        except GenerationPreempted:
+            raise
         except Exception as e:
             print(f"❌ fal.ai API generation failed: {e}")
             print(f"❌ Exception type: {type(e).__name__}")
@@ -257,18 +269,34 @@ class RealtimeGenerator(Monitorable):
     
 
     
-    def generate_video_from_image(self, request: LTXVideoRequestI2V) -> LTXVideoResponseWithFrames:
-        """Main entry point - routes to appropriate backend based on model_type"""
+    def generate_video_from_image(self, request: LTXVideoRequestI2V,
+                                  cancel_event: Optional[threading.Event] = None,
+                                  stream: str = "default", on_frames=None) -> LTXVideoResponseWithFrames:
+        """Main entry point - routes to appropriate backend based on model_type
+        
+        Setting ``cancel_event`` aborts the generation with GenerationPreempted.
+        ``stream`` keeps API results in submission order per stream.
+        ``on_frames`` receives each chunk of a chunked local generation (see
+        ``generate_video_with_local_pipeline``); other backends never call it.
+        """
         
         # Route to fal API for ltxv2-preview
         if request.model_type == "ltxv2-preview":
-            return self.generate_video_with_fal_api(request)
+            return self.generate_video_with_fal_api(request, cancel_event, stream)
         
         # Otherwise use local HuggingFace pipeline
-        return self.generate_video_with_local_pipeline(request)
+        return self.generate_video_with_local_pipeline(request, cancel_event, on_frames)
     
-    def generate_video_with_local_pipeline(self, request: LTXVideoRequestI2V) -> LTXVideoResponseWithFrames:
-        """Generate video using local HuggingFace LTX pipeline (ltxv1)"""
+    def generate_video_with_local_pipeline(self, request: LTXVideoRequestI2V,
+                                           cancel_event: Optional[threading.Event] = None,
+                                           on_frames=None) -> LTXVideoResponseWithFrames:
+        """Generate video using local HuggingFace LTX pipeline (ltxv1)
+        
+        With ``request.chunk_frames`` the clip is generated in temporal chunks,
+        each conditioned on the last ``chunk_overlap`` frames of the one before,
+        and ``on_frames(VideoClip)`` is called as each chunk completes - the
+        first frames are ready after one chunk instead of the whole clip.
+        """
         import torch
         
         if self.pipeline is None:
@@ -276,35 +304,38 @@ class RealtimeGenerator(Monitorable):
         
         print(f"🎬 Starting local pipeline generation - {request.num_frames} frames")
         
-        # Decode Base64 input image
-        print("📷 Decoding input image...")
-        input_image = self.decode_base64_image(request.image_base64)
-        
-        # Resize image to match video dimensions
-        print(f"📏 Resizing image to {request.width}x{request.height}")
-        input_image = input_image.resize((request.width, request.height))
+        if request.conditioning_frame is not None:
+            # In-memory frame - no JPEG/base64 round trip, resized only if needed
+            input_image = request.conditioning_frame.resized(request.width, request.height).image
+        else:
+            # Decode Base64 input image
+            print("📷 Decoding input image...")
+            input_image = self.decode_base64_image(request.image_base64)
+            
+            # Resize image to match video dimensions
+            print(f"📏 Resizing image to {request.width}x{request.height}")
+            input_image = input_image.resize((request.width, request.height))
         
         # Generate video using image parameter
         print("🚀 Calling pipeline for video generation...")
 
         
-        import time
         start_time = time.time()
         
+        def check_preempted(pipeline, step, timestep, callback_kwargs):
+            # Runs after every denoising step - the cheapest point to abandon the GPU job
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationPreempted(f"cancelled after step {step + 1}/{len(request.timesteps)}")
+            return callback_kwargs
+        
+        callback = check_preempted if cancel_event is not None else None
         try:
-            video = self.pipeline(
-                image=input_image,
-                prompt=request.prompt,
-                negative_prompt=request.negative_prompt,
-                width=request.width,
-                height=request.height,
-                num_frames=request.num_frames,
-                timesteps=request.timesteps,
-                strength=request.strength,
-                guidance_scale=request.guidance_scale,
-                generator=torch.Generator().manual_seed(0),
-                output_type="pil",
-            ).frames[0]
+            if request.chunk_frames and request.chunk_frames < request.num_frames:
+                video = self._generate_chunked(request, input_image, callback, on_frames)
+            else:
+                video = VideoClip(self._to_uint8_frames(
+                    self._run_pipeline(request, request.num_frames, callback, image=input_image)
+                ))
             
             # Track generation performance
             self.last_generation_time = time.time() - start_time
@@ -312,6 +343,9 @@ class RealtimeGenerator(Monitorable):
             self.total_videos += 1
             
             print(f"✅ Pipeline generation completed in {self.last_generation_time:.2f}s!")
+        except GenerationPreempted as e:
+            print(f"⚡ Pipeline generation preempted: {e}")
+            raise
         except Exception as e:
             print(f"❌ Pipeline generation failed: {e}")
             raise
@@ -322,11 +356,90 @@ class RealtimeGenerator(Monitorable):
             frames=video  # All frames for RTMP streaming, last frame extracted on-demand
         )
     
+    def _run_pipeline(self, request: LTXVideoRequestI2V, num_frames: int, callback, **conditioning):
+        """One pipeline call; returns (F, C, H, W) floats in [0, 1], still on the GPU"""
+        import torch
+        
+        return self.pipeline(
+            prompt=request.prompt,
+            negative_prompt=request.negative_prompt,
+            width=request.width,
+            height=request.height,
+            num_frames=num_frames,
+            timesteps=request.timesteps,
+            strength=request.strength,
+            guidance_scale=request.guidance_scale,
+            generator=torch.Generator().manual_seed(0),
+            output_type="pt",
+            callback_on_step_end=callback,
+            **conditioning,
+        ).frames[0]
+    
+    @staticmethod
+    def _ltx_frame_count(frames: int) -> int:
+        """Smallest valid LTX length (8k + 1) holding ``frames``"""
+        return 8 * max(1, -(-(frames - 1) // 8)) + 1
+    
+    def _generate_chunked(self, request: LTXVideoRequestI2V, input_image, callback, on_frames) -> VideoClip:
+        """Generate ``request.num_frames`` in chunks, handing each to ``on_frames`` as it completes"""
+        overlap = request.chunk_overlap
+        # LTX generates 8k + 1 frames; any other length fails in the model or shifts the overlap
+        for name, value in (("chunk_frames", request.chunk_frames), ("chunk_overlap", overlap)):
+            if value < 1 or (value - 1) % 8:
+                raise ValueError(f"{name} must be 8k + 1 (9, 17, 25, 33, 41, ...), got {value}")
+        if request.chunk_frames <= overlap:
+            raise ValueError(f"chunk_frames ({request.chunk_frames}) must be larger than chunk_overlap ({overlap})")
+        
+        clip = np.empty((request.num_frames, request.height, request.width, 3), dtype=np.uint8)
+        conditioning = {"image": input_image}
+        written = 0
+        chunk_count = 0
+        while written < request.num_frames:
+            chunk_start = time.time()
+            # Later chunks start by re-generating the conditioning frames - those are dropped
+            skip = overlap if written else 0
+            remaining = request.num_frames - written
+            num_frames = min(request.chunk_frames, self._ltx_frame_count(skip + remaining))
+            frames = self._to_uint8_frames(self._run_pipeline(request, num_frames, callback, **conditioning))
+            frames = frames[skip:skip + remaining]
+            clip[written:written + len(frames)] = frames
+            chunk = VideoClip(clip[written:written + len(frames)])
+            written += len(frames)
+            chunk_count += 1
+            if chunk_count == 1:
+                self.last_first_chunk_time = time.time() - chunk_start
+            print(f"🧩 Chunk {chunk_count}: {len(frames)} frames in {time.time() - chunk_start:.2f}s "
+                  f"({written}/{request.num_frames})")
+            
+            if written < request.num_frames:
+                # Taken (PIL copies RGB data) before the chunk is handed on and drawn on downstream
+                tail = [Image.fromarray(frame) for frame in clip[max(0, written - overlap):written]]
+                conditioning = {"video": tail, "frame_index": 0}
+            if on_frames is not None:
+                on_frames(chunk)
+        
+        self.chunked_videos += 1
+        return VideoClip(clip)
+    
+    @staticmethod
+    def _to_uint8_frames(video) -> np.ndarray:
+        """(F, C, H, W) float tensor in [0, 1] -> contiguous (F, H, W, 3) uint8 array
+        
+        Quantized and transposed on the device, so only a quarter of the bytes
+        cross to the host and there is no per-frame PIL conversion.
+        """
+        import torch
+        
+        video = video.mul(255).round_().clamp_(0, 255).to(torch.uint8)
+        return video.permute(0, 2, 3, 1).contiguous().cpu().numpy()
+    
     def reset_metrics(self):
         """Reset performance metrics"""
         self.total_videos = 0
         self.total_generation_time = 0.0
         self.last_generation_time = 0.0
+        self.last_first_chunk_time = 0.0
+        self.chunked_videos = 0
         print("🧹 Video generation metrics reset")
     
     def get_status(self) -> Dict[str, Any]:
@@ -336,6 +449,9 @@ class RealtimeGenerator(Monitorable):
             "videos_generated": self.total_videos,
             "avg_generation_time": round(avg_generation_time, 2),
             "last_generation_time": round(self.last_generation_time, 2),
+            "chunked_videos": self.chunked_videos,
+            "last_first_chunk_time": round(self.last_first_chunk_time, 2),
+            "fal_jobs": self.fal_jobs.get_status(),
             "ready": self.pipeline is not None
         }
 
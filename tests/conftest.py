@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# The loggers open their files on import; keep test runs out of the working tree
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="streaming_pipeline_logs_"))
@@ -0,0 +1,50 @@
+import io
+
+import av
+import numpy as np
+
+from streaming_pipeline.output.frame_ring import FrameRingBuffer
+from streaming_pipeline.video_generation.clip_decoder import decode_into_ring
+
+
+def encode_clip(num_frames: int, width: int = 64, height: int = 48) -> bytes:
+    buffer = io.BytesIO()
+    container = av.open(buffer, "w", format="mp4", options={"movflags": "frag_keyframe+empty_moov"})
+    stream = container.add_stream("libx264", rate=8, options={"preset": "ultrafast"})
+    stream.width, stream.height, stream.pix_fmt = width, height, "yuv420p"
+    for index in range(num_frames):
+        frame = np.full((height, width, 3), index * 8, dtype=np.uint8)
+        for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format="rgb24")):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    return buffer.getvalue()
+
+
+def test_last_frame_arrives_before_clip_fits_in_ring():
+    ring = FrameRingBuffer(capacity=8, width=64, height=48, pix_fmt="yuv420p")
+    seen = {}
+
+    def on_last_frame(frame):
+        seen["frame"] = frame
+        seen["written"] = len(ring)
+
+    def wait_for_space():
+        ring.advance(len(ring))  # The pacer airs everything queued so far
+        return True
+
+    written, decoded, last_frame, _, _ = decode_into_ring(io.BytesIO(encode_clip(32)), ring,
+                                                          wait_for_space=wait_for_space, on_last_frame=on_last_frame)
+    assert (written, decoded) == (32, 32)
+    assert seen["written"] == 8  # Only a ring's worth was in when the conditioning frame was ready
+    assert seen["frame"].shape == (48, 64, 3)
+    assert np.array_equal(seen["frame"], last_frame)
+
+
+def test_gives_up_when_ring_stays_full():
+    ring = FrameRingBuffer(capacity=8, width=64, height=48, pix_fmt="yuv420p")
+    written, decoded, last_frame, _, _ = decode_into_ring(io.BytesIO(encode_clip(20)), ring)
+
+    assert (written, decoded) == (8, 20)
+    assert last_frame is not None
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from streaming_pipeline.core.preemption import GenerationPreempted
+from streaming_pipeline.simulation.fal_queue import LocalFalQueue, LocalQueueClient
+from streaming_pipeline.video_generation.clip_decoder import decode_frames
+from streaming_pipeline.video_generation.fal_jobs import FalJobManager
+
+FPS = 4  # Clips are duration * FPS frames
+
+
+class LatencyByLength:
+    """Fixed job time per clip length, so the test decides which job finishes first"""
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+
+    def sample(self, num_frames: int) -> float:
+        return self.latencies[num_frames]
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(latencies, workers=2):
+        queue = LocalFalQueue(LatencyByLength(latencies), workers=workers, width=64, height=48, fps=FPS).start()
+        queues.append(queue)
+        return queue, FalJobManager("test-app", client=LocalQueueClient(queue.url), poll_interval=0.02)
+
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def arguments(duration: int):
+    return {"image_url": "", "prompt": "test", "duration": duration}
+
+
+def test_results_come_back_in_submission_order(make_queue):
+    queue, manager = make_queue({8 * FPS: 1.0, 6 * FPS: 0.1})
+    first = manager.submit(arguments(8), stream="a")
+    second = manager.submit(arguments(6), stream="a")
+
+    collected = []
+    waiter = threading.Thread(target=lambda: collected.append(manager.result(second)))
+    waiter.start()
+    assert second.done.wait(5)
+    assert not first.done.is_set()
+    waiter.join(0.2)
+    assert waiter.is_alive()  # Finished first, but the earlier job has not been handed back yet
+
+    assert manager.result(first) is first
+    waiter.join(5)
+    assert collected == [second]
+    assert second.completed_at < first.completed_at
+    assert queue.completed == 2
+
+    frames = decode_frames(first.video)  # Prefetched when the job completed
+    assert len(frames) == 8 * FPS
+    assert frames[0].shape == (48, 64, 3)
+
+
+def test_streams_are_ordered_independently(make_queue):
+    _, manager = make_queue({8 * FPS: 1.0, 6 * FPS: 0.1})
+    manager.submit(arguments(8), stream="a")
+    other = manager.submit(arguments(6), stream="b")
+
+    assert manager.result(other) is other  # Not held up by stream "a"
+
+
+def test_cancel_event_cancels_job_on_queue(make_queue):
+    queue, manager = make_queue({6 * FPS: 30.0}, workers=1)
+    job = manager.submit(arguments(6))
+    cancel_event = threading.Event()
+    threading.Timer(0.2, cancel_event.set).start()
+
+    with pytest.raises(GenerationPreempted):
+        manager.result(job, cancel_event)
+    assert job.state == "cancelled"
+    assert manager.cancelled == 1
+    assert queue.cancelled == 1
+
+
+def test_cancelled_job_does_not_hold_up_its_stream(make_queue):
+    _, manager = make_queue({8 * FPS: 30.0, 6 * FPS: 0.1})
+    first = manager.submit(arguments(8))
+    second = manager.submit(arguments(6))
+
+    manager.cancel(first)
+    assert manager.result(second) is second
+    with pytest.raises(GenerationPreempted):
+        manager.result(first)